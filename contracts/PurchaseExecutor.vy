@@ -35,6 +35,19 @@ event ERC20Recovered:
     # the token amount
     amount: uint256 
 
+# The config, the offer lifecycle state and the LDO balance of the contract
+struct OfferState:
+    dai_to_ldo_rate: uint256
+    ldo_allocations_total: uint256
+    offer_expiration_delay: uint256
+    vesting_start_delay: uint256
+    vesting_end_delay: uint256
+    offer_started_at: uint256
+    offer_expires_at: uint256
+    offer_started: bool
+    offer_expired: bool
+    ldo_balance: uint256
+
 MAX_PURCHASERS: constant(uint256) = 50
 DAI_TO_LDO_RATE_PRECISION: constant(uint256) = 10**18
 
@@ -56,6 +69,9 @@ offer_expires_at: public(uint256)
 vesting_start_delay: public(uint256)
 vesting_end_delay: public(uint256)
 
+# whether DAI goes straight from the payer to the DAO treasury instead of through `Vault.deposit`
+direct_settlement: public(bool)
+
 
 @external
 def __init__(
@@ -65,7 +81,8 @@ def __init__(
     _offer_expiration_delay: uint256,
     _ldo_purchasers: address[MAX_PURCHASERS],
     _ldo_allocations: uint256[MAX_PURCHASERS],
-    _ldo_allocations_total: uint256
+    _ldo_allocations_total: uint256,
+    _direct_settlement: bool
 ):
     """
     @param _dai_to_ldo_rate How much LDO one gets for one DAI (multiplied by 10**18)
@@ -75,6 +92,7 @@ def __init__(
     @param _ldo_purchasers List of valid LDO purchasers, padded by zeroes to the length of 50
     @param _ldo_allocations List of LDO token allocations, padded by zeroes to the length of 50
     @param _ldo_allocations_total Checksum of LDO token allocations
+    @param _direct_settlement Whether to transfer DAI payments directly to the DAO treasury
     """
     assert _dai_to_ldo_rate > 0
     assert _vesting_end_delay >= _vesting_start_delay
@@ -86,6 +104,7 @@ def __init__(
     self.vesting_end_delay = _vesting_end_delay
     self.offer_expiration_delay = _offer_expiration_delay
     self.ldo_allocations_total = _ldo_allocations_total
+    self.direct_settlement = _direct_settlement
 
     allocations_sum: uint256 = 0
 
@@ -134,6 +153,26 @@ def offer_expired() -> bool:
     return self._offer_expired()
 
 
+@external
+@view
+def offer_state() -> OfferState:
+    """
+    @return The config, the offer lifecycle state and the LDO balance of the contract in one call.
+    """
+    return OfferState({
+        dai_to_ldo_rate: self.dai_to_ldo_rate,
+        ldo_allocations_total: self.ldo_allocations_total,
+        offer_expiration_delay: self.offer_expiration_delay,
+        vesting_start_delay: self.vesting_start_delay,
+        vesting_end_delay: self.vesting_end_delay,
+        offer_started_at: self.offer_started_at,
+        offer_expires_at: self.offer_expires_at,
+        offer_started: self.offer_started_at != 0,
+        offer_expired: self._offer_expired(),
+        ldo_balance: ERC20(LDO_TOKEN).balanceOf(self)
+    })
+
+
 @internal
 def _start_unless_started():
     if self.offer_started_at == 0:
@@ -167,41 +206,48 @@ def get_allocation(_ldo_receiver: address = msg.sender) -> (uint256, uint256):
 
 
 @external
-def execute_purchase(_ldo_receiver: address = msg.sender) -> uint256:
+@view
+def get_allocations(_ldo_receivers: address[MAX_PURCHASERS]) -> (uint256[MAX_PURCHASERS], uint256[MAX_PURCHASERS]):
     """
-    @notice Purchases LDO for the specified address (defaults to message sender) in exchange for DAI.
-    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
-    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    @param _ldo_receivers The LDO purchaser addresses to check, padded by zeroes to the length of 50
+    @return
+        Two arrays in the order of the addresses, padded by zeroes: the amounts of LDO
+        available for purchase and their DAI costs, same as returned by `get_allocation`.
     """
-    self._start_unless_started()
-    assert block.timestamp < self.offer_expires_at, "offer expired"
+    ldo_allocations: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    dai_costs: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
 
-    # We don't use any reentrancy lock here because we only make external calls
-    # after state mutations.
+    for i in range(MAX_PURCHASERS):
+        if _ldo_receivers[i] == ZERO_ADDRESS:
+            break
+        ldo_allocations[i], dai_costs[i] = self._get_allocation(_ldo_receivers[i])
 
-    ldo_allocation: uint256 = 0
-    dai_cost: uint256 = 0
-    ldo_allocation, dai_cost = self._get_allocation(_ldo_receiver)
+    return (ldo_allocations, dai_costs)
 
-    assert ldo_allocation > 0, "no allocation"
 
-    # clear the purchaser's allocation
-    self.ldo_allocations[_ldo_receiver] = 0
+@internal
+def _receive_dai(_payer: address, _dai_cost: uint256):
+    if self.direct_settlement:
+        # The Vault holds DAI as its plain ERC20 balance and `deposit` only pulls the tokens
+        # and logs `VaultDeposit`, so a transfer leaves the treasury in the same state, with
+        # the payment recorded by `PurchaseExecuted`.
+        assert ERC20(DAI_TOKEN).transferFrom(_payer, LIDO_DAO_VAULT, _dai_cost)
+        return
 
     # receive DAI payment
-    ERC20(DAI_TOKEN).transferFrom(msg.sender, self, dai_cost)
-    ERC20(DAI_TOKEN).approve(LIDO_DAO_VAULT, dai_cost)
+    ERC20(DAI_TOKEN).transferFrom(_payer, self, _dai_cost)
+    ERC20(DAI_TOKEN).approve(LIDO_DAO_VAULT, _dai_cost)
 
     # forward the received DAI to the DAO treasury contract
-    Vault(LIDO_DAO_VAULT).deposit(DAI_TOKEN, dai_cost)
+    Vault(LIDO_DAO_VAULT).deposit(DAI_TOKEN, _dai_cost)
+
 
+@internal
+def _assign_vested(_ldo_receiver: address, _ldo_allocation: uint256) -> uint256:
     vesting_start: uint256 = block.timestamp + self.vesting_start_delay
     vesting_end: uint256 = block.timestamp + self.vesting_end_delay
     vesting_cliff: uint256 = vesting_start
 
-    # TokenManager can only assign vested tokens from its own balance
-    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocation)
-
     # assign vested LDO tokens to the purchaser from the DAO treasury reserves
     # Vyper has no uint64 data type so we have to use raw_call instead of an interface
     call_result: Bytes[32] = raw_call(
@@ -209,7 +255,7 @@ def execute_purchase(_ldo_receiver: address = msg.sender) -> uint256:
         concat(
             method_id('assignVested(address,uint256,uint64,uint64,uint64,bool)'),
             convert(_ldo_receiver, bytes32),
-            convert(ldo_allocation, bytes32),
+            convert(_ldo_allocation, bytes32),
             convert(vesting_start, bytes32),
             convert(vesting_cliff, bytes32),
             convert(vesting_end, bytes32),
@@ -217,13 +263,162 @@ def execute_purchase(_ldo_receiver: address = msg.sender) -> uint256:
         ),
         max_outsize=32
     )
-    vesting_id: uint256 = convert(extract32(call_result, 0), uint256)
+    return convert(extract32(call_result, 0), uint256)
+
+
+@internal
+def _execute_purchase(_ldo_receiver: address, _payer: address) -> uint256:
+    self._start_unless_started()
+    assert block.timestamp < self.offer_expires_at, "offer expired"
+
+    # We don't use any reentrancy lock here because we only make external calls
+    # after state mutations.
+
+    ldo_allocation: uint256 = 0
+    dai_cost: uint256 = 0
+    ldo_allocation, dai_cost = self._get_allocation(_ldo_receiver)
+
+    assert ldo_allocation > 0, "no allocation"
+
+    # clear the purchaser's allocation
+    self.ldo_allocations[_ldo_receiver] = 0
+
+    self._receive_dai(_payer, dai_cost)
+
+    # TokenManager can only assign vested tokens from its own balance
+    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocation)
+
+    vesting_id: uint256 = self._assign_vested(_ldo_receiver, ldo_allocation)
 
     log PurchaseExecuted(_ldo_receiver, ldo_allocation, dai_cost, vesting_id)
 
     return vesting_id
 
 
+@external
+def execute_purchase(_ldo_receiver: address = msg.sender) -> uint256:
+    """
+    @notice Purchases LDO for the specified address (defaults to message sender) in exchange for DAI.
+    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
+    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    """
+    return self._execute_purchase(_ldo_receiver, msg.sender)
+
+
+@external
+def execute_purchase_with_permit(
+    _nonce: uint256,
+    _expiry: uint256,
+    _v: uint256,
+    _r: bytes32,
+    _s: bytes32,
+    _ldo_receiver: address = msg.sender
+) -> uint256:
+    """
+    @notice
+        Purchases LDO for the specified address (defaults to message sender) in exchange for DAI,
+        allowing the contract to spend message sender's DAI using the DAI `permit` signature.
+    @dev
+        The signed permit allows the contract to spend any amount of the signer's DAI, although
+        the contract only ever spends DAI of the message sender. The permit is skipped if the
+        message sender has already approved enough DAI, e.g. because the permit signature
+        was submitted to the DAI contract by somebody else.
+    @param _nonce The DAI permit nonce of the message sender
+    @param _expiry The DAI permit expiry timestamp, zero meaning no expiry
+    @param _v The `v` component of the permit signature
+    @param _r The `r` component of the permit signature
+    @param _s The `s` component of the permit signature
+    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
+    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    """
+    assert _v < 256, "invalid signature"
+
+    ldo_allocation: uint256 = 0
+    dai_cost: uint256 = 0
+    ldo_allocation, dai_cost = self._get_allocation(_ldo_receiver)
+
+    if ERC20(DAI_TOKEN).allowance(msg.sender, self) < dai_cost:
+        # Vyper has no uint8 data type so we have to use raw_call instead of an interface
+        raw_call(
+            DAI_TOKEN,
+            concat(
+                method_id('permit(address,address,uint256,uint256,bool,uint8,bytes32,bytes32)'),
+                convert(msg.sender, bytes32),
+                convert(self, bytes32),
+                convert(_nonce, bytes32),
+                convert(_expiry, bytes32),
+                convert(True, bytes32),
+                convert(_v, bytes32),
+                _r,
+                _s
+            )
+        )
+
+    return self._execute_purchase(_ldo_receiver, msg.sender)
+
+
+@external
+def execute_purchases(_ldo_receivers: address[MAX_PURCHASERS]) -> uint256[MAX_PURCHASERS]:
+    """
+    @notice
+        Purchases LDO for each of the specified addresses in exchange for DAI, transferring
+        the total DAI cost of all purchases from the message sender in a single transfer.
+    @param _ldo_receivers
+        The addresses the purchases are executed for, padded by zeroes to the length of 50.
+        Each must be a valid purchaser.
+    @return Vesting IDs to be used with the DAO's `TokenManager` contract, in the order of receivers.
+    """
+    self._start_unless_started()
+    assert block.timestamp < self.offer_expires_at, "offer expired"
+
+    # We don't use any reentrancy lock here because we only make external calls
+    # after state mutations.
+
+    ldo_allocations: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    dai_costs: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    ldo_allocations_sum: uint256 = 0
+    dai_costs_sum: uint256 = 0
+    receivers_count: uint256 = 0
+
+    for i in range(MAX_PURCHASERS):
+        ldo_receiver: address = _ldo_receivers[i]
+        if ldo_receiver == ZERO_ADDRESS:
+            break
+
+        ldo_allocation: uint256 = 0
+        dai_cost: uint256 = 0
+        ldo_allocation, dai_cost = self._get_allocation(ldo_receiver)
+
+        # also rejects duplicate receivers since the allocation is cleared below
+        assert ldo_allocation > 0, "no allocation"
+
+        # clear the purchaser's allocation
+        self.ldo_allocations[ldo_receiver] = 0
+
+        ldo_allocations[i] = ldo_allocation
+        dai_costs[i] = dai_cost
+        ldo_allocations_sum += ldo_allocation
+        dai_costs_sum += dai_cost
+        receivers_count += 1
+
+    assert receivers_count > 0, "no receivers"
+
+    self._receive_dai(msg.sender, dai_costs_sum)
+
+    # TokenManager can only assign vested tokens from its own balance
+    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocations_sum)
+
+    vesting_ids: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+
+    for i in range(MAX_PURCHASERS):
+        if i == receivers_count:
+            break
+        vesting_ids[i] = self._assign_vested(_ldo_receivers[i], ldo_allocations[i])
+        log PurchaseExecuted(_ldo_receivers[i], ldo_allocations[i], dai_costs[i], vesting_ids[i])
+
+    return vesting_ids
+
+
 @external
 def recover_erc20(_token: address, _amount: uint256):
     """
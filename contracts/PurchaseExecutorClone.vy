@@ -0,0 +1,515 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+from vyper.interfaces import ERC20
+
+
+# Lido DAO Vault (Agent) contract
+interface Vault:
+    def deposit(_token: address, _value: uint256): payable
+
+# Lido DAO TokenManager contract
+interface TokenManager:
+    def assignVested(
+        _receiver: address,
+        _amount: uint256,
+        _start: uint64,
+        _cliff: uint64,
+        _vested: uint64,
+        _revokable: bool
+    ) -> uint256: nonpayable
+
+interface Dai:
+    def permit(
+        _holder: address,
+        _spender: address,
+        _nonce: uint256,
+        _expiry: uint256,
+        _allowed: bool,
+        _v: uint8,
+        _r: bytes32,
+        _s: bytes32
+    ): nonpayable
+
+# The purchase has been executed exchanging DAI to vested LDO
+event PurchaseExecuted:
+    # the address that has received the vested LDO tokens
+    ldo_receiver: indexed(address)
+    # the number of LDO tokens vested to ldo_receiver
+    ldo_allocation: uint256
+    # the amount of DAI that was paid and forwarded to the DAO
+    dai_cost: uint256
+    # the vesting id to be used with the DAO's TokenManager contract
+    vesting_id: uint256
+
+# The offer was started
+event OfferStarted:
+    # timestamp of the offer start
+    started_at: uint256
+    # timestamp of the offer expiry
+    expires_at: uint256
+
+# The ERC20 token was transferred from the contract's address to the Lido treasury address
+event ERC20Recovered:
+    # the address calling `recover_erc20` function
+    requested_by: indexed(address)
+    # the token address
+    token: indexed(address)
+    # the token amount
+    amount: uint256
+
+# The config, the offer lifecycle state and the LDO balance of the contract
+struct OfferState:
+    dai_to_ldo_rate: uint256
+    ldo_allocations_total: uint256
+    offer_expiration_delay: uint256
+    vesting_start_delay: uint256
+    vesting_end_delay: uint256
+    offer_started_at: uint256
+    offer_expires_at: uint256
+    offer_started: bool
+    offer_expired: bool
+    ldo_balance: uint256
+
+MAX_PURCHASERS: constant(uint256) = 50
+DAI_TO_LDO_RATE_PRECISION: constant(uint256) = 10**18
+
+LDO_TOKEN: constant(address) = 0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32
+DAI_TOKEN: constant(address) = 0x6B175474E89094C44Da98b954EedeAC495271d0F
+LIDO_DAO_TOKEN_MANAGER: constant(address) = 0xf73a1260d222f447210581DDf212D915c09a3249
+LIDO_DAO_VAULT: constant(address) = 0x3e40D73EB977Dc6a537aF587D48316feE66E9C8c
+
+# two 128-bit values are packed into a storage slot as `high * PACKING_BASE + low`
+PACKING_BASE: constant(uint256) = 2**128
+
+# keeps the offer expiration timestamp below PACKING_BASE for any block timestamp
+# fitting 64 bits, as the vesting ones have to
+MAX_OFFER_EXPIRATION_DELAY: constant(uint256) = 2**64
+
+
+# The executor is deployed as an EIP-1167 minimal proxy by `PurchaseExecutorFactory` and
+# keeps the config in the proxy storage, written once by `initialize`. The values read by each
+# purchase are packed in pairs, so a purchase reads the config from a single storage slot.
+#
+# Apart from the config storage and `initialize`, the code is the same as `PurchaseExecutorV2`
+# and changes to either contract must be made to both. V2 can't be the implementation itself:
+# immutables are embedded into the implementation code, so all proxies would share its config.
+
+# how much LDO in one DAI, DAI_TO_LDO_RATE_PRECISION being 1; zero until initialized
+dai_to_ldo_rate: public(uint256)
+
+# `ldo_allocations_total * PACKING_BASE + offer_expiration_delay`, the delay in seconds
+packed_allocations_total_and_expiration_delay: uint256
+
+# `vesting_start_delay * PACKING_BASE + vesting_end_delay`, in seconds
+packed_vesting_delays: uint256
+
+# whether DAI goes straight from the payer to the DAO treasury instead of through `Vault.deposit`
+direct_settlement: public(bool)
+
+# the LDO allocation and its DAI cost, computed at the initialization, by purchaser
+packed_allocations: HashMap[address, uint256]
+
+# the offer start and expiry timestamps, both zero until the offer is started
+packed_offer_timestamps: uint256
+
+
+@external
+def __init__():
+    # the implementation itself is never initialized, so it can't be used as an executor
+    self.dai_to_ldo_rate = max_value(uint256)
+
+
+@external
+def initialize(
+    _dai_to_ldo_rate: uint256,
+    _vesting_start_delay: uint256,
+    _vesting_end_delay: uint256,
+    _offer_expiration_delay: uint256,
+    _ldo_purchasers: address[MAX_PURCHASERS],
+    _ldo_allocations: uint256[MAX_PURCHASERS],
+    _ldo_allocations_total: uint256,
+    _direct_settlement: bool
+):
+    """
+    @notice Sets the offer parameters of the proxy. Can only be called once.
+    @param _dai_to_ldo_rate How much LDO one gets for one DAI (multiplied by 10**18)
+    @param _vesting_start_delay Delay from the purchase moment to the vesting start moment, in seconds
+    @param _vesting_end_delay Delay from the purchase moment to the vesting end moment, in seconds
+    @param _offer_expiration_delay Delay from the contract deployment to offer expiration, in seconds
+    @param _ldo_purchasers List of valid LDO purchasers, padded by zeroes to the length of 50
+    @param _ldo_allocations List of LDO token allocations, padded by zeroes to the length of 50
+    @param _ldo_allocations_total Checksum of LDO token allocations
+    @param _direct_settlement Whether to transfer DAI payments directly to the DAO treasury
+    """
+    assert self.dai_to_ldo_rate == 0, "already initialized"
+    assert _dai_to_ldo_rate > 0
+    assert _vesting_end_delay >= _vesting_start_delay
+    assert _offer_expiration_delay > 0
+    assert _ldo_allocations_total > 0
+    assert _ldo_allocations_total < PACKING_BASE and _offer_expiration_delay < MAX_OFFER_EXPIRATION_DELAY
+    assert _vesting_end_delay < PACKING_BASE
+
+    self.dai_to_ldo_rate = _dai_to_ldo_rate
+    self.packed_allocations_total_and_expiration_delay = _ldo_allocations_total * PACKING_BASE + _offer_expiration_delay
+    self.packed_vesting_delays = _vesting_start_delay * PACKING_BASE + _vesting_end_delay
+    if _direct_settlement:
+        self.direct_settlement = True
+
+    allocations_sum: uint256 = 0
+
+    for i in range(MAX_PURCHASERS):
+        purchaser: address = _ldo_purchasers[i]
+        if purchaser == ZERO_ADDRESS:
+            break
+        assert self.packed_allocations[purchaser] == 0
+        allocation: uint256 = _ldo_allocations[i]
+        assert allocation > 0
+        dai_cost: uint256 = (allocation * DAI_TO_LDO_RATE_PRECISION) / _dai_to_ldo_rate
+        assert allocation < PACKING_BASE and dai_cost < PACKING_BASE
+        self.packed_allocations[purchaser] = allocation * PACKING_BASE + dai_cost
+        allocations_sum += allocation
+
+    assert allocations_sum == _ldo_allocations_total
+
+
+@external
+@view
+def ldo_allocations_total() -> uint256:
+    return self.packed_allocations_total_and_expiration_delay / PACKING_BASE
+
+
+@external
+@view
+def offer_expiration_delay() -> uint256:
+    return self.packed_allocations_total_and_expiration_delay % PACKING_BASE
+
+
+@external
+@view
+def vesting_start_delay() -> uint256:
+    return self.packed_vesting_delays / PACKING_BASE
+
+
+@external
+@view
+def vesting_end_delay() -> uint256:
+    return self.packed_vesting_delays % PACKING_BASE
+
+
+@external
+@view
+def ldo_allocations(_ldo_receiver: address) -> uint256:
+    return self.packed_allocations[_ldo_receiver] / PACKING_BASE
+
+
+@external
+@view
+def offer_started_at() -> uint256:
+    return self.packed_offer_timestamps / PACKING_BASE
+
+
+@external
+@view
+def offer_expires_at() -> uint256:
+    return self.packed_offer_timestamps % PACKING_BASE
+
+
+@internal
+@view
+def _get_allocation(_ldo_receiver: address) -> (uint256, uint256):
+    packed_allocation: uint256 = self.packed_allocations[_ldo_receiver]
+    return (packed_allocation / PACKING_BASE, packed_allocation % PACKING_BASE)
+
+
+@external
+@view
+def offer_started() -> bool:
+    """
+    @return Whether the offer has started.
+    """
+    return self.packed_offer_timestamps != 0
+
+
+@internal
+@view
+def _offer_expired() -> bool:
+    packed_offer_timestamps: uint256 = self.packed_offer_timestamps
+    return packed_offer_timestamps != 0 and block.timestamp >= packed_offer_timestamps % PACKING_BASE
+
+
+@external
+@view
+def offer_expired() -> bool:
+    """
+    @return Whether the offer has expired.
+    """
+    return self._offer_expired()
+
+
+@external
+@view
+def offer_state() -> OfferState:
+    """
+    @return The config, the offer lifecycle state and the LDO balance of the contract in one call.
+    """
+    packed_offer_timestamps: uint256 = self.packed_offer_timestamps
+    packed_allocations_total_and_expiration_delay: uint256 = self.packed_allocations_total_and_expiration_delay
+    packed_vesting_delays: uint256 = self.packed_vesting_delays
+    return OfferState({
+        dai_to_ldo_rate: self.dai_to_ldo_rate,
+        ldo_allocations_total: packed_allocations_total_and_expiration_delay / PACKING_BASE,
+        offer_expiration_delay: packed_allocations_total_and_expiration_delay % PACKING_BASE,
+        vesting_start_delay: packed_vesting_delays / PACKING_BASE,
+        vesting_end_delay: packed_vesting_delays % PACKING_BASE,
+        offer_started_at: packed_offer_timestamps / PACKING_BASE,
+        offer_expires_at: packed_offer_timestamps % PACKING_BASE,
+        offer_started: packed_offer_timestamps != 0,
+        offer_expired: self._offer_expired(),
+        ldo_balance: ERC20(LDO_TOKEN).balanceOf(self)
+    })
+
+
+@internal
+def _start_unless_started() -> uint256:
+    # returns the offer expiry timestamp
+    packed_offer_timestamps: uint256 = self.packed_offer_timestamps
+    if packed_offer_timestamps != 0:
+        return packed_offer_timestamps % PACKING_BASE
+
+    packed_allocations_total_and_expiration_delay: uint256 = self.packed_allocations_total_and_expiration_delay
+    assert ERC20(LDO_TOKEN).balanceOf(self) >= packed_allocations_total_and_expiration_delay / PACKING_BASE, "not funded"
+    started_at: uint256 = block.timestamp
+    expires_at: uint256 = started_at + packed_allocations_total_and_expiration_delay % PACKING_BASE
+    self.packed_offer_timestamps = started_at * PACKING_BASE + expires_at
+    log OfferStarted(started_at, expires_at)
+    return expires_at
+
+
+@external
+def start():
+    """
+    @notice Starts the offer if it 1) hasn't been started yet and 2) has received funding in full.
+    """
+    self._start_unless_started()
+
+
+@external
+@view
+def get_allocation(_ldo_receiver: address = msg.sender) -> (uint256, uint256):
+    """
+    @param _ldo_receiver The LDO purchaser address to check
+    @return
+        A tuple: the first element is the amount of LDO available for purchase (zero if
+        the purchase was already executed for that address), the second element is the
+        DAI cost of the purchase.
+    """
+    return self._get_allocation(_ldo_receiver)
+
+
+@external
+@view
+def get_allocations(_ldo_receivers: address[MAX_PURCHASERS]) -> (uint256[MAX_PURCHASERS], uint256[MAX_PURCHASERS]):
+    """
+    @param _ldo_receivers The LDO purchaser addresses to check, padded by zeroes to the length of 50
+    @return
+        Two arrays in the order of the addresses, padded by zeroes: the amounts of LDO
+        available for purchase and their DAI costs, same as returned by `get_allocation`.
+    """
+    ldo_allocations: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    dai_costs: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+
+    for i in range(MAX_PURCHASERS):
+        if _ldo_receivers[i] == ZERO_ADDRESS:
+            break
+        ldo_allocations[i], dai_costs[i] = self._get_allocation(_ldo_receivers[i])
+
+    return (ldo_allocations, dai_costs)
+
+
+@internal
+def _receive_dai(_payer: address, _dai_cost: uint256):
+    if self.direct_settlement:
+        # The Vault holds DAI as its plain ERC20 balance and `deposit` only pulls the tokens
+        # and logs `VaultDeposit`, so a transfer leaves the treasury in the same state, with
+        # the payment recorded by `PurchaseExecuted`.
+        assert ERC20(DAI_TOKEN).transferFrom(_payer, LIDO_DAO_VAULT, _dai_cost)
+        return
+
+    # receive DAI payment
+    assert ERC20(DAI_TOKEN).transferFrom(_payer, self, _dai_cost)
+    assert ERC20(DAI_TOKEN).approve(LIDO_DAO_VAULT, _dai_cost)
+
+    # forward the received DAI to the DAO treasury contract
+    Vault(LIDO_DAO_VAULT).deposit(DAI_TOKEN, _dai_cost)
+
+
+@internal
+def _assign_vested(_ldo_receiver: address, _ldo_allocation: uint256) -> uint256:
+    packed_vesting_delays: uint256 = self.packed_vesting_delays
+    vesting_start: uint64 = convert(block.timestamp + packed_vesting_delays / PACKING_BASE, uint64)
+    vesting_end: uint64 = convert(block.timestamp + packed_vesting_delays % PACKING_BASE, uint64)
+
+    # assign vested LDO tokens to the purchaser from the DAO treasury reserves
+    return TokenManager(LIDO_DAO_TOKEN_MANAGER).assignVested(
+        _ldo_receiver,
+        _ldo_allocation,
+        vesting_start,
+        vesting_start,
+        vesting_end,
+        False
+    )
+
+
+@internal
+def _execute_purchase(_ldo_receiver: address, _payer: address) -> uint256:
+    expires_at: uint256 = self._start_unless_started()
+    assert block.timestamp < expires_at, "offer expired"
+
+    # We don't use any reentrancy lock here because we only make external calls
+    # after state mutations.
+
+    ldo_allocation: uint256 = 0
+    dai_cost: uint256 = 0
+    ldo_allocation, dai_cost = self._get_allocation(_ldo_receiver)
+
+    assert ldo_allocation > 0, "no allocation"
+
+    # clear the purchaser's allocation
+    self.packed_allocations[_ldo_receiver] = 0
+
+    self._receive_dai(_payer, dai_cost)
+
+    # TokenManager can only assign vested tokens from its own balance
+    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocation)
+
+    vesting_id: uint256 = self._assign_vested(_ldo_receiver, ldo_allocation)
+
+    log PurchaseExecuted(_ldo_receiver, ldo_allocation, dai_cost, vesting_id)
+
+    return vesting_id
+
+
+@external
+def execute_purchase(_ldo_receiver: address = msg.sender) -> uint256:
+    """
+    @notice Purchases LDO for the specified address (defaults to message sender) in exchange for DAI.
+    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
+    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    """
+    return self._execute_purchase(_ldo_receiver, msg.sender)
+
+
+@external
+def execute_purchase_with_permit(
+    _nonce: uint256,
+    _expiry: uint256,
+    _v: uint256,
+    _r: bytes32,
+    _s: bytes32,
+    _ldo_receiver: address = msg.sender
+) -> uint256:
+    """
+    @notice
+        Purchases LDO for the specified address (defaults to message sender) in exchange for DAI,
+        allowing the contract to spend message sender's DAI using the DAI `permit` signature.
+    @dev
+        The signed permit allows the contract to spend any amount of the signer's DAI, although
+        the contract only ever spends DAI of the message sender. The permit is skipped if the
+        message sender has already approved enough DAI, e.g. because the permit signature
+        was submitted to the DAI contract by somebody else.
+    @param _nonce The DAI permit nonce of the message sender
+    @param _expiry The DAI permit expiry timestamp, zero meaning no expiry
+    @param _v The `v` component of the permit signature
+    @param _r The `r` component of the permit signature
+    @param _s The `s` component of the permit signature
+    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
+    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    """
+    assert _v < 256, "invalid signature"
+
+    dai_cost: uint256 = self.packed_allocations[_ldo_receiver] % PACKING_BASE
+
+    if ERC20(DAI_TOKEN).allowance(msg.sender, self) < dai_cost:
+        Dai(DAI_TOKEN).permit(msg.sender, self, _nonce, _expiry, True, convert(_v, uint8), _r, _s)
+
+    return self._execute_purchase(_ldo_receiver, msg.sender)
+
+
+@external
+def execute_purchases(_ldo_receivers: address[MAX_PURCHASERS]) -> uint256[MAX_PURCHASERS]:
+    """
+    @notice
+        Purchases LDO for each of the specified addresses in exchange for DAI, transferring
+        the total DAI cost of all purchases from the message sender in a single transfer.
+    @param _ldo_receivers
+        The addresses the purchases are executed for, padded by zeroes to the length of 50.
+        Each must be a valid purchaser.
+    @return Vesting IDs to be used with the DAO's `TokenManager` contract, in the order of receivers.
+    """
+    expires_at: uint256 = self._start_unless_started()
+    assert block.timestamp < expires_at, "offer expired"
+
+    # We don't use any reentrancy lock here because we only make external calls
+    # after state mutations.
+
+    ldo_allocations: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    dai_costs: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+    ldo_allocations_sum: uint256 = 0
+    dai_costs_sum: uint256 = 0
+    receivers_count: uint256 = 0
+
+    for i in range(MAX_PURCHASERS):
+        ldo_receiver: address = _ldo_receivers[i]
+        if ldo_receiver == ZERO_ADDRESS:
+            break
+
+        ldo_allocation: uint256 = 0
+        dai_cost: uint256 = 0
+        ldo_allocation, dai_cost = self._get_allocation(ldo_receiver)
+
+        # also rejects duplicate receivers since the allocation is cleared below
+        assert ldo_allocation > 0, "no allocation"
+
+        # clear the purchaser's allocation
+        self.packed_allocations[ldo_receiver] = 0
+
+        ldo_allocations[i] = ldo_allocation
+        dai_costs[i] = dai_cost
+        ldo_allocations_sum += ldo_allocation
+        dai_costs_sum += dai_cost
+        receivers_count += 1
+
+    assert receivers_count > 0, "no receivers"
+
+    self._receive_dai(msg.sender, dai_costs_sum)
+
+    # TokenManager can only assign vested tokens from its own balance
+    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocations_sum)
+
+    vesting_ids: uint256[MAX_PURCHASERS] = empty(uint256[MAX_PURCHASERS])
+
+    for i in range(MAX_PURCHASERS):
+        if i == receivers_count:
+            break
+        vesting_ids[i] = self._assign_vested(_ldo_receivers[i], ldo_allocations[i])
+        log PurchaseExecuted(_ldo_receivers[i], ldo_allocations[i], dai_costs[i], vesting_ids[i])
+
+    return vesting_ids
+
+
+@external
+def recover_erc20(_token: address, _amount: uint256):
+    """
+    @notice Transfers ERC20 tokens from the contract's balance to the DAO treasury.
+    @dev May only be called after the offer expires.
+    """
+    assert self._offer_expired() # dev: offer not expired
+    ERC20(_token).transfer(LIDO_DAO_VAULT, _amount)
+    log ERC20Recovered(msg.sender, _token, _amount)
+
+
+@external
+@payable
+def __default__():
+    raise "not allowed"
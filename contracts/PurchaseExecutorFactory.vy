@@ -0,0 +1,80 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+
+
+# PurchaseExecutorClone implementation
+interface PurchaseExecutorClone:
+    def initialize(
+        _dai_to_ldo_rate: uint256,
+        _vesting_start_delay: uint256,
+        _vesting_end_delay: uint256,
+        _offer_expiration_delay: uint256,
+        _ldo_purchasers: address[MAX_PURCHASERS],
+        _ldo_allocations: uint256[MAX_PURCHASERS],
+        _ldo_allocations_total: uint256,
+        _direct_settlement: bool
+    ): nonpayable
+
+# The executor for a new sale round has been created
+event ExecutorCreated:
+    # the address of the EIP-1167 proxy
+    executor: indexed(address)
+    # the address calling `create_executor` function
+    created_by: indexed(address)
+
+MAX_PURCHASERS: constant(uint256) = 50
+
+# the PurchaseExecutorClone contract all executors delegate to
+IMPLEMENTATION: immutable(address)
+
+
+@external
+def __init__(_implementation: address):
+    """
+    @param _implementation The deployed PurchaseExecutorClone contract
+    """
+    assert _implementation != ZERO_ADDRESS
+    IMPLEMENTATION = _implementation
+
+
+@external
+@view
+def implementation() -> address:
+    return IMPLEMENTATION
+
+
+@external
+def create_executor(
+    _dai_to_ldo_rate: uint256,
+    _vesting_start_delay: uint256,
+    _vesting_end_delay: uint256,
+    _offer_expiration_delay: uint256,
+    _ldo_purchasers: address[MAX_PURCHASERS],
+    _ldo_allocations: uint256[MAX_PURCHASERS],
+    _ldo_allocations_total: uint256,
+    _direct_settlement: bool
+) -> address:
+    """
+    @notice
+        Deploys an EIP-1167 minimal proxy to the implementation and initializes it with
+        the given offer parameters in the same transaction, so nobody can initialize it first.
+    @dev The parameters are the same as of `PurchaseExecutorV2` constructor.
+    @return The address of the new executor.
+    """
+    executor: address = create_minimal_proxy_to(IMPLEMENTATION)
+
+    PurchaseExecutorClone(executor).initialize(
+        _dai_to_ldo_rate,
+        _vesting_start_delay,
+        _vesting_end_delay,
+        _offer_expiration_delay,
+        _ldo_purchasers,
+        _ldo_allocations,
+        _ldo_allocations_total,
+        _direct_settlement
+    )
+
+    log ExecutorCreated(executor, msg.sender)
+
+    return executor
@@ -0,0 +1,73 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon ACL app: plain role grants without parameters
+
+
+event SetPermission:
+    entity: indexed(address)
+    app: indexed(address)
+    role: indexed(bytes32)
+    allowed: bool
+
+event ChangePermissionManager:
+    app: indexed(address)
+    role: indexed(bytes32)
+    manager: indexed(address)
+
+
+initialized: bool
+permissions_creator: public(address)
+permissions: HashMap[address, HashMap[address, HashMap[bytes32, bool]]]
+permission_managers: HashMap[address, HashMap[bytes32, address]]
+
+
+@external
+def initialize(_permissions_creator: address):
+    """
+    @param _permissions_creator The address allowed to create new permissions
+    """
+    assert not self.initialized, "INIT_ALREADY_INITIALIZED"
+    self.initialized = True
+    self.permissions_creator = _permissions_creator
+
+
+@internal
+def _set_permission(_entity: address, _app: address, _role: bytes32, _allowed: bool):
+    self.permissions[_entity][_app][_role] = _allowed
+    log SetPermission(_entity, _app, _role, _allowed)
+
+
+@external
+def createPermission(_entity: address, _app: address, _role: bytes32, _manager: address):
+    assert msg.sender == self.permissions_creator, "APP_AUTH_FAILED"
+    assert self.permission_managers[_app][_role] == empty(address), "ACL_EXISTENT_MANAGER"
+    self._set_permission(_entity, _app, _role, True)
+    self.permission_managers[_app][_role] = _manager
+    log ChangePermissionManager(_app, _role, _manager)
+
+
+@external
+def grantPermission(_entity: address, _app: address, _role: bytes32):
+    assert msg.sender == self.permission_managers[_app][_role], "ACL_AUTH_NO_MANAGER"
+    assert not self.permissions[_entity][_app][_role], "ACL_EXISTENT_PERMISSION"
+    self._set_permission(_entity, _app, _role, True)
+
+
+@external
+def revokePermission(_entity: address, _app: address, _role: bytes32):
+    assert msg.sender == self.permission_managers[_app][_role], "ACL_AUTH_NO_MANAGER"
+    assert self.permissions[_entity][_app][_role], "ACL_NONEXISTENT_PERMISSION"
+    self._set_permission(_entity, _app, _role, False)
+
+
+@external
+@view
+def getPermissionManager(_app: address, _role: bytes32) -> address:
+    return self.permission_managers[_app][_role]
+
+
+@external
+@view
+def hasPermission(_who: address, _where: address, _what: bytes32) -> bool:
+    return self.permissions[_who][_where][_what]
@@ -0,0 +1,47 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon CallsScript executor (EVM script spec id 1). Like the
+# original, it is delegate-called by the apps running scripts, so the calls are made
+# on behalf of the calling app.
+
+MAX_SCRIPT_SIZE: constant(uint256) = 8192
+MAX_SCRIPT_CALLS: constant(uint256) = 32
+
+SPEC_ID: constant(uint256) = 1
+SPEC_ID_SIZE: constant(uint256) = 4
+# address (20 bytes) followed by calldata length (4 bytes)
+CALL_HEADER_SIZE: constant(uint256) = 24
+
+
+@external
+def execScript(_script: Bytes[MAX_SCRIPT_SIZE], _blacklist: address):
+    """
+    @param _script The EVM script, spec id followed by (address, calldata length, calldata) tuples
+    @param _blacklist The address the script is not allowed to call
+    """
+    script_length: uint256 = len(_script)
+    # pad the script so that the header of the last call can be read as a whole word
+    script: Bytes[MAX_SCRIPT_SIZE + 32] = concat(_script, empty(bytes32))
+
+    assert script_length >= SPEC_ID_SIZE, "EVMCALLS_INVALID_LENGTH"
+    assert shift(convert(extract32(script, 0), uint256), -224) == SPEC_ID, "EVMRUN_EXECUTOR_UNAVAILABLE"
+
+    location: uint256 = SPEC_ID_SIZE
+
+    for i in range(MAX_SCRIPT_CALLS + 1):
+        if location >= script_length:
+            break
+        assert i < MAX_SCRIPT_CALLS, "EVMCALLS_TOO_MANY_CALLS"
+        assert location + CALL_HEADER_SIZE <= script_length, "EVMCALLS_INVALID_LENGTH"
+
+        header: uint256 = convert(extract32(script, location), uint256)
+        target: address = convert(convert(shift(header, -96), bytes32), address)
+        calldata_length: uint256 = shift(header, -64) % 2**32
+        location += CALL_HEADER_SIZE
+
+        assert location + calldata_length <= script_length, "EVMCALLS_INVALID_LENGTH"
+        assert target != _blacklist, "EVMCALLS_BLACKLISTED_CALL"
+
+        raw_call(target, slice(_script, location, calldata_length))
+        location += calldata_length
@@ -0,0 +1,141 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the DAI token, including its non-standard `permit`
+
+
+event Transfer:
+    src: indexed(address)
+    dst: indexed(address)
+    wad: uint256
+
+event Approval:
+    src: indexed(address)
+    guy: indexed(address)
+    wad: uint256
+
+
+EIP712_DOMAIN_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+PERMIT_TYPEHASH: constant(bytes32) = keccak256("Permit(address holder,address spender,uint256 nonce,uint256 expiry,bool allowed)")
+
+NAME: constant(String[14]) = "Dai Stablecoin"
+SYMBOL: constant(String[3]) = "DAI"
+VERSION: constant(String[1]) = "1"
+DECIMALS: constant(uint8) = 18
+
+initialized: bool
+wards: public(HashMap[address, uint256])
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+nonces: public(HashMap[address, uint256])
+DOMAIN_SEPARATOR: public(bytes32)
+
+
+@external
+def initialize(_chain_id: uint256):
+    """
+    @param _chain_id The chain id the permit signatures are bound to
+    """
+    assert not self.initialized, "Dai/already-initialized"
+    self.initialized = True
+    self.wards[msg.sender] = 1
+    self.DOMAIN_SEPARATOR = keccak256(_abi_encode(
+        EIP712_DOMAIN_TYPEHASH,
+        keccak256(NAME),
+        keccak256(VERSION),
+        _chain_id,
+        self
+    ))
+
+
+@external
+@view
+def name() -> String[14]:
+    return NAME
+
+
+@external
+@view
+def symbol() -> String[3]:
+    return SYMBOL
+
+
+@external
+@view
+def version() -> String[1]:
+    return VERSION
+
+
+@external
+@view
+def decimals() -> uint8:
+    return DECIMALS
+
+
+@internal
+def _transfer_from(_sender: address, _src: address, _dst: address, _wad: uint256) -> bool:
+    assert self.balanceOf[_src] >= _wad, "Dai/insufficient-balance"
+    if _src != _sender and self.allowance[_src][_sender] != max_value(uint256):
+        assert self.allowance[_src][_sender] >= _wad, "Dai/insufficient-allowance"
+        self.allowance[_src][_sender] -= _wad
+    self.balanceOf[_src] -= _wad
+    self.balanceOf[_dst] += _wad
+    log Transfer(_src, _dst, _wad)
+    return True
+
+
+@external
+def transfer(_dst: address, _wad: uint256) -> bool:
+    return self._transfer_from(msg.sender, msg.sender, _dst, _wad)
+
+
+@external
+def transferFrom(_src: address, _dst: address, _wad: uint256) -> bool:
+    return self._transfer_from(msg.sender, _src, _dst, _wad)
+
+
+@external
+def approve(_usr: address, _wad: uint256) -> bool:
+    self.allowance[msg.sender][_usr] = _wad
+    log Approval(msg.sender, _usr, _wad)
+    return True
+
+
+@external
+def mint(_usr: address, _wad: uint256):
+    assert self.wards[msg.sender] == 1, "Dai/not-authorized"
+    self.balanceOf[_usr] += _wad
+    self.totalSupply += _wad
+    log Transfer(empty(address), _usr, _wad)
+
+
+@external
+def permit(
+    _holder: address,
+    _spender: address,
+    _nonce: uint256,
+    _expiry: uint256,
+    _allowed: bool,
+    _v: uint8,
+    _r: bytes32,
+    _s: bytes32
+):
+    digest: bytes32 = keccak256(concat(
+        b"\x19\x01",
+        self.DOMAIN_SEPARATOR,
+        keccak256(_abi_encode(PERMIT_TYPEHASH, _holder, _spender, _nonce, _expiry, _allowed))
+    ))
+
+    assert _holder != empty(address), "Dai/invalid-address-0"
+    signer: address = ecrecover(digest, convert(_v, uint256), convert(_r, uint256), convert(_s, uint256))
+    assert _holder == signer, "Dai/invalid-permit"
+    assert _expiry == 0 or block.timestamp <= _expiry, "Dai/permit-expired"
+    assert _nonce == self.nonces[_holder], "Dai/invalid-nonce"
+
+    self.nonces[_holder] += 1
+    wad: uint256 = 0
+    if _allowed:
+        wad = max_value(uint256)
+    self.allowance[_holder][_spender] = wad
+    log Approval(_holder, _spender, wad)
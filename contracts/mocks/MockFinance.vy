@@ -0,0 +1,55 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon Finance app; only immediate payments are supported
+
+
+interface Vault:
+    def transfer(_token: address, _to: address, _value: uint256): nonpayable
+
+interface ACL:
+    def hasPermission(_who: address, _where: address, _what: bytes32) -> bool: view
+
+
+event NewTransaction:
+    transactionId: indexed(uint256)
+    incoming: bool
+    entity: indexed(address)
+    amount: uint256
+    reference: String[1024]
+
+
+CREATE_PAYMENTS_ROLE_ID: constant(bytes32) = keccak256("CREATE_PAYMENTS_ROLE")
+
+
+initialized: bool
+vault: public(address)
+acl: public(address)
+transactionsNextIndex: public(uint256)
+
+
+@external
+def initialize(_vault: address, _acl: address):
+    assert not self.initialized, "INIT_ALREADY_INITIALIZED"
+    self.initialized = True
+    self.vault = _vault
+    self.acl = _acl
+    self.transactionsNextIndex = 1
+
+
+@external
+@view
+def CREATE_PAYMENTS_ROLE() -> bytes32:
+    return CREATE_PAYMENTS_ROLE_ID
+
+
+@external
+def newImmediatePayment(_token: address, _receiver: address, _amount: uint256, _reference: String[1024]):
+    assert ACL(self.acl).hasPermission(msg.sender, self, CREATE_PAYMENTS_ROLE_ID), "APP_AUTH_FAILED"
+    assert _amount > 0, "FINANCE_NEW_PAYMENT_AMOUNT_ZERO"
+
+    transaction_id: uint256 = self.transactionsNextIndex
+    self.transactionsNextIndex = transaction_id + 1
+
+    Vault(self.vault).transfer(_token, _receiver, _amount)
+    log NewTransaction(transaction_id, False, _receiver, _amount, _reference)
@@ -0,0 +1,135 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the MiniMe LDO token. Transfers and approvals are checked by the
+# controller (the TokenManager app), which is how vested tokens are kept locked.
+# Balance history (`balanceOfAt`) is not kept.
+
+
+interface TokenController:
+    def onTransfer(_from: address, _to: address, _amount: uint256) -> bool: nonpayable
+    def onApprove(_owner: address, _spender: address, _amount: uint256) -> bool: nonpayable
+
+
+event Transfer:
+    _from: indexed(address)
+    _to: indexed(address)
+    _amount: uint256
+
+event Approval:
+    _owner: indexed(address)
+    _spender: indexed(address)
+    _amount: uint256
+
+
+initialized: bool
+name: public(String[64])
+symbol: public(String[32])
+controller: public(address)
+transfersEnabled: public(bool)
+totalSupply: public(uint256)
+balances: HashMap[address, uint256]
+allowed: HashMap[address, HashMap[address, uint256]]
+
+
+@external
+def initialize(_name: String[64], _symbol: String[32]):
+    """
+    @notice Makes the caller the token controller
+    """
+    assert not self.initialized
+    self.initialized = True
+    self.name = _name
+    self.symbol = _symbol
+    self.controller = msg.sender
+    self.transfersEnabled = True
+
+
+@external
+@view
+def decimals() -> uint8:
+    return 18
+
+
+@external
+@view
+def balanceOf(_owner: address) -> uint256:
+    return self.balances[_owner]
+
+
+@external
+@view
+def allowance(_owner: address, _spender: address) -> uint256:
+    return self.allowed[_owner][_spender]
+
+
+@internal
+def _do_transfer(_from: address, _to: address, _amount: uint256) -> bool:
+    if _amount == 0:
+        return True
+
+    assert _to != empty(address) and _to != self
+
+    # MiniMe returns false instead of reverting on insufficient balance
+    if self.balances[_from] < _amount:
+        return False
+
+    if self.controller.is_contract:
+        assert TokenController(self.controller).onTransfer(_from, _to, _amount)
+
+    self.balances[_from] -= _amount
+    self.balances[_to] += _amount
+    log Transfer(_from, _to, _amount)
+    return True
+
+
+@external
+def transfer(_to: address, _amount: uint256) -> bool:
+    assert self.transfersEnabled
+    return self._do_transfer(msg.sender, _to, _amount)
+
+
+@external
+def transferFrom(_from: address, _to: address, _amount: uint256) -> bool:
+    # the controller can move any tokens without an allowance
+    if msg.sender != self.controller:
+        assert self.transfersEnabled
+        if self.allowed[_from][msg.sender] < _amount:
+            return False
+        self.allowed[_from][msg.sender] -= _amount
+    return self._do_transfer(_from, _to, _amount)
+
+
+@external
+def approve(_spender: address, _amount: uint256) -> bool:
+    assert self.transfersEnabled
+    # the allowance has to be reset to zero before changing it
+    assert _amount == 0 or self.allowed[msg.sender][_spender] == 0
+
+    if self.controller.is_contract:
+        assert TokenController(self.controller).onApprove(msg.sender, _spender, _amount)
+
+    self.allowed[msg.sender][_spender] = _amount
+    log Approval(msg.sender, _spender, _amount)
+    return True
+
+
+@external
+def generateTokens(_owner: address, _amount: uint256) -> bool:
+    assert msg.sender == self.controller
+    self.totalSupply += _amount
+    self.balances[_owner] += _amount
+    log Transfer(empty(address), _owner, _amount)
+    return True
+
+
+@external
+def changeController(_new_controller: address):
+    assert msg.sender == self.controller
+    self.controller = _new_controller
+
+
+@external
+def enableTransfers(_transfers_enabled: bool):
+    assert msg.sender == self.controller
+    self.transfersEnabled = _transfers_enabled
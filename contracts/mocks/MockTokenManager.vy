@@ -0,0 +1,203 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon TokenManager app controlling the LDO token. Vestings
+# and the transfer locks they impose follow the original implementation.
+
+
+interface MiniMeToken:
+    def balanceOf(_owner: address) -> uint256: view
+    def transferFrom(_from: address, _to: address, _amount: uint256) -> bool: nonpayable
+
+interface ACL:
+    def hasPermission(_who: address, _where: address, _what: bytes32) -> bool: view
+
+
+event NewVesting:
+    receiver: indexed(address)
+    vestingId: uint256
+    amount: uint256
+
+
+struct TokenVesting:
+    amount: uint256
+    start: uint64
+    cliff: uint64
+    vesting: uint64
+    revokable: bool
+
+
+MAX_VESTINGS_PER_ADDRESS: constant(uint256) = 50
+MAX_SCRIPT_SIZE: constant(uint256) = 8192
+
+ASSIGN_ROLE_ID: constant(bytes32) = keccak256("ASSIGN_ROLE")
+
+
+initialized: bool
+token: public(address)
+acl: public(address)
+script_executor: public(address)
+vestings: HashMap[address, HashMap[uint256, TokenVesting]]
+vestingsLengths: public(HashMap[address, uint256])
+
+
+@external
+def initialize(_token: address, _acl: address, _script_executor: address):
+    """
+    @param _token The MiniMe token controlled by the app
+    @param _acl The ACL app checking the roles
+    @param _script_executor The EVM call script executor used by `forward`
+    """
+    assert not self.initialized, "INIT_ALREADY_INITIALIZED"
+    self.initialized = True
+    self.token = _token
+    self.acl = _acl
+    self.script_executor = _script_executor
+
+
+@external
+@view
+def ASSIGN_ROLE() -> bytes32:
+    return ASSIGN_ROLE_ID
+
+
+@external
+@view
+def isForwarder() -> bool:
+    return True
+
+
+@internal
+@view
+def _can_forward(_sender: address) -> bool:
+    return MiniMeToken(self.token).balanceOf(_sender) > 0
+
+
+@external
+@view
+def canForward(_sender: address, _evm_script: Bytes[MAX_SCRIPT_SIZE]) -> bool:
+    return self._can_forward(_sender)
+
+
+@external
+def forward(_evm_script: Bytes[MAX_SCRIPT_SIZE]):
+    """
+    @notice Executes the script on behalf of the app, the token itself can't be called
+    """
+    assert self._can_forward(msg.sender), "TM_CAN_NOT_FORWARD"
+    raw_call(
+        self.script_executor,
+        _abi_encode(_evm_script, self.token, method_id=method_id("execScript(bytes,address)")),
+        is_delegate_call=True
+    )
+
+
+@internal
+def _assign(_receiver: address, _amount: uint256):
+    assert MiniMeToken(self.token).transferFrom(self, _receiver, _amount), "TM_ASSIGN_TRANSFER_FROM_REVERTED"
+
+
+@external
+def assign(_receiver: address, _amount: uint256):
+    assert ACL(self.acl).hasPermission(msg.sender, self, ASSIGN_ROLE_ID), "APP_AUTH_FAILED"
+    self._assign(_receiver, _amount)
+
+
+@external
+def assignVested(
+    _receiver: address,
+    _amount: uint256,
+    _start: uint64,
+    _cliff: uint64,
+    _vested: uint64,
+    _revokable: bool
+) -> uint256:
+    assert ACL(self.acl).hasPermission(msg.sender, self, ASSIGN_ROLE_ID), "APP_AUTH_FAILED"
+
+    vesting_id: uint256 = self.vestingsLengths[_receiver]
+    assert vesting_id < MAX_VESTINGS_PER_ADDRESS, "TM_TOO_MANY_VESTINGS"
+    assert _start <= _cliff and _cliff <= _vested, "TM_WRONG_CLIFF_DATE"
+
+    self.vestingsLengths[_receiver] = vesting_id + 1
+    self.vestings[_receiver][vesting_id] = TokenVesting({
+        amount: _amount,
+        start: _start,
+        cliff: _cliff,
+        vesting: _vested,
+        revokable: _revokable
+    })
+
+    self._assign(_receiver, _amount)
+
+    log NewVesting(_receiver, vesting_id, _amount)
+    return vesting_id
+
+
+@external
+@view
+def getVesting(_recipient: address, _vesting_id: uint256) -> (uint256, uint64, uint64, uint64, bool):
+    assert _vesting_id < self.vestingsLengths[_recipient], "TM_NO_VESTING"
+    vesting: TokenVesting = self.vestings[_recipient][_vesting_id]
+    return (vesting.amount, vesting.start, vesting.cliff, vesting.vesting, vesting.revokable)
+
+
+@internal
+@pure
+def _calculate_non_vested_tokens(
+    _tokens: uint256,
+    _time: uint256,
+    _start: uint256,
+    _cliff: uint256,
+    _vested: uint256
+) -> uint256:
+    if _time >= _vested:
+        return 0
+    if _time < _cliff:
+        return _tokens
+    vested_tokens: uint256 = _tokens * (_time - _start) / (_vested - _start)
+    return _tokens - vested_tokens
+
+
+@internal
+@view
+def _transferable_balance(_holder: address, _time: uint256) -> uint256:
+    transferable: uint256 = MiniMeToken(self.token).balanceOf(_holder)
+    vestings_count: uint256 = self.vestingsLengths[_holder]
+
+    for i in range(MAX_VESTINGS_PER_ADDRESS):
+        if i >= vestings_count:
+            break
+        vesting: TokenVesting = self.vestings[_holder][i]
+        transferable -= self._calculate_non_vested_tokens(
+            vesting.amount,
+            _time,
+            convert(vesting.start, uint256),
+            convert(vesting.cliff, uint256),
+            convert(vesting.vesting, uint256)
+        )
+
+    return transferable
+
+
+@external
+@view
+def transferableBalance(_holder: address, _time: uint256) -> uint256:
+    return self._transferable_balance(_holder, _time)
+
+
+@external
+@view
+def spendableBalanceOf(_holder: address) -> uint256:
+    return self._transferable_balance(_holder, block.timestamp)
+
+
+@external
+def onTransfer(_from: address, _to: address, _amount: uint256) -> bool:
+    assert msg.sender == self.token, "TM_CALLER_NOT_TOKEN"
+    return self._transferable_balance(_from, block.timestamp) >= _amount
+
+
+@external
+def onApprove(_owner: address, _spender: address, _amount: uint256) -> bool:
+    assert msg.sender == self.token, "TM_CALLER_NOT_TOKEN"
+    return True
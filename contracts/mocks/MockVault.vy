@@ -0,0 +1,69 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon Vault (Agent) app holding the DAO treasury
+from vyper.interfaces import ERC20
+
+
+interface ACL:
+    def hasPermission(_who: address, _where: address, _what: bytes32) -> bool: view
+
+
+event VaultTransfer:
+    token: indexed(address)
+    to: indexed(address)
+    amount: uint256
+
+event VaultDeposit:
+    token: indexed(address)
+    sender: indexed(address)
+    amount: uint256
+
+
+ETH: constant(address) = empty(address)
+TRANSFER_ROLE_ID: constant(bytes32) = keccak256("TRANSFER_ROLE")
+
+
+initialized: bool
+acl: public(address)
+
+
+@external
+def initialize(_acl: address):
+    assert not self.initialized, "INIT_ALREADY_INITIALIZED"
+    self.initialized = True
+    self.acl = _acl
+
+
+@external
+@view
+def TRANSFER_ROLE() -> bytes32:
+    return TRANSFER_ROLE_ID
+
+
+@external
+@payable
+def deposit(_token: address, _value: uint256):
+    assert _value > 0, "VAULT_DEPOSIT_VALUE_ZERO"
+    if _token == ETH:
+        assert msg.value == _value, "VAULT_VALUE_MISMATCH"
+    else:
+        assert ERC20(_token).transferFrom(msg.sender, self, _value), "VAULT_TOKEN_TRANSFER_FROM_REVERT"
+    log VaultDeposit(_token, msg.sender, _value)
+
+
+@external
+def transfer(_token: address, _to: address, _value: uint256):
+    assert ACL(self.acl).hasPermission(msg.sender, self, TRANSFER_ROLE_ID), "APP_AUTH_FAILED"
+    assert _value > 0, "VAULT_TRANSFER_VALUE_ZERO"
+    if _token == ETH:
+        send(_to, _value)
+    else:
+        assert ERC20(_token).transfer(_to, _value), "VAULT_TOKEN_TRANSFER_REVERTED"
+    log VaultTransfer(_token, _to, _value)
+
+
+@external
+@payable
+def __default__():
+    log VaultDeposit(ETH, msg.sender, msg.value)
@@ -0,0 +1,278 @@
+# @version 0.3.6
+# @author Lido <info@lido.fi>
+# @licence MIT
+# Test stand-in for the Aragon Voting app. The stake of a voter is their token balance
+# at the moment of voting since the mock token keeps no balance history.
+
+
+interface MiniMeToken:
+    def balanceOf(_owner: address) -> uint256: view
+    def totalSupply() -> uint256: view
+
+interface ACL:
+    def hasPermission(_who: address, _where: address, _what: bytes32) -> bool: view
+
+
+event StartVote:
+    voteId: indexed(uint256)
+    creator: indexed(address)
+    metadata: String[MAX_METADATA_SIZE]
+
+event CastVote:
+    voteId: indexed(uint256)
+    voter: indexed(address)
+    supports: bool
+    stake: uint256
+
+event ExecuteVote:
+    voteId: indexed(uint256)
+
+
+struct Vote:
+    executed: bool
+    startDate: uint64
+    snapshotBlock: uint64
+    supportRequiredPct: uint64
+    minAcceptQuorumPct: uint64
+    yea: uint256
+    nay: uint256
+    votingPower: uint256
+    executionScript: Bytes[MAX_SCRIPT_SIZE]
+
+
+MAX_SCRIPT_SIZE: constant(uint256) = 8192
+MAX_METADATA_SIZE: constant(uint256) = 1024
+
+PCT_BASE: constant(uint256) = 10**18
+CREATE_VOTES_ROLE_ID: constant(bytes32) = keccak256("CREATE_VOTES_ROLE")
+
+VOTER_STATE_ABSENT: constant(uint8) = 0
+VOTER_STATE_YEA: constant(uint8) = 1
+VOTER_STATE_NAY: constant(uint8) = 2
+
+
+initialized: bool
+token: public(address)
+acl: public(address)
+script_executor: public(address)
+supportRequiredPct: public(uint64)
+minAcceptQuorumPct: public(uint64)
+voteTime: public(uint64)
+votesLength: public(uint256)
+votes: HashMap[uint256, Vote]
+voter_states: HashMap[uint256, HashMap[address, uint8]]
+voter_stakes: HashMap[uint256, HashMap[address, uint256]]
+
+
+@external
+def initialize(
+    _token: address,
+    _acl: address,
+    _script_executor: address,
+    _support_required_pct: uint64,
+    _min_accept_quorum_pct: uint64,
+    _vote_time: uint64
+):
+    """
+    @param _token The MiniMe token used for voting
+    @param _acl The ACL app checking the roles
+    @param _script_executor The EVM call script executor used to execute the passed votes
+    @param _support_required_pct Required share of yea votes among all votes, 10**18 being 100%
+    @param _min_accept_quorum_pct Required share of yea votes in the total supply, 10**18 being 100%
+    @param _vote_time Vote duration, in seconds
+    """
+    assert not self.initialized, "INIT_ALREADY_INITIALIZED"
+    assert _min_accept_quorum_pct <= _support_required_pct, "VOTING_INIT_PCTS"
+    assert convert(_support_required_pct, uint256) < PCT_BASE, "VOTING_INIT_SUPPORT_TOO_BIG"
+    self.initialized = True
+    self.token = _token
+    self.acl = _acl
+    self.script_executor = _script_executor
+    self.supportRequiredPct = _support_required_pct
+    self.minAcceptQuorumPct = _min_accept_quorum_pct
+    self.voteTime = _vote_time
+
+
+@external
+@view
+def CREATE_VOTES_ROLE() -> bytes32:
+    return CREATE_VOTES_ROLE_ID
+
+
+@external
+@view
+def PCT_BASE() -> uint256:
+    return PCT_BASE
+
+
+@internal
+@pure
+def _is_value_pct(_value: uint256, _total: uint256, _pct: uint64) -> bool:
+    if _total == 0:
+        return False
+    return _value * PCT_BASE / _total > convert(_pct, uint256)
+
+
+@internal
+@view
+def _is_vote_open(_vote_id: uint256) -> bool:
+    vote_end: uint256 = convert(self.votes[_vote_id].startDate, uint256) + convert(self.voteTime, uint256)
+    return block.timestamp < vote_end and not self.votes[_vote_id].executed
+
+
+@internal
+@view
+def _can_vote(_vote_id: uint256, _voter: address) -> bool:
+    return self._is_vote_open(_vote_id) and MiniMeToken(self.token).balanceOf(_voter) > 0
+
+
+@internal
+@view
+def _can_execute(_vote_id: uint256) -> bool:
+    if self.votes[_vote_id].executed:
+        return False
+
+    yea: uint256 = self.votes[_vote_id].yea
+    voting_power: uint256 = self.votes[_vote_id].votingPower
+    support_required_pct: uint64 = self.votes[_vote_id].supportRequiredPct
+
+    # the vote is already decided
+    if self._is_value_pct(yea, voting_power, support_required_pct):
+        return True
+
+    if self._is_vote_open(_vote_id):
+        return False
+
+    if not self._is_value_pct(yea, yea + self.votes[_vote_id].nay, support_required_pct):
+        return False
+
+    return self._is_value_pct(yea, voting_power, self.votes[_vote_id].minAcceptQuorumPct)
+
+
+@internal
+def _vote(_vote_id: uint256, _supports: bool, _voter: address, _executes_if_decided: bool):
+    stake: uint256 = MiniMeToken(self.token).balanceOf(_voter)
+
+    # a voter can change their vote, revert the previous one first
+    previous_state: uint8 = self.voter_states[_vote_id][_voter]
+    previous_stake: uint256 = self.voter_stakes[_vote_id][_voter]
+    if previous_state == VOTER_STATE_YEA:
+        self.votes[_vote_id].yea -= previous_stake
+    elif previous_state == VOTER_STATE_NAY:
+        self.votes[_vote_id].nay -= previous_stake
+
+    if _supports:
+        self.votes[_vote_id].yea += stake
+        self.voter_states[_vote_id][_voter] = VOTER_STATE_YEA
+    else:
+        self.votes[_vote_id].nay += stake
+        self.voter_states[_vote_id][_voter] = VOTER_STATE_NAY
+    self.voter_stakes[_vote_id][_voter] = stake
+
+    log CastVote(_vote_id, _voter, _supports, stake)
+
+    if _executes_if_decided and self._can_execute(_vote_id):
+        self._execute_vote(_vote_id)
+
+
+@internal
+def _execute_vote(_vote_id: uint256):
+    self.votes[_vote_id].executed = True
+    raw_call(
+        self.script_executor,
+        _abi_encode(
+            self.votes[_vote_id].executionScript,
+            empty(address),
+            method_id=method_id("execScript(bytes,address)")
+        ),
+        is_delegate_call=True
+    )
+    log ExecuteVote(_vote_id)
+
+
+@external
+def newVote(
+    _execution_script: Bytes[MAX_SCRIPT_SIZE],
+    _metadata: String[MAX_METADATA_SIZE],
+    _cast_vote: bool = True,
+    _executes_if_decided: bool = True
+) -> uint256:
+    assert ACL(self.acl).hasPermission(msg.sender, self, CREATE_VOTES_ROLE_ID), "APP_AUTH_FAILED"
+
+    voting_power: uint256 = MiniMeToken(self.token).totalSupply()
+    assert voting_power > 0, "VOTING_NO_VOTING_POWER"
+
+    vote_id: uint256 = self.votesLength
+    self.votesLength = vote_id + 1
+    self.votes[vote_id] = Vote({
+        executed: False,
+        startDate: convert(block.timestamp, uint64),
+        snapshotBlock: convert(block.number - 1, uint64),
+        supportRequiredPct: self.supportRequiredPct,
+        minAcceptQuorumPct: self.minAcceptQuorumPct,
+        yea: 0,
+        nay: 0,
+        votingPower: voting_power,
+        executionScript: _execution_script
+    })
+
+    log StartVote(vote_id, msg.sender, _metadata)
+
+    if _cast_vote and self._can_vote(vote_id, msg.sender):
+        self._vote(vote_id, True, msg.sender, _executes_if_decided)
+
+    return vote_id
+
+
+@external
+def vote(_vote_id: uint256, _supports: bool, _executes_if_decided: bool):
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    assert self._can_vote(_vote_id, msg.sender), "VOTING_CAN_NOT_VOTE"
+    self._vote(_vote_id, _supports, msg.sender, _executes_if_decided)
+
+
+@external
+def executeVote(_vote_id: uint256):
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    assert self._can_execute(_vote_id), "VOTING_CAN_NOT_EXECUTE"
+    self._execute_vote(_vote_id)
+
+
+@external
+@view
+def canVote(_vote_id: uint256, _voter: address) -> bool:
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    return self._can_vote(_vote_id, _voter)
+
+
+@external
+@view
+def canExecute(_vote_id: uint256) -> bool:
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    return self._can_execute(_vote_id)
+
+
+@external
+@view
+def getVoterState(_vote_id: uint256, _voter: address) -> uint8:
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    return self.voter_states[_vote_id][_voter]
+
+
+@external
+@view
+def getVote(_vote_id: uint256) -> (bool, bool, uint64, uint64, uint64, uint64, uint256, uint256, uint256, Bytes[MAX_SCRIPT_SIZE]):
+    assert _vote_id < self.votesLength, "VOTING_NO_VOTE"
+    vote: Vote = self.votes[_vote_id]
+    return (
+        self._is_vote_open(_vote_id),
+        vote.executed,
+        vote.startDate,
+        vote.snapshotBlock,
+        vote.supportRequiredPct,
+        vote.minAcceptQuorumPct,
+        vote.yea,
+        vote.nay,
+        vote.votingPower,
+        vote.executionScript
+    )
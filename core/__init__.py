@@ -0,0 +1,3 @@
+# Offline parts of the tooling: allocation math, purchasers list loading, vote script encoding
+# and role hashing. Modules of this package only depend on the standard library and the eth
+# encoding libraries, so they don't pay for importing brownie and can be used without a node.
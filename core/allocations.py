@@ -0,0 +1,23 @@
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def get_dai_cost(ldo_allocation, dai_to_ldo_rate):
+    # same rounding as in the executor: the cost is rounded down
+    return ldo_allocation * DAI_TO_LDO_RATE_PRECISION // dai_to_ldo_rate
+
+
+def get_allocations_total(ldo_purchasers):
+    return sum([ allocation for (_, allocation) in ldo_purchasers ])
+
+
+def pad_purchasers(ldo_purchasers, max_purchasers=MAX_PURCHASERS):
+    # `(recipients, allocations)` padded by zeroes, as the executor constructor takes them
+    assert len(ldo_purchasers) <= max_purchasers, f'too many purchasers: max {max_purchasers}, got {len(ldo_purchasers)}'
+
+    zero_padding_len = max_purchasers - len(ldo_purchasers)
+    ldo_recipients = [ p[0] for p in ldo_purchasers ] + [ZERO_ADDRESS] * zero_padding_len
+    ldo_allocations = [ p[1] for p in ldo_purchasers ] + [0] * zero_padding_len
+
+    return (ldo_recipients, ldo_allocations)
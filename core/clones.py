@@ -0,0 +1,17 @@
+from eth_utils import to_checksum_address
+
+# EIP-1167 minimal proxies: the runtime code of a proxy is fixed up to the implementation
+# address, so whether a deployed executor is a clone and of what can be told by its code alone.
+
+CLONE_CODE_PREFIX = bytes.fromhex('363d3d373d3d3d363d73')
+CLONE_CODE_SUFFIX = bytes.fromhex('5af43d82803e903d91602b57fd5bf3')
+
+
+def get_clone_implementation(code):
+    # the implementation address, or None if the code isn't a minimal proxy
+    code = bytes(code)
+    if len(code) != len(CLONE_CODE_PREFIX) + 20 + len(CLONE_CODE_SUFFIX):
+        return None
+    if not code.startswith(CLONE_CODE_PREFIX) or not code.endswith(CLONE_CODE_SUFFIX):
+        return None
+    return to_checksum_address(code[len(CLONE_CODE_PREFIX):-len(CLONE_CODE_SUFFIX)])
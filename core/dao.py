@@ -0,0 +1,79 @@
+from functools import lru_cache
+import eth_abi
+from eth_utils import keccak
+
+from core.evm_script import EMPTY_CALLSCRIPT, to_bytes
+
+# Vote scripts are encoded locally: Aragon role IDs are `keccak256` of the role name and
+# the app functions are known by signature, so building a script needs no network access.
+
+NEW_VOTE_SIGNATURE = 'newVote(bytes,string,bool,bool)'
+NEW_IMMEDIATE_PAYMENT_SIGNATURE = 'newImmediatePayment(address,address,uint256,string)'
+GRANT_PERMISSION_SIGNATURE = 'grantPermission(address,address,bytes32)'
+REVOKE_PERMISSION_SIGNATURE = 'revokePermission(address,address,bytes32)'
+
+
+@lru_cache(maxsize=None)
+def get_role_id(role_name):
+    return keccak(text=role_name)
+
+
+@lru_cache(maxsize=None)
+def get_selector(signature):
+    return keccak(text=signature)[:4]
+
+
+@lru_cache(maxsize=None)
+def _get_argument_types(signature):
+    arguments = signature[signature.index('(') + 1:-1]
+    return arguments.split(',') if arguments else []
+
+
+def _to_address(value):
+    # accepts addresses and brownie accounts and contracts
+    return getattr(value, 'address', value)
+
+
+def encode_function_call(signature, args=()):
+    arg_types = _get_argument_types(signature)
+    assert len(arg_types) == len(args), f'{signature}: expected {len(arg_types)} arguments, got {len(args)}'
+    args = [ _to_address(arg) if arg_type == 'address' else arg for (arg_type, arg) in zip(arg_types, args) ]
+    return '0x' + (get_selector(signature) + eth_abi.encode_abi(arg_types, args)).hex()
+
+
+def encode_new_vote(voting, vote_desc, evm_script):
+    return (
+        _to_address(voting),
+        encode_function_call(NEW_VOTE_SIGNATURE, [
+            bytes(to_bytes(evm_script if evm_script is not None else EMPTY_CALLSCRIPT)),
+            vote_desc,
+            False,
+            False
+        ])
+    )
+
+
+def encode_token_transfer(token_address, recipient, amount, reference, finance):
+    return (
+        _to_address(finance),
+        encode_function_call(NEW_IMMEDIATE_PAYMENT_SIGNATURE, [
+            token_address,
+            recipient,
+            amount,
+            reference
+        ])
+    )
+
+
+def encode_permission_grant(target_app, permission_name, grant_to, acl):
+    return (
+        _to_address(acl),
+        encode_function_call(GRANT_PERMISSION_SIGNATURE, [grant_to, target_app, get_role_id(permission_name)])
+    )
+
+
+def encode_permission_revoke(target_app, permission_name, revoke_from, acl):
+    return (
+        _to_address(acl),
+        encode_function_call(REVOKE_PERMISSION_SIGNATURE, [revoke_from, target_app, get_role_id(permission_name)])
+    )
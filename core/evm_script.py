@@ -0,0 +1,64 @@
+import struct
+from functools import lru_cache
+from eth_utils import to_checksum_address
+
+EMPTY_CALLSCRIPT = '0x00000001'
+
+# each action is the 20-byte target address, the 4-byte calldata length and the calldata
+ACTION_HEADER_LENGTH = 24
+
+def create_executor_id(id):
+    return '0x' + str(id).zfill(8)
+
+def strip_byte_prefix(hexstr):
+    return hexstr[2:] if hexstr[0:2] == '0x' else hexstr
+
+def to_bytes(value):
+    # accepts hex strings with or without the prefix, bytes and brownie accounts and contracts
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return value
+    return bytes.fromhex(strip_byte_prefix(str(value)))
+
+def encode_call_script(actions, spec_id = 1):
+    # the script is written into a buffer allocated once, so encoding is linear in its size
+    encoded_actions = [ (to_bytes(to), to_bytes(calldata)) for to, calldata in actions ]
+    executor_id = bytes.fromhex(strip_byte_prefix(create_executor_id(spec_id)))
+
+    script = bytearray(len(executor_id) + sum([
+        ACTION_HEADER_LENGTH + len(calldata) for (_, calldata) in encoded_actions
+    ]))
+    script[0:len(executor_id)] = executor_id
+
+    location = len(executor_id)
+    for (to, calldata) in encoded_actions:
+        assert len(to) == 20, f'invalid address length {len(to)}'
+        script[location:location + 20] = to
+        struct.pack_into('>I', script, location + 20, len(calldata))
+        location += ACTION_HEADER_LENGTH
+        script[location:location + len(calldata)] = calldata
+        location += len(calldata)
+
+    return '0x' + script.hex()
+
+@lru_cache(maxsize=1024)
+def _checksum_address(address_bytes):
+    # vote scripts call a handful of contracts, so the address hashing is cached
+    return to_checksum_address(address_bytes)
+
+def iter_call_script(script):
+    # yields `(to, calldata)` with the calldata being a memoryview into the script
+    script_bytes = memoryview(to_bytes(script))
+    assert script_bytes[0:4] == to_bytes(create_executor_id(1)), 'unsupported script spec id'
+
+    location = 4
+    while location < len(script_bytes):
+        assert location + ACTION_HEADER_LENGTH <= len(script_bytes), 'invalid call script length'
+        to = _checksum_address(script_bytes[location:location + 20].tobytes())
+        (calldata_length,) = struct.unpack_from('>I', script_bytes, location + 20)
+        location += ACTION_HEADER_LENGTH
+        assert location + calldata_length <= len(script_bytes), 'invalid call script length'
+        yield (to, script_bytes[location:location + calldata_length])
+        location += calldata_length
+
+def decode_call_script(script):
+    return [ (to, '0x' + calldata.hex()) for (to, calldata) in iter_call_script(script) ]
@@ -0,0 +1,96 @@
+import csv
+from eth_hash.auto import keccak
+
+# The purchasers list is a CSV file of `address, LDO wei amount` rows; lines starting with `#`
+# are comments. It's read row by row, so files with hundreds of thousands of rows can be checked
+# or fed into the Merkle tree builder without keeping them in memory: only the index of seen
+# addresses grows with the number of purchasers.
+
+ZERO_ADDRESS_BYTES = b'\x00' * 20
+
+
+class PurchasersFileError(ValueError):
+    def __init__(self, filename, errors):
+        # `errors` is a list of `(line_number, message)` pairs, line number being None
+        # for the errors about the whole file
+        self.filename = filename
+        self.errors = errors
+        lines = [ f'  line {line}: {message}' if line is not None else f'  {message}' for (line, message) in errors ]
+        super().__init__(f'{filename}: {len(errors)} invalid entries\n' + '\n'.join(lines))
+
+
+def _to_checksum_address(address_hex):
+    # EIP-55 of a lowercase address without the prefix, lighter than `eth_utils.to_checksum_address`
+    digest = keccak(address_hex.encode()).hex()
+    return '0x' + ''.join([ char.upper() if nibble in '89abcdef' else char for (char, nibble) in zip(address_hex, digest) ])
+
+
+def _parse_address(value):
+    if len(value) != 42 or value[0:2] != '0x':
+        return (None, f'invalid address {value}')
+    try:
+        address_bytes = bytes.fromhex(value[2:])
+    except ValueError:
+        return (None, f'invalid address {value}')
+    if address_bytes == ZERO_ADDRESS_BYTES:
+        return (None, 'zero address')
+    if _to_checksum_address(address_bytes.hex()) != value:
+        return (None, f'invalid address checksum {value}')
+    return (address_bytes, None)
+
+
+def _parse_amount(value):
+    if not value.isdecimal() or not value.isascii():
+        return (None, f'invalid amount {value}')
+    amount = int(value)
+    if amount == 0:
+        return (None, 'zero amount')
+    return (amount, None)
+
+
+def iter_csv_purchasers(filename, total_ldo_sold=None, max_purchasers=None):
+    """
+    Yields `(address, amount)` of each purchaser, validating EIP-55 checksums, amounts and
+    duplicate addresses on the way. Once the file is read, raises `PurchasersFileError`
+    listing every invalid line, as well as the mismatch of the allocations total
+    with `total_ldo_sold` and the excess over `max_purchasers`, if these are given.
+    """
+    errors = []
+    first_lines = {}
+    allocations_total = 0
+
+    with open(filename, newline='') as csvfile:
+        reader = csv.reader(csvfile, delimiter=',', quotechar='"', skipinitialspace=True)
+        for row in reader:
+            if len(row) == 0 or row[0].startswith('#'):
+                continue
+            line = reader.line_num
+
+            if len(row) != 2:
+                errors.append((line, f'expected 2 columns, got {len(row)}'))
+                continue
+
+            ((address_bytes, address_error), (amount, amount_error)) = (_parse_address(row[0]), _parse_amount(row[1]))
+            if address_bytes is not None and address_bytes in first_lines:
+                address_error = f'duplicate address {row[0]}, first listed on line {first_lines[address_bytes]}'
+
+            errors += [ (line, error) for error in (address_error, amount_error) if error is not None ]
+            if address_error is not None or amount_error is not None:
+                continue
+
+            first_lines[address_bytes] = line
+            allocations_total += amount
+            yield (row[0], amount)
+
+    if max_purchasers is not None and len(first_lines) > max_purchasers:
+        errors.append((None, f'too many purchasers: max {max_purchasers}, got {len(first_lines)}'))
+
+    if total_ldo_sold is not None and not errors and allocations_total != total_ldo_sold:
+        errors.append((None, f'invalid total allocation: expected {total_ldo_sold}, actual {allocations_total}'))
+
+    if errors:
+        raise PurchasersFileError(filename, errors)
+
+
+def read_csv_purchasers(filename, total_ldo_sold, max_purchasers=None):
+    return list(iter_csv_purchasers(filename, total_ldo_sold, max_purchasers))
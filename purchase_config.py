@@ -1,7 +1,9 @@
-import csv
+import os
+from core.purchasers import read_csv_purchasers
 
 # Immutable parameters, don't change these
 MAX_PURCHASERS = 50
+MERKLE_PROOF_MAX_DEPTH = 20
 DAI_TO_LDO_RATE_PRECISION = 10**18
 SECONDS_IN_A_DAY = 60 * 60 * 24
 
@@ -22,21 +24,13 @@ VESTING_END_DELAY = VESTING_START_DELAY
 OFFER_EXPIRATION_DELAY = SECONDS_IN_A_DAY * 30
 
 
-def read_csv_purchasers(filename):
-    data = [ (item[0], int(item[1])) for item in read_csv_data(filename) ]
-    assert len(data) <= MAX_PURCHASERS, f'too many purchasers: max {MAX_PURCHASERS}, got {len(data)}'
+PURCHASERS_FILE = os.environ.get('PURCHASERS_FILE', 'purchasers.csv')
 
-    allocations_total = sum([ item[1] for item in data ])
-    assert allocations_total == TOTAL_LDO_SOLD, f'invalid total allocation: expected {TOTAL_LDO_SOLD}, actual {allocations_total}'
 
-    return data
-
-
-def read_csv_data(filename):
-    with open(filename, newline='') as csvfile:
-        without_comments = (row for row in csvfile if not row.startswith('#'))
-        reader = csv.reader(without_comments, delimiter=',', quotechar='"', skipinitialspace=True)
-        return list(reader)
-
-
-LDO_PURCHASERS = read_csv_purchasers('purchasers.csv')
+def __getattr__(name):
+    # the purchasers list is read on first use, so importing the constants above is cheap
+    if name == 'LDO_PURCHASERS':
+        global LDO_PURCHASERS
+        LDO_PURCHASERS = read_csv_purchasers(PURCHASERS_FILE, TOTAL_LDO_SOLD)
+        return LDO_PURCHASERS
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
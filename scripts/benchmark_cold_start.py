@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import subprocess
+
+from utils.log import nb, ok, warn, highlight as hl
+
+
+# Measures how long a fresh interpreter takes to import the modules used by offline tools
+# and which heavy packages get imported with them. Run from the repo root with
+# `python -m scripts.benchmark_cold_start`.
+
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', '5'))
+
+MODULES = [
+    'core.allocations',
+    'core.purchasers',
+    'core.evm_script',
+    'core.dao',
+    'purchase_config',
+    'utils.config',
+    'utils.merkle',
+    'utils.dao'
+]
+
+HEAVY_PACKAGES = ['brownie', 'web3', 'numpy']
+
+MEASURE_IMPORT = '''
+import sys, json, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+print(json.dumps([elapsed, [ name for name in {heavy_packages!r} if name in sys.modules ]]))
+'''
+
+
+def measure_import(module):
+    # best of `REPEAT` runs, each in a new process, in milliseconds
+    results = []
+    for _ in range(0, REPEAT):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE_IMPORT.format(module=module, heavy_packages=HEAVY_PACKAGES)],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    (elapsed, heavy_imported) = min(results)
+    return (elapsed * 1000, heavy_imported)
+
+
+def main():
+    nb(f'Import time of each module in a new interpreter, best of {hl(REPEAT)} runs')
+
+    brownie_free = True
+    for module in MODULES:
+        (elapsed_ms, heavy_imported) = measure_import(module)
+        imports = f', imports {", ".join(heavy_imported)}' if heavy_imported else ''
+        print(f'  {module}: {hl(f"{elapsed_ms:.1f}")} ms{imports}')
+        brownie_free = brownie_free and 'brownie' not in heavy_imported
+
+    if brownie_free:
+        ok('None of the modules imports brownie')
+    else:
+        warn('Some of the modules import brownie')
+
+
+if __name__ == '__main__':
+    main()
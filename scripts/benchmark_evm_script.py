@@ -0,0 +1,45 @@
+import os
+import random
+import timeit
+
+from utils.evm_script import encode_call_script, decode_call_script, iter_call_script
+from utils.evm_script_fixtures import encode_call_script_by_concatenation, random_actions
+from utils.log import nb, ok, highlight as hl
+
+
+# Micro-benchmark of EVM call script encoding and decoding. Run with
+# `brownie run scripts/benchmark_evm_script.py` or `python -m scripts.benchmark_evm_script`.
+
+ACTIONS_COUNT = int(os.environ.get('BENCHMARK_ACTIONS_COUNT', '1000'))
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', '20'))
+
+
+def measure(fn):
+    # best of `REPEAT` runs, in milliseconds
+    return min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000
+
+
+def main():
+    actions = random_actions(ACTIONS_COUNT, random.Random(1))
+    script = encode_call_script(actions)
+
+    assert script == encode_call_script_by_concatenation(actions)
+    assert decode_call_script(script) == actions
+
+    nb(f'Script of {hl(ACTIONS_COUNT)} actions, {hl((len(script) - 2) // 2)} bytes')
+
+    results = [
+        ('encode_call_script (concatenation)', measure(lambda: encode_call_script_by_concatenation(actions))),
+        ('encode_call_script', measure(lambda: encode_call_script(actions))),
+        ('decode_call_script', measure(lambda: decode_call_script(script))),
+        ('iter_call_script', measure(lambda: sum(1 for _ in iter_call_script(script))))
+    ]
+
+    for (name, elapsed_ms) in results:
+        print(f'  {name}: {hl(f"{elapsed_ms:.2f}")} ms, {hl(f"{elapsed_ms * 1000 / ACTIONS_COUNT:.2f}")} us per action')
+
+    ok('Encoded and decoded scripts match')
+
+
+if __name__ == '__main__':
+    main()
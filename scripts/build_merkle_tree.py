@@ -0,0 +1,35 @@
+import os
+import json
+
+from utils.merkle import build_merkle_claims
+from utils.log import ok, nb, highlight as hl
+
+from purchase_config import LDO_PURCHASERS, TOTAL_LDO_SOLD
+
+
+def main():
+    output_filename = os.environ.get('MERKLE_TREE_FILE', 'merkle_tree.json')
+
+    (merkle_root, claims) = build_merkle_claims(LDO_PURCHASERS)
+
+    nb('Purchasers', len(claims))
+    nb('Merkle root', merkle_root.hex())
+
+    tree = {
+        'merkle_root': '0x' + merkle_root.hex(),
+        'ldo_allocations_total': str(TOTAL_LDO_SOLD),
+        'claims': {
+            purchaser: {
+                'index': claim['index'],
+                'allocation': str(claim['allocation']),
+                'proof': [ '0x' + node.hex() for node in claim['proof'] ]
+            }
+            for (purchaser, claim) in claims.items()
+        }
+    }
+
+    with open(output_filename, 'w') as f:
+        json.dump(tree, f, indent=2)
+
+    ok(f'Merkle proofs written to {hl(output_filename)}')
+
@@ -1,8 +1,28 @@
 import os
+import time
 import brownie
-from brownie import chain, accounts, interface, PurchaseExecutor
+from eth_utils import to_checksum_address
+from brownie import (
+    chain,
+    accounts,
+    interface,
+    web3,
+    PurchaseExecutor,
+    PurchaseExecutorV2,
+    PurchaseExecutorMerkle,
+    PurchaseExecutorClone,
+    PurchaseExecutorFactory
+)
 
 from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_vote
+from utils.multicall import multicall
+from utils.rpc_cache import block_pinned_rpc_cache
+from utils.state_dump import PREPARED_STATE_FILE, read_state_dump, load_state
+from utils.fork_pool import check_reception_in_forks, get_workers_count
+from utils.merkle import build_merkle_claims
+from utils.dao import get_role_id
+from core.allocations import get_dai_cost, pad_purchasers
+from core.clones import get_clone_implementation
 from utils.log import ok, warn, nb, h, assert_equals, highlight as hl
 from utils.config import (
     ldo_token_address,
@@ -14,8 +34,8 @@ from utils.config import (
 )
 
 from purchase_config import (
+    MAX_PURCHASERS,
     SECONDS_IN_A_DAY,
-    DAI_TO_LDO_RATE_PRECISION,
     DAI_TO_LDO_RATE,
     VESTING_START_DELAY,
     VESTING_END_DELAY,
@@ -24,23 +44,71 @@ from purchase_config import (
     TOTAL_LDO_SOLD
 )
 
+DAI_BANKER_ADDRESS = '0x075e72a5edf65f0a5f44699c7654c1a76941ddc8'
+
+# trying transfers at each delay takes a snapshot, a time jump and a transaction per purchaser
+# and delay, so by default the lock-up is read from TokenManager at the simulated times instead
+FAITHFUL_LOCKUP_CHECK = os.environ.get('FAITHFUL_LOCKUP_CHECK', '') == '1'
+
+
 def main():
-    if 'EXECUTOR_ADDRESS' not in os.environ:
+    prepared_state = load_prepared_state() if 'PREPARED_STATE_FILE' in os.environ else {}
+
+    if 'EXECUTOR_ADDRESS' not in os.environ and 'executor_address' not in prepared_state:
         raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
 
-    executor_address = os.environ['EXECUTOR_ADDRESS']
+    executor_address = os.environ.get('EXECUTOR_ADDRESS', prepared_state.get('executor_address'))
     nb('Using deployed executor at address', executor_address)
 
-    executor = PurchaseExecutor.at(executor_address)
+    executor_mode = os.environ.get('EXECUTOR_MODE', prepared_state.get('executor_mode', 'list'))
+
+    if executor_mode == 'merkle':
+        nb('Checking Merkle-root executor')
+        executor = PurchaseExecutorMerkle.at(executor_address)
+        (merkle_root, merkle_claims) = build_merkle_claims(LDO_PURCHASERS)
+    elif executor_mode in ['list', 'list-direct']:
+        executor = PurchaseExecutor.at(executor_address)
+        (merkle_root, merkle_claims) = (None, None)
+    elif executor_mode in ['v2', 'v2-direct']:
+        nb('Checking v2 executor')
+        executor = PurchaseExecutorV2.at(executor_address)
+        (merkle_root, merkle_claims) = (None, None)
+    elif executor_mode in ['clone', 'clone-direct']:
+        nb('Checking clone executor')
+        executor = PurchaseExecutorClone.at(executor_address)
+        (merkle_root, merkle_claims) = (None, None)
+    else:
+        raise EnvironmentError(f'Unknown EXECUTOR_MODE {executor_mode}, expected list, list-direct, v2, v2-direct, clone, clone-direct or merkle')
+
+    if 'CHECK_BLOCK' in os.environ:
+        # the state of a past block doesn't change, so re-runs read it from the cache file
+        block_number = int(os.environ['CHECK_BLOCK'])
+        nb('Reading executor state at pinned block', block_number)
+        started_at = time.perf_counter()
+        with block_pinned_rpc_cache(web3, block_number) as cache:
+            state = read_executor_state(executor, LDO_PURCHASERS, block_number, merkle_claims)
+        nb(f'State read in {hl(f"{time.perf_counter() - started_at:.3f}")} s, {hl(cache.hits)} cached and {hl(cache.misses)} new RPC responses')
+    else:
+        block_number = web3.eth.block_number
+        nb('Reading executor state at block', block_number)
+        state = read_executor_state(executor, LDO_PURCHASERS, block_number, merkle_claims)
 
     print()
-    check_config(executor)
+    check_config(state)
+    if executor_mode in ['clone', 'clone-direct']:
+        print()
+        check_clone(executor, os.environ.get('EXECUTOR_FACTORY_ADDRESS', prepared_state.get('factory_address')))
+    if executor_mode != 'merkle':
+        print()
+        check_settlement(executor, executor_mode.endswith('-direct'))
+    if merkle_root is not None:
+        check_merkle_root(state, merkle_root)
     print()
-    check_permissions(executor)
+    check_permissions(state)
     print()
-    check_allocations(executor)
+    check_allocations(state)
     print()
-    check_funding(executor)
+    check_funding(state)
     print()
 
     ok(f'Executor is configured correctly')
@@ -57,45 +125,142 @@ def main():
                 pass_and_exec_dao_vote(int(vote_id))
             print()
 
-        purchase_timestamps = check_allocations_reception(executor)
-        print()
-        check_lockup(purchase_timestamps)
+        # purchases are split across this many fork nodes, `auto` meaning one per core
+        workers = get_workers_count(os.environ.get('RECEPTION_WORKERS', '1'), len(LDO_PURCHASERS))
+
+        if workers > 1:
+            check_allocations_reception_in_forks(executor, workers, merkle_claims)
+        else:
+            purchase_timestamps = check_allocations_reception(executor, merkle_claims)
+            print()
+            check_lockup(purchase_timestamps)
 
     h(f'All good!')
 
 
-def check_config(executor):
+def load_prepared_state():
+    # starts from the state dumped by `scripts/prepare_state.py` instead of passing the votes
+    if get_is_live():
+        raise EnvironmentError('The prepared state can only be loaded into a development chain')
+
+    dump = read_state_dump(PREPARED_STATE_FILE)
+    if dump is None:
+        raise EnvironmentError(f'No prepared state for this chain in {PREPARED_STATE_FILE}, run scripts/prepare_state.py first')
+
+    nb('Loading prepared state from', PREPARED_STATE_FILE)
+    return load_state(dump)
+
+
+def purchase_args(purchaser, merkle_claims):
+    # arguments of `get_allocation` and `execute_purchase`, which are the same for both executors
+    if merkle_claims is None:
+        return [purchaser]
+    claim = merkle_claims[to_checksum_address(str(purchaser))]
+    return [claim['index'], purchaser, claim['allocation'], claim['proof']]
+
+
+def read_executor_state(executor, purchasers, block_number, merkle_claims=None):
+    # reads everything the checks below need via multicall pinned to `block_number`: the config,
+    # the offer state and the LDO balance in one `offer_state` call and up to 50 allocations per
+    # `get_allocations` call, so even without Multicall2 a list of 50 purchasers takes 3 calls
+    acl = interface.ACL(lido_dao_acl_address)
+
+    calls = [
+        (executor.offer_state, []),
+        (acl.hasPermission['address,address,bytes32'], [executor.address, lido_dao_token_manager_address, get_role_id('ASSIGN_ROLE')])
+    ]
+
+    if merkle_claims is None:
+        batches = [ purchasers[i:i + MAX_PURCHASERS] for i in range(0, len(purchasers), MAX_PURCHASERS) ]
+        calls += [ (executor.get_allocations, [pad_purchasers(batch)[0]]) for batch in batches ]
+    else:
+        calls += [ (executor.merkle_root, []) ]
+        calls += [
+            (executor.get_allocation, purchase_args(purchaser, merkle_claims))
+            for (purchaser, _) in purchasers
+        ]
+
+    results = multicall(calls, block_identifier=block_number)
+
+    state = results[0].dict()
+    state['has_assign_role'] = results[1]
+
+    if merkle_claims is None:
+        allocations = []
+        for (batch, (ldo_allocations, dai_costs)) in zip(batches, results[2:]):
+            allocations += list(zip(ldo_allocations, dai_costs))[:len(batch)]
+    else:
+        state['merkle_root'] = results[2]
+        allocations = results[3:]
+
+    state['allocations'] = dict(zip([ purchaser for (purchaser, _) in purchasers ], allocations))
+
+    return state
+
+
+def check_config(state):
     print(f'DAILDO rate: {hl(DAI_TO_LDO_RATE / 10**18)}')
-    assert executor.dai_to_ldo_rate() == DAI_TO_LDO_RATE
+    assert state['dai_to_ldo_rate'] == DAI_TO_LDO_RATE
 
     print(f'LDODAI rate: {hl(10**18 / DAI_TO_LDO_RATE)}')
 
     print(f'Offer expiration delay: {hl(OFFER_EXPIRATION_DELAY / SECONDS_IN_A_DAY)} days')
-    assert executor.offer_expiration_delay() == OFFER_EXPIRATION_DELAY
+    assert state['offer_expiration_delay'] == OFFER_EXPIRATION_DELAY
 
     print(f'Vesting start delay: {hl(VESTING_START_DELAY / SECONDS_IN_A_DAY)} days')
-    assert executor.vesting_start_delay() == VESTING_START_DELAY
+    assert state['vesting_start_delay'] == VESTING_START_DELAY
 
     print(f'Vesting end delay: {hl(VESTING_END_DELAY / SECONDS_IN_A_DAY)} days')
-    assert executor.vesting_end_delay() == VESTING_END_DELAY
+    assert state['vesting_end_delay'] == VESTING_END_DELAY
 
     print()
     ok(f'Global config is correct')
 
 
-def check_permissions(executor):
-    acl = interface.ACL(lido_dao_acl_address)
-    token_manager = interface.TokenManager(lido_dao_token_manager_address)
-    if acl.hasPermission(executor, token_manager, token_manager.ASSIGN_ROLE()):
+def check_clone(executor, factory_address):
+    implementation = get_clone_implementation(web3.eth.get_code(executor.address))
+    assert implementation is not None, 'executor is not an EIP-1167 proxy'
+    print(f'Implementation: {hl(implementation)}')
+
+    if factory_address is None:
+        warn('EXECUTOR_FACTORY_ADDRESS is not set, the implementation is not checked')
+        return
+
+    print(f'Factory: {hl(factory_address)}')
+    assert implementation == PurchaseExecutorFactory.at(factory_address).implementation()
+
+    print()
+    ok(f'Executor is a clone of the factory implementation')
+
+
+def check_settlement(executor, direct_settlement):
+    # either way the DAO agent receives the full DAI cost of each purchase, which the reception
+    # checks verify; direct settlement only skips the approve and `Vault.deposit` calls
+    print(f'DAI settlement: {hl("direct transfer" if direct_settlement else "Vault.deposit")}')
+    assert executor.direct_settlement() == direct_settlement
+
+    print()
+    ok(f'DAI settlement mode is correct')
+
+
+def check_merkle_root(state, merkle_root):
+    print(f'Merkle root: {hl(merkle_root.hex())}')
+    assert bytes(state['merkle_root']) == merkle_root
+
+    print()
+    ok(f'Merkle root matches the purchasers list')
+
+
+def check_permissions(state):
+    if state['has_assign_role']:
         ok('Executor has permission to assign tokens')
     else:
         warn('Executor has no permission to assign tokens')
 
 
-def check_funding(executor):
-    ldo_token = interface.ERC20(ldo_token_address)
-    total_ldo_sold = executor.ldo_allocations_total()
-    exec_ldo_balance = ldo_token.balanceOf(executor)
+def check_funding(state):
+    total_ldo_sold = state['ldo_allocations_total']
+    exec_ldo_balance = state['ldo_balance']
     if exec_ldo_balance == total_ldo_sold:
         ok(f'Executor is funded, balance: {hl(exec_ldo_balance / 10**18)} LDO')
     elif exec_ldo_balance > total_ldo_sold:
@@ -105,14 +270,14 @@ def check_funding(executor):
         warn(f'Executor is under-funded, balance: {hl(exec_ldo_balance / 10**18)} LDO')
 
 
-def check_allocations(executor):
+def check_allocations(state):
     print(f'Total allocation: {hl(TOTAL_LDO_SOLD / 10**18)} LDO')
-    assert executor.ldo_allocations_total() == TOTAL_LDO_SOLD
+    assert state['ldo_allocations_total'] == TOTAL_LDO_SOLD
 
     for (purchaser, expected_allocation) in LDO_PURCHASERS:
-        (allocation, dai_cost) = executor.get_allocation(purchaser)
+        (allocation, dai_cost) = state['allocations'][purchaser]
         print(f'  {purchaser}: {hl(allocation / 10**18)} LDO, {hl(dai_cost / 10**18)} DAI')
-        expected_cost = expected_allocation * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+        expected_cost = get_dai_cost(expected_allocation, DAI_TO_LDO_RATE)
         assert allocation == expected_allocation
         assert dai_cost == expected_cost
 
@@ -120,23 +285,28 @@ def check_allocations(executor):
     ok(f'Allocations are correct')
 
 
-def check_allocations_reception(executor):
-    dai_banker = accounts.at('0x075e72a5edf65f0a5f44699c7654c1a76941ddc8', force=True)
-
-    dai_token = interface.ERC20(dai_token_address)
-    ldo_token = interface.ERC20(ldo_token_address)
-    lido_dao_agent = interface.Agent(lido_dao_agent_address)
-    executor_ldo_balance = ldo_token.balanceOf(executor.address)
+def check_offer_state(executor):
+    state = executor.offer_state().dict()
 
-    assert executor_ldo_balance == TOTAL_LDO_SOLD
+    assert state['ldo_balance'] == TOTAL_LDO_SOLD
     ok(f'Executor LDO balance: {hl(TOTAL_LDO_SOLD / 10**18)} LDO')
 
-    assert executor.offer_started()
+    assert state['offer_started']
     ok('Offer started')
 
-    assert executor.offer_expires_at() == executor.offer_started_at() + OFFER_EXPIRATION_DELAY
+    assert state['offer_expires_at'] == state['offer_started_at'] + OFFER_EXPIRATION_DELAY
     ok(f'Offer lasts {hl(OFFER_EXPIRATION_DELAY / SECONDS_IN_A_DAY)} days')
 
+
+def check_allocations_reception(executor, merkle_claims=None):
+    dai_banker = accounts.at(DAI_BANKER_ADDRESS, force=True)
+
+    dai_token = interface.ERC20(dai_token_address)
+    ldo_token = interface.ERC20(ldo_token_address)
+    lido_dao_agent = interface.Agent(lido_dao_agent_address)
+
+    check_offer_state(executor)
+
     h(f'Checking allocations reception')
 
     ldo_black_hole = accounts.add()
@@ -145,7 +315,7 @@ def check_allocations_reception(executor):
     dao_agent_dai_balance_before = dai_token.balanceOf(lido_dao_agent)
 
     for i, (purchaser, expected_allocation) in enumerate(LDO_PURCHASERS):
-        (allocation, dai_cost) = executor.get_allocation(purchaser)
+        (allocation, dai_cost) = executor.get_allocation(*purchase_args(purchaser, merkle_claims))
 
         print()
         nb(f'Purchaser: {hl(purchaser)}')
@@ -174,23 +344,27 @@ def check_allocations_reception(executor):
         tx = dai_token.approve(executor, dai_cost, { 'from': purchaser })
         print(f'Tx data: {tx.input}\n')
 
+        dao_agent_dai_balance_before_purchase = dai_token.balanceOf(lido_dao_agent)
+
         print(f'Executing the purchase...')
-        tx = executor.execute_purchase({ 'from': purchaser })
+        tx = executor.execute_purchase(*purchase_args(purchaser, merkle_claims), { 'from': purchaser })
         purchase_timestamps = purchase_timestamps + [tx.timestamp]
         print(f'Tx data: {tx.input}\n')
 
         ldo_purchased = ldo_token.balanceOf(purchaser) - purchaser_ldo_balance_before
         dai_spent = purchaser_dai_balance_before - dai_token.balanceOf(purchaser)
+        dai_received = dai_token.balanceOf(lido_dao_agent) - dao_agent_dai_balance_before_purchase
 
         assert ldo_purchased == allocation
         assert dai_spent == dai_cost
+        assert dai_received == dai_cost
         ok(f'The purchase executed correctly, gas used: {hl(tx.gas_used)}')
 
     print()
     ok('All purchases executed correctly')
     print()
 
-    expected_total_dai_cost = TOTAL_LDO_SOLD * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+    expected_total_dai_cost = get_dai_cost(TOTAL_LDO_SOLD, DAI_TO_LDO_RATE)
     total_dai_received = dai_token.balanceOf(lido_dao_agent) - dao_agent_dai_balance_before
 
     assert_equals('Total DAI received by the DAO', total_dai_received, expected_total_dai_cost)
@@ -204,7 +378,127 @@ def check_allocations_reception(executor):
     return purchase_timestamps
 
 
-def check_lockup(purchase_timestamps):
+def check_allocations_reception_in_forks(executor, workers, merkle_claims=None):
+    check_offer_state(executor)
+
+    h(f'Checking allocations reception in {workers} fork workers')
+
+    # the workers fork this chain, so votes executed above are included
+    block = web3.eth.get_block('latest')
+    nb(f'Forking block {hl(block.number)} from {hl(web3.provider.endpoint_uri)}')
+
+    config = {
+        'executor_address': executor.address,
+        'executor_abi': executor.abi,
+        'erc20_abi': interface.ERC20(ldo_token_address).abi,
+        'dai_token_address': dai_token_address,
+        'ldo_token_address': ldo_token_address,
+        'dao_agent_address': lido_dao_agent_address,
+        'dai_banker_address': to_checksum_address(DAI_BANKER_ADDRESS),
+        'token_manager_address': lido_dao_token_manager_address,
+        'token_manager_abi': interface.TokenManager(lido_dao_token_manager_address).abi,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'faithful_lockup_check': FAITHFUL_LOCKUP_CHECK
+    }
+    # plain web3 only accepts checksummed addresses
+    purchasers = [ (to_checksum_address(purchaser), allocation) for (purchaser, allocation) in LDO_PURCHASERS ]
+    purchases = [
+        (purchaser, expected_allocation, purchase_args(purchaser, merkle_claims))
+        for (purchaser, expected_allocation) in purchasers
+    ]
+
+    (results, totals) = check_reception_in_forks(
+        web3.provider.endpoint_uri,
+        block.number,
+        block.timestamp,
+        config,
+        purchases,
+        workers
+    )
+
+    assert [ result['purchaser'] for result in results ] == [ purchaser for (purchaser, _, _) in purchases ]
+
+    for result in results:
+        print()
+        nb(f'Purchaser: {hl(result["purchaser"])}')
+        nb(f'Total {hl(result["expected_allocation"] / 10**18)} LDO for {hl(result["dai_cost"] / 10**18)} DAI')
+
+        assert result['allocation'] == result['expected_allocation']
+        assert result['ldo_purchased'] == result['allocation']
+        assert result['dai_spent'] == result['dai_cost']
+        assert result['dao_agent_dai_received'] == result['dai_cost']
+        ok(f'The purchase executed correctly, gas used: {hl(result["gas_used"])}')
+
+        assert result['locked_after_purchase']
+        assert result['locked_before_vesting_start']
+        ok('LDO is locked until the vesting start')
+
+        assert result['unlocked_after_vesting_start']
+        ok('LDO is fully transferable after the vesting start')
+
+    print()
+    ok('All purchases executed correctly')
+    print()
+
+    # each worker only sees its own purchases, so the totals are reconciled over all of them
+    expected_total_dai_cost = get_dai_cost(TOTAL_LDO_SOLD, DAI_TO_LDO_RATE)
+    total_dai_spent = sum([ result['dai_spent'] for result in results ])
+
+    assert_equals('Total DAI spent by purchasers', total_dai_spent, expected_total_dai_cost)
+    assert_equals('Total DAI received by the DAO', totals['dao_agent_dai_received'], expected_total_dai_cost)
+    assert_equals('Total LDO sent by the executor', totals['executor_ldo_spent'], TOTAL_LDO_SOLD)
+
+    assert totals['executor_dai_balance'] == 0
+    ok(f'No DAI left on executor')
+
+
+def check_lockup(purchase_timestamps, faithful=FAITHFUL_LOCKUP_CHECK):
+    if faithful:
+        check_lockup_by_transfers(purchase_timestamps)
+        return
+
+    h('Checking lockup')
+
+    assert VESTING_START_DELAY > 0
+    assert VESTING_END_DELAY == VESTING_START_DELAY
+
+    ldo_token = interface.ERC20(ldo_token_address)
+    token_manager = interface.TokenManager(lido_dao_token_manager_address)
+
+    # TokenManager.onTransfer allows a transfer iff it doesn't exceed the transferable balance,
+    # which takes the time as an argument, so all delays are checked without moving the chain
+    delays = [0, VESTING_START_DELAY - 1, VESTING_START_DELAY + 1]
+
+    calls = [ (ldo_token.balanceOf, [purchaser]) for (purchaser, _) in LDO_PURCHASERS ]
+    calls += [
+        (token_manager.transferableBalance, [purchaser, purchase_timestamps[i] + delay])
+        for delay in delays
+        for i, (purchaser, _) in enumerate(LDO_PURCHASERS)
+    ]
+
+    results = multicall(calls)
+
+    purchasers_count = len(LDO_PURCHASERS)
+    balances = results[:purchasers_count]
+    (transferable_at_purchase, transferable_before_unlock, transferable_after_unlock) = [
+        results[purchasers_count * (k + 1):purchasers_count * (k + 2)]
+        for k in range(0, len(delays))
+    ]
+
+    for i, (purchaser, allocation) in enumerate(LDO_PURCHASERS):
+        print(f'\nholder {hl(purchaser)}')
+
+        assert balances[i] == allocation
+
+        assert transferable_at_purchase[i] == 0, f'{purchaser} can transfer LDO right after the purchase'
+        assert transferable_before_unlock[i] == 0, f'{purchaser} can transfer LDO before the lock-up ends'
+        ok('lock-up is effective for the full time period')
+
+        assert transferable_after_unlock[i] == allocation, f'{purchaser} cannot transfer all LDO after the lock-up ends'
+        ok('lock-up is lifted after the lock-up period passes')
+
+
+def check_lockup_by_transfers(purchase_timestamps):
     h('Checking lockup')
 
     assert VESTING_START_DELAY > 0
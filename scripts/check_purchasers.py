@@ -0,0 +1,32 @@
+import os
+import sys
+
+from core.purchasers import iter_csv_purchasers, PurchasersFileError
+from utils.log import ok, nb, warn, highlight as hl
+
+from purchase_config import PURCHASERS_FILE, TOTAL_LDO_SOLD, MAX_PURCHASERS
+
+
+# Validates the purchasers list in a single pass without loading it into memory. Run with
+# `python -m scripts.check_purchasers`; set `PURCHASERS_FILE` to check another file and
+# `EXECUTOR_MODE=merkle` to lift the limit on the number of purchasers.
+
+def main():
+    max_purchasers = None if os.environ.get('EXECUTOR_MODE') == 'merkle' else MAX_PURCHASERS
+
+    (purchasers_count, allocations_total) = (0, 0)
+    try:
+        for (_, allocation) in iter_csv_purchasers(PURCHASERS_FILE, TOTAL_LDO_SOLD, max_purchasers):
+            purchasers_count += 1
+            allocations_total += allocation
+    except PurchasersFileError as err:
+        warn(str(err))
+        sys.exit(1)
+
+    nb('Purchasers', purchasers_count)
+    nb('Total allocation', f'{allocations_total / 10**18} LDO')
+    ok(f'{hl(PURCHASERS_FILE)} is valid')
+
+
+if __name__ == '__main__':
+    main()
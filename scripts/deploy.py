@@ -1,18 +1,32 @@
 import sys
-from brownie import ZERO_ADDRESS
 from utils import config
 
 try:
-    from brownie import PurchaseExecutor, interface
+    from brownie import (
+        PurchaseExecutor,
+        PurchaseExecutorV2,
+        PurchaseExecutorMerkle,
+        PurchaseExecutorClone,
+        PurchaseExecutorFactory,
+        interface
+    )
 except ImportError:
     print("You're probably running inside Brownie console. Please call:")
-    print("set_console_globals(interface=interface, PurchaseExecutor=PurchaseExecutor)")
+    print("set_console_globals(interface=interface, PurchaseExecutor=PurchaseExecutor, PurchaseExecutorV2=PurchaseExecutorV2, PurchaseExecutorMerkle=PurchaseExecutorMerkle, PurchaseExecutorClone=PurchaseExecutorClone, PurchaseExecutorFactory=PurchaseExecutorFactory)")
 
 
 def set_console_globals(**kwargs):
     global PurchaseExecutor
+    global PurchaseExecutorV2
+    global PurchaseExecutorMerkle
+    global PurchaseExecutorClone
+    global PurchaseExecutorFactory
     global interface
     PurchaseExecutor = kwargs['PurchaseExecutor']
+    PurchaseExecutorV2 = kwargs['PurchaseExecutorV2']
+    PurchaseExecutorMerkle = kwargs['PurchaseExecutorMerkle']
+    PurchaseExecutorClone = kwargs['PurchaseExecutorClone']
+    PurchaseExecutorFactory = kwargs['PurchaseExecutorFactory']
     interface = kwargs['interface']
 
 
@@ -21,9 +35,13 @@ from utils.dao import (
     encode_token_transfer,
     encode_permission_grant,
     encode_permission_revoke,
+    encode_function_call,
     encode_call_script
 )
 
+from utils.merkle import build_merkle_claims
+from core.allocations import pad_purchasers, get_allocations_total
+
 from utils.config import (
     ldo_token_address,
     lido_dao_acl_address,
@@ -46,35 +64,33 @@ def propose_vesting_manager_contract(
     tx_params,
     manager_address,
     total_ldo_amount=TOTAL_LDO_SOLD,
-    ldo_transfer_reference='Transfer LDO tokens to be sold for DAI'
+    ldo_transfer_reference='Transfer LDO tokens to be sold for DAI',
+    start_offer=True
 ):
-    acl = interface.ACL(lido_dao_acl_address)
-    voting = interface.Voting(lido_dao_voting_address)
-    finance = interface.Finance(lido_dao_finance_address)
-    token_manager = interface.TokenManager(lido_dao_token_manager_address)
-
-    evm_script = encode_call_script([
+    # the script is encoded locally, the only network call is the vote creation transaction
+    actions = [
         encode_token_transfer(
             token_address=ldo_token_address,
             recipient=manager_address,
             amount=total_ldo_amount,
             reference=ldo_transfer_reference,
-            finance=finance
+            finance=lido_dao_finance_address
         ),
         encode_permission_grant(
-            target_app=token_manager,
+            target_app=lido_dao_token_manager_address,
             permission_name='ASSIGN_ROLE',
             grant_to=manager_address,
-            acl=acl
-        ),
-        (
-            manager_address,
-            PurchaseExecutor.at(manager_address).start.encode_input()
+            acl=lido_dao_acl_address
         )
-    ])
+    ]
+
+    if start_offer:
+        actions.append((manager_address, encode_function_call('start()')))
+
+    evm_script = encode_call_script(actions)
     return create_vote(
-        voting=voting,
-        token_manager=token_manager,
+        voting=lido_dao_voting_address,
+        token_manager=interface.TokenManager(lido_dao_token_manager_address),
         vote_desc=f'Make {manager_address} a vesting manager for total {total_ldo_amount} LDO',
         evm_script=evm_script,
         tx_params=tx_params
@@ -82,27 +98,29 @@ def propose_vesting_manager_contract(
 
 
 def revoke_assign_role(tx_params, revoke_from):
-    acl = interface.ACL(lido_dao_acl_address)
-    voting = interface.Voting(lido_dao_voting_address)
-    token_manager = interface.TokenManager(lido_dao_token_manager_address)
-
     evm_script = encode_call_script([
         encode_permission_revoke(
-            target_app=token_manager,
+            target_app=lido_dao_token_manager_address,
             permission_name='ASSIGN_ROLE',
             revoke_from=revoke_from,
-            acl=acl
+            acl=lido_dao_acl_address
         )
     ])
     return create_vote(
-        voting=voting,
-        token_manager=token_manager,
+        voting=lido_dao_voting_address,
+        token_manager=interface.TokenManager(lido_dao_token_manager_address),
         vote_desc=f'Remoke permissions from the vesting manager contract {revoke_from}',
         evm_script=evm_script,
         tx_params=tx_params
     )
 
 
+def deploy_factory(tx_params):
+    # deployed once; each sale round then only pays for a proxy and the storage of its parameters
+    implementation = PurchaseExecutorClone.deploy(tx_params)
+    return PurchaseExecutorFactory.deploy(implementation, tx_params)
+
+
 def deploy(
     tx_params,
     dai_to_ldo_rate=DAI_TO_LDO_RATE,
@@ -110,34 +128,110 @@ def deploy(
     vesting_end_delay=VESTING_END_DELAY,
     offer_expiration_delay=OFFER_EXPIRATION_DELAY,
     ldo_purchasers=LDO_PURCHASERS,
-    total_ldo_sold=TOTAL_LDO_SOLD
+    total_ldo_sold=TOTAL_LDO_SOLD,
+    use_v2=False,
+    direct_settlement=False,
+    factory=None
 ):
-    zero_padding_len = MAX_PURCHASERS - len(ldo_purchasers)
-    ldo_recipients = [ p[0] for p in ldo_purchasers ] + [ZERO_ADDRESS] * zero_padding_len
-    ldo_allocations = [ p[1] for p in ldo_purchasers ] + [0] * zero_padding_len
+    (ldo_recipients, ldo_allocations) = pad_purchasers(ldo_purchasers, MAX_PURCHASERS)
 
-    return PurchaseExecutor.deploy(
+    args = [
         dai_to_ldo_rate,
         vesting_start_delay,
         vesting_end_delay,
         offer_expiration_delay,
         ldo_recipients,
         ldo_allocations,
+        total_ldo_sold
+    ]
+
+    # the clones have the same interface as v2 but keep the config in the proxy storage
+    if factory is not None:
+        assert not use_v2, 'the factory creates clone executors, not v2 ones'
+        tx = PurchaseExecutorFactory.at(factory).create_executor(*args, direct_settlement, tx_params)
+        return PurchaseExecutorClone.at(tx.events['ExecutorCreated']['executor'])
+
+    # v2 has the same interface but keeps the config in the code instead of the storage
+    if use_v2:
+        return PurchaseExecutorV2.deploy(*args, direct_settlement, tx_params)
+
+    return PurchaseExecutor.deploy(*args, direct_settlement, tx_params)
+
+
+def deploy_and_start_dao_vote(
+    tx_params,
+    dai_to_ldo_rate=DAI_TO_LDO_RATE,
+    vesting_start_delay=VESTING_START_DELAY,
+    vesting_end_delay=VESTING_END_DELAY,
+    offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+    ldo_purchasers=LDO_PURCHASERS,
+    total_ldo_sold = TOTAL_LDO_SOLD,
+    start_offer=True,
+    use_v2=False,
+    direct_settlement=False,
+    factory=None
+):
+    executor = deploy(
+        tx_params=tx_params,
+        dai_to_ldo_rate=dai_to_ldo_rate,
+        vesting_start_delay=vesting_start_delay,
+        vesting_end_delay=vesting_end_delay,
+        offer_expiration_delay=offer_expiration_delay,
+        ldo_purchasers=ldo_purchasers,
+        total_ldo_sold=total_ldo_sold,
+        use_v2=use_v2,
+        direct_settlement=direct_settlement,
+        factory=factory
+    )
+
+    (vote_id, _) = propose_vesting_manager_contract(
+        tx_params=tx_params,
+        manager_address=executor.address,
+        total_ldo_amount=total_ldo_sold,
+        ldo_transfer_reference='Transfer LDO tokens to be sold for DAI',
+        start_offer=start_offer
+    )
+
+    return (executor, vote_id)
+
+
+
+
+def deploy_merkle(
+    tx_params,
+    dai_to_ldo_rate=DAI_TO_LDO_RATE,
+    vesting_start_delay=VESTING_START_DELAY,
+    vesting_end_delay=VESTING_END_DELAY,
+    offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+    ldo_purchasers=LDO_PURCHASERS,
+    total_ldo_sold=TOTAL_LDO_SOLD
+):
+    allocations_total = get_allocations_total(ldo_purchasers)
+    assert allocations_total == total_ldo_sold, f'invalid total allocation: expected {total_ldo_sold}, actual {allocations_total}'
+
+    (merkle_root, _) = build_merkle_claims(ldo_purchasers)
+
+    return PurchaseExecutorMerkle.deploy(
+        dai_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        merkle_root,
         total_ldo_sold,
         tx_params
     )
 
 
-def deploy_and_start_dao_vote(
+def deploy_merkle_and_start_dao_vote(
     tx_params,
     dai_to_ldo_rate=DAI_TO_LDO_RATE,
     vesting_start_delay=VESTING_START_DELAY,
     vesting_end_delay=VESTING_END_DELAY,
     offer_expiration_delay=OFFER_EXPIRATION_DELAY,
     ldo_purchasers=LDO_PURCHASERS,
-    total_ldo_sold = TOTAL_LDO_SOLD
+    total_ldo_sold=TOTAL_LDO_SOLD
 ):
-    executor = deploy(
+    executor = deploy_merkle(
         tx_params=tx_params,
         dai_to_ldo_rate=dai_to_ldo_rate,
         vesting_start_delay=vesting_start_delay,
@@ -155,5 +249,3 @@ def deploy_and_start_dao_vote(
     )
 
     return (executor, vote_id)
-
-
@@ -0,0 +1,48 @@
+import os
+import signal
+
+from utils.fork_proxy import ForkProxy
+from utils.log import ok, nb, warn, highlight as hl
+
+
+# Runs the record/replay proxy for a mainnet fork until interrupted. Run from the repo root with
+# `FORK_BLOCK=... FORK_UPSTREAM_URL=... python -m scripts.fork_proxy` to record and with
+# `FORK_PROXY_MODE=replay FORK_BLOCK=... python -m scripts.fork_proxy` to replay, then point
+# the fork to `http://127.0.0.1:<FORK_PROXY_PORT>@<FORK_BLOCK>`.
+
+FORK_PROXY_MODE = os.environ.get('FORK_PROXY_MODE', 'record')
+FORK_PROXY_PORT = int(os.environ.get('FORK_PROXY_PORT', '8549'))
+
+
+def main():
+    if 'FORK_BLOCK' not in os.environ:
+        raise EnvironmentError('Please set the FORK_BLOCK environment variable to the block the fork starts from')
+
+    block_number = int(os.environ['FORK_BLOCK'])
+    proxy = ForkProxy(
+        FORK_PROXY_MODE,
+        block_number,
+        upstream_url=os.environ.get('FORK_UPSTREAM_URL'),
+        port=FORK_PROXY_PORT
+    )
+
+    nb(f'Fork proxy in the {hl(FORK_PROXY_MODE)} mode, {hl(len(proxy.responses))} recorded responses in {hl(proxy.filename)}')
+    nb('Fork URL', f'{proxy.url}@{block_number}')
+
+    # SIGTERM stops the proxy the same way as Ctrl+C, so the recording gets saved
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.server_close()
+        proxy.save()
+
+    ok(f'Served {hl(proxy.replayed)} responses from the recording, recorded {hl(proxy.recorded)}')
+    if proxy.missed > 0:
+        warn(f'{proxy.missed} requests were not recorded, record the fork again')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import os
+from brownie import web3, PurchaseExecutor
+
+from utils.event_indexer import EVENT_INDEX_FILE, EventIndexer
+from utils.log import ok, nb, warn, h, highlight as hl
+
+from purchase_config import LDO_PURCHASERS
+
+
+# Indexes the events of the executor at `EXECUTOR_ADDRESS` into `EVENT_INDEX_FILE` and prints
+# the sale progress. Each run only fetches the blocks after the ones indexed by the previous
+# run; set `EVENT_INDEX_START_BLOCK` to the deployment block for the first run on mainnet.
+
+def main():
+    if 'EXECUTOR_ADDRESS' not in os.environ:
+        raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
+
+    executor = PurchaseExecutor.at(os.environ['EXECUTOR_ADDRESS'])
+    indexer = EventIndexer(web3, executor.address, start_block=int(os.environ.get('EVENT_INDEX_START_BLOCK', '0')))
+
+    cursor = indexer.get_cursor()
+    nb('Indexing events of executor', executor.address)
+    nb('Resuming from block', 'start' if cursor is None else cursor[0])
+
+    events_count = indexer.sync()
+    if indexer.reorged_blocks > 0:
+        warn(f'{indexer.reorged_blocks} indexed blocks were reorged out and indexed again')
+    cursor = indexer.get_cursor()
+    if cursor is None:
+        # nothing is indexed until the start block gets enough confirmations
+        warn(f'No blocks indexed yet, the start block {hl(indexer.start_block)} is not confirmed at the head {hl(web3.eth.block_number)}')
+    else:
+        ok(f'Indexed {hl(events_count)} new events up to block {hl(cursor[0])} in {hl(EVENT_INDEX_FILE)}')
+
+    progress = indexer.get_sale_progress(executor.ldo_allocations_total())
+    print()
+    if progress['offer_timestamps'] is None:
+        nb('Offer not started')
+    else:
+        (started_at, expires_at) = progress['offer_timestamps']
+        nb(f'Offer started at {hl(started_at)}, expires at {hl(expires_at)}')
+    nb('LDO sold', progress['ldo_sold'] / 10**18)
+    nb('LDO remaining', progress['ldo_remaining'] / 10**18)
+    nb('DAI received', progress['dai_received'] / 10**18)
+    for (token, amount) in progress['recovered'].items():
+        nb(f'Recovered {hl(amount)} of token', token)
+
+    h('Purchasers')
+    vesting_ids = indexer.get_vesting_ids()
+    for (purchaser, allocation) in LDO_PURCHASERS:
+        if purchaser in vesting_ids:
+            ok(f'{purchaser}: {hl(allocation / 10**18)} LDO purchased, vesting IDs {hl(vesting_ids[purchaser])}')
+        else:
+            nb(f'{purchaser}: {hl(allocation / 10**18)} LDO not purchased yet')
+
+    indexer.close()
@@ -0,0 +1,35 @@
+import os
+from brownie import web3
+
+from utils.offer_monitor import MONITOR_PORT, MONITOR_POLL_INTERVAL, OfferMonitor, MetricsServer, run_monitor
+from utils.log import nb, warn, highlight as hl
+
+
+# Serves the state of the executor at `EXECUTOR_ADDRESS` as Prometheus metrics on
+# `http://127.0.0.1:<MONITOR_PORT>/metrics` until interrupted, updating it on each new block.
+# The events are read from the executor's deployment block, found by a binary search over the
+# historical state; set `EVENT_INDEX_START_BLOCK` to the deployment block on a non-archive node.
+
+def main():
+    if 'EXECUTOR_ADDRESS' not in os.environ:
+        raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
+
+    start_block = os.environ.get('EVENT_INDEX_START_BLOCK')
+    monitor = OfferMonitor(
+        web3,
+        os.environ['EXECUTOR_ADDRESS'],
+        start_block=None if start_block is None else int(start_block)
+    )
+    monitor.update()
+
+    server = MetricsServer(monitor, port=MONITOR_PORT).start()
+    nb('Monitoring executor', monitor.executor)
+    nb(f'Serving metrics at {hl(server.url)}, polling every {hl(MONITOR_POLL_INTERVAL)} s')
+
+    try:
+        run_monitor(monitor, on_error=lambda err: warn(f'Update failed: {err}'))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
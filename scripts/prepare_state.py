@@ -0,0 +1,51 @@
+import os
+
+from scripts.deploy import deploy_and_start_dao_vote, deploy_merkle_and_start_dao_vote, deploy_factory
+from utils.config import get_is_live, get_deployer_account
+from utils.mainnet_fork import pass_and_exec_dao_vote
+from utils.state_dump import PREPARED_STATE_FILE, dump_state, get_session_txs
+from utils.log import ok, nb, highlight as hl
+
+
+# Deploys the executor configured in `purchase_config.py`, passes and executes the DAO vote
+# funding it and granting it ASSIGN_ROLE, and dumps the resulting state to `PREPARED_STATE_FILE`.
+# Run on a fresh fork with `brownie run scripts/prepare_state.py --network development`, then
+# run `check_deployment.py` with the same `PREPARED_STATE_FILE` to start from that state.
+
+def main():
+    if get_is_live():
+        raise EnvironmentError('The state can only be prepared on a development chain')
+
+    executor_mode = os.environ.get('EXECUTOR_MODE', 'list')
+    tx_params = {'from': get_deployer_account(is_live=False)}
+
+    if executor_mode == 'merkle':
+        (executor, vote_id) = deploy_merkle_and_start_dao_vote(tx_params)
+    elif executor_mode == 'list':
+        (executor, vote_id) = deploy_and_start_dao_vote(tx_params)
+    elif executor_mode == 'list-direct':
+        (executor, vote_id) = deploy_and_start_dao_vote(tx_params, direct_settlement=True)
+    elif executor_mode == 'v2':
+        (executor, vote_id) = deploy_and_start_dao_vote(tx_params, use_v2=True)
+    elif executor_mode == 'v2-direct':
+        (executor, vote_id) = deploy_and_start_dao_vote(tx_params, use_v2=True, direct_settlement=True)
+    elif executor_mode in ['clone', 'clone-direct']:
+        factory_address = os.environ.get('EXECUTOR_FACTORY_ADDRESS') or deploy_factory(tx_params).address
+        (executor, vote_id) = deploy_and_start_dao_vote(
+            tx_params,
+            direct_settlement=executor_mode == 'clone-direct',
+            factory=factory_address
+        )
+    else:
+        raise EnvironmentError(f'Unknown EXECUTOR_MODE {executor_mode}, expected list, list-direct, v2, v2-direct, clone, clone-direct or merkle')
+
+    nb(f'Executor deployed at {hl(executor.address)}, vote {hl(vote_id)}')
+    pass_and_exec_dao_vote(vote_id)
+
+    dump_state(PREPARED_STATE_FILE, get_session_txs(), {
+        'executor_address': executor.address,
+        'executor_mode': executor_mode,
+        'factory_address': factory_address if executor_mode in ['clone', 'clone-direct'] else None,
+        'vote_id': vote_id
+    })
+    ok(f'Prepared state written to {hl(PREPARED_STATE_FILE)}')
@@ -1,5 +1,12 @@
+import os
+import json
+import hashlib
 import pytest
-from brownie import chain, Wei, ZERO_ADDRESS
+import eth_account
+from eth_account.hdaccount import key_from_seed
+from brownie import chain, Wei, ZERO_ADDRESS, PurchaseExecutor
+from brownie._config import CONFIG
+from brownie.network.account import LocalAccount
 
 from scripts.deploy import deploy_and_start_dao_vote
 
@@ -9,50 +16,158 @@ from utils.config import (
     lido_dao_agent_address,
     lido_dao_voting_address,
     lido_dao_token_manager_address,
-    dai_token_address
+    dai_token_address,
+    ldo_vote_executors_for_tests
 )
+from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_vote
+from utils.mock_dao import deploy_dao_mocks
+from utils.state_dump import dump_state, read_state_dump, load_state, get_session_txs
 
 
-@pytest.fixture(scope="function", autouse=True)
-def shared_setup(fn_isolation):
-    pass
+# run the suite on a local development chain with the DAO, LDO and DAI replaced by mocks
+USE_DAO_MOCKS = os.environ.get('USE_DAO_MOCKS', '') == '1'
 
+# gas used by the mocks differs from the mainnet contracts, so they have separate baselines
+GAS_BASELINE_FILE = os.path.join(
+    os.path.dirname(__file__),
+    'gas_baseline_mocks.json' if USE_DAO_MOCKS else 'gas_baseline.json'
+)
 
-@pytest.fixture(scope='module')
+# max allowed gas increase relative to the baseline, 0.01 meaning 1%
+GAS_REGRESSION_THRESHOLD = float(os.environ.get('GAS_REGRESSION_THRESHOLD', '0.01'))
+
+# with PREPARED_STATE=1, the state after deploying and funding the shared executor is dumped
+# by the first session and loaded by the next ones instead of being built again
+PREPARED_STATE = os.environ.get('PREPARED_STATE', '') == '1'
+PREPARED_STATE_FILE = os.path.join(
+    os.path.dirname(__file__),
+    'prepared_state_mocks.json' if USE_DAO_MOCKS else 'prepared_state.json'
+)
+
+LDO_HOLDER_ADDRESS = '0xAD4f7415407B83a081A0Bee22D05A8FDC18B42da'
+DAI_HOLDER_ADDRESS = '0x075e72a5edf65f0a5f44699c7654c1a76941ddc8'
+
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def get_prepared_state_config(accounts):
+    # the dump is only loaded by the sessions using the same executor config
+    return {
+        'use_dao_mocks': USE_DAO_MOCKS,
+        'dai_to_ldo_rate': DAI_TO_LDO_RATE,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'vesting_end_delay': VESTING_END_DELAY,
+        'offer_expiration_delay': OFFER_EXPIRATION_DELAY,
+        'ldo_purchasers': [ [accounts[i].address, str(LDO_ALLOCATIONS[i])] for i in range(0, len(LDO_ALLOCATIONS)) ]
+    }
+
+
+@pytest.fixture(scope='session')
+def prepared_state(accounts):
+    if not PREPARED_STATE:
+        return None
+    dump = read_state_dump(PREPARED_STATE_FILE)
+    if dump is None or dump['extra']['config'] != get_prepared_state_config(accounts):
+        return None
+    return load_state(dump)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def dao_mocks(accounts, prepared_state):
+    if not USE_DAO_MOCKS or prepared_state is not None:
+        return
+
+    # the vote executors (the Agent first) hold 15% of LDO total supply, same as on mainnet
+    ldo_balances = dict(zip(ldo_vote_executors_for_tests, [
+        100_000_000 * 10**18,
+        25_000_000 * 10**18,
+        25_000_000 * 10**18
+    ]))
+    ldo_balances[LDO_HOLDER_ADDRESS] = 850_000_000 * 10**18
+
+    deploy_dao_mocks(
+        {'from': accounts[0]},
+        ldo_balances=ldo_balances,
+        dai_balances={ DAI_HOLDER_ADDRESS: 1_000_000_000 * 10**18 }
+    )
+
+
+# Brownie's module_isolation resets the chain, dropping everything the session-scoped fixtures
+# have deployed, so modules and tests are isolated by reverting to snapshots instead. Depending
+# on the shared executor makes sure it is deployed before the first module snapshot is taken.
+@pytest.fixture(scope='module', autouse=True)
+def module_setup(dao_mocks, funded_executor):
+    with chain_snapshot():
+        yield
+
+
+@pytest.fixture(scope='function', autouse=True)
+def shared_setup(module_setup):
+    with chain_snapshot():
+        yield
+
+
+@pytest.fixture(scope='session')
 def ldo_holder(accounts):
-    return accounts.at('0xAD4f7415407B83a081A0Bee22D05A8FDC18B42da', force=True)
+    return accounts.at(LDO_HOLDER_ADDRESS, force=True)
 
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def stranger(accounts):
     return accounts[9]
 
-@pytest.fixture(scope='module')
+
+@pytest.fixture(scope='session')
+def signers():
+    # the unlocked node accounts have no private keys on the brownie side, so the keys for signing
+    # messages are derived from the mnemonic the development node is started with; ganache takes
+    # any phrase, which `accounts.from_mnemonic` rejects unless made of BIP39 words, so the seed
+    # is derived the way ganache does it; `accounts.add` would return the key-less node accounts
+    # for these addresses, so the local accounts are created directly
+    cmd_settings = CONFIG.active_network['cmd_settings']
+    seed = hashlib.pbkdf2_hmac('sha512', cmd_settings['mnemonic'].encode(), b'mnemonic', 2048)
+    keys = [ key_from_seed(seed, f"m/44'/60'/0'/0/{i}") for i in range(cmd_settings['accounts']) ]
+    w3_accounts = [ eth_account.Account.from_key(key) for key in keys ]
+    return [ LocalAccount(account.address, account, account.key) for account in w3_accounts ]
+
+@pytest.fixture(scope='session')
 def dai_token(interface):
     return interface.Dai(dai_token_address)
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def dao_acl(interface):
     return interface.ACL(lido_dao_acl_address)
 
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def dao_voting(interface):
     return interface.Voting(lido_dao_voting_address)
 
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def dao_token_manager(interface):
     return interface.TokenManager(lido_dao_token_manager_address)
 
 
 # Lido DAO Agent app
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def dao_agent(interface):
     return interface.Agent(lido_dao_agent_address)
 
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def ldo_token(interface):
     return interface.ERC20(ldo_token_address)
 
@@ -62,6 +177,7 @@ class Helpers:
     eth_banker = None
     dao_voting = None
     dai_token = None
+    ldo_holder = None
 
     @staticmethod
     def fund_with_eth(addr, amount = '1000 ether'):
@@ -69,7 +185,7 @@ class Helpers:
 
     @staticmethod
     def fund_with_dai(addr, amount):
-        stranger = Helpers.accounts.at('0x075e72a5edf65f0a5f44699c7654c1a76941ddc8', force=True)
+        stranger = Helpers.accounts.at(DAI_HOLDER_ADDRESS, force=True)
         Helpers.dai_token.transfer(addr, amount, { 'from': stranger })
 
     @staticmethod
@@ -86,44 +202,100 @@ class Helpers:
 
     @staticmethod
     def pass_and_exec_dao_vote(vote_id):
-        print(f'executing vote {vote_id}')
-
-        # together these accounts hold 15% of LDO total supply
-        ldo_holders = [
-            '0x3e40d73eb977dc6a537af587d48316fee66e9c8c',
-            '0xb8d83908aab38a159f3da47a59d84db8e1838712',
-            '0xa2dfc431297aee387c05beef507e5335e684fbcd'
-        ]
-
-        helper_acct = Helpers.accounts[0]
-
-        for holder_addr in ldo_holders:
-            print(f'voting from {holder_addr}')
-            helper_acct.transfer(holder_addr, '0.1 ether')
-            account = Helpers.accounts.at(holder_addr, force=True)
-            Helpers.dao_voting.vote(vote_id, True, False, {'from': account})
-
-        # wait for the vote to end
-        chain.sleep(3 * 60 * 60 * 24)
-        chain.mine()
-
-        assert Helpers.dao_voting.canExecute(vote_id)
-        Helpers.dao_voting.executeVote(vote_id, {'from': helper_acct})
-
-        print(f'vote {vote_id} executed')
-
+        # executes the vote script directly unless FAITHFUL_DAO_VOTES=1 is set
+        pass_and_exec_dao_vote(vote_id)
 
+    @staticmethod
+    def deploy_non_started_executor(dai_to_ldo_rate=DAI_TO_LDO_RATE, **kwargs):
+        # an executor with the config above funded by a vote that doesn't start the offer;
+        # `kwargs` are passed to `deploy`, e.g. `use_v2`, `direct_settlement` or `factory`
+        (executor, vote_id) = deploy_and_start_dao_vote(
+            {'from': Helpers.ldo_holder},
+            dai_to_ldo_rate=dai_to_ldo_rate,
+            vesting_start_delay=VESTING_START_DELAY,
+            vesting_end_delay=VESTING_END_DELAY,
+            offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+            ldo_purchasers=[ (Helpers.accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+            total_ldo_sold=sum(LDO_ALLOCATIONS),
+            start_offer=False,
+            **kwargs
+        )
+        Helpers.pass_and_exec_dao_vote(vote_id)
+        return executor
 
-@pytest.fixture(scope='module')
-def helpers(accounts, dao_voting, dai_token):
+    @staticmethod
+    def execute_purchases(executor, purchasers):
+        # each purchaser pays for their own allocation in a separate transaction
+        txs = []
+        for purchaser in purchasers:
+            (_, dai_cost) = executor.get_allocation(purchaser)
+            Helpers.fund_with_dai(purchaser, dai_cost)
+            Helpers.dai_token.approve(executor, dai_cost, { 'from': purchaser })
+            txs.append(executor.execute_purchase(purchaser, { 'from': purchaser }))
+        return txs
+
+
+
+class GasBenchmark:
+    def __init__(self, baseline_file, threshold, update):
+        self.baseline_file = baseline_file
+        self.threshold = threshold
+        self.update = update
+        self.measured = {}
+        if os.path.exists(baseline_file):
+            with open(baseline_file) as f:
+                self.baseline = json.load(f)
+        else:
+            self.baseline = None
+
+    def record(self, name, gas_used):
+        self.measured[name] = gas_used
+        baseline_gas = None if self.baseline is None else self.baseline.get(name)
+        print(f'{name}: {gas_used} gas, baseline: {baseline_gas}')
+        if self.update:
+            return
+        # a missing baseline would let any measurement pass, so it's only written on update
+        assert self.baseline is not None, \
+            f'no gas baseline in {self.baseline_file}, run with UPDATE_GAS_BASELINE=1 to create it'
+        assert baseline_gas is not None, \
+            f'{name}: no baseline in {self.baseline_file}, run with UPDATE_GAS_BASELINE=1 to add it'
+        max_gas = int(baseline_gas * (1 + self.threshold))
+        assert gas_used <= max_gas, \
+            f'{name}: gas used {gas_used} exceeds baseline {baseline_gas} by more than {self.threshold:.2%}'
+
+    def save(self):
+        if not self.update:
+            return
+        updated = {**(self.baseline or {}), **self.measured}
+        if updated == self.baseline:
+            return
+        with open(self.baseline_file, 'w') as f:
+            json.dump(updated, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+@pytest.fixture(scope='session')
+def gas_benchmark():
+    benchmark = GasBenchmark(
+        GAS_BASELINE_FILE,
+        threshold=GAS_REGRESSION_THRESHOLD,
+        update=os.environ.get('UPDATE_GAS_BASELINE', '') == '1'
+    )
+    yield benchmark
+    benchmark.save()
+
+
+@pytest.fixture(scope='session')
+def helpers(accounts, ldo_holder, dao_voting, dai_token):
     Helpers.accounts = accounts
     Helpers.eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
     Helpers.dao_voting = dao_voting
     Helpers.dai_token = dai_token
+    Helpers.ldo_holder = ldo_holder
     return Helpers
 
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, helpers):
     def deploy(
         dai_to_ldo_rate,
@@ -154,3 +326,38 @@ def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl,
         return executor
 
     return deploy
+
+
+# the executor configured with the constants above, deployed and funded through the DAO vote
+# once per session; test modules sharing the same config use it instead of redeploying
+@pytest.fixture(scope='session')
+def funded_executor(accounts, deploy_executor_and_pass_dao_vote, prepared_state, dao_mocks):
+    if prepared_state is not None:
+        return PurchaseExecutor.at(prepared_state['executor_address'])
+
+    executor = deploy_executor_and_pass_dao_vote(
+        dai_to_ldo_rate=DAI_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        total_ldo_sold=sum(LDO_ALLOCATIONS)
+    )
+    executor.start({ 'from': accounts[0] })
+
+    if PREPARED_STATE:
+        dump_state(PREPARED_STATE_FILE, get_session_txs(), {
+            'config': get_prepared_state_config(accounts),
+            'executor_address': executor.address
+        })
+
+    return executor
+
+
+# a separate executor of the same config, for the tests measuring or following the offer start;
+# deployed once per module
+@pytest.fixture(scope='module')
+def non_started_executor(helpers):
+    executor = helpers.deploy_non_started_executor()
+    assert not executor.offer_started()
+    return executor
@@ -0,0 +1,122 @@
+import pytest
+from brownie import reverts, ZERO_ADDRESS
+
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
+from utils.mainnet_fork import chain_snapshot
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+
+
+@pytest.fixture(scope='function')
+def executor(funded_executor):
+    return funded_executor
+
+
+@pytest.fixture(scope='function')
+def payer(accounts, executor, helpers, dai_token):
+    payer = accounts[5]
+    total_dai_cost = sum(LDO_ALLOCATIONS) * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+    helpers.fund_with_dai(payer, total_dai_cost)
+    dai_token.approve(executor, total_dai_cost, { 'from': payer })
+    return payer
+
+
+def pad_receivers(receivers):
+    return list(receivers) + [ZERO_ADDRESS] * (MAX_PURCHASERS - len(receivers))
+
+
+def test_batch_purchase(accounts, executor, payer, dao_agent, helpers, ldo_token, dao_token_manager, dai_token):
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS)) ]
+    dai_costs = [ allocation * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE for allocation in LDO_ALLOCATIONS ]
+
+    dai_payer_balance_before = dai_token.balanceOf(payer)
+    dai_agent_balance_before = dai_token.balanceOf(dao_agent)
+
+    tx = executor.execute_purchases(pad_receivers(receivers), { 'from': payer })
+
+    purchase_evts = helpers.filter_events_from(executor, tx.events['PurchaseExecuted'])
+    assert len(purchase_evts) == len(receivers)
+
+    dai_transfers_from_payer = [
+        evt for evt in helpers.filter_events_from(dai_token, tx.events['Transfer'])
+        if evt['src'] == payer
+    ]
+    assert len(dai_transfers_from_payer) == 1
+    assert dai_transfers_from_payer[0]['wad'] == sum(dai_costs)
+
+    assert dai_token.balanceOf(payer) == dai_payer_balance_before - sum(dai_costs)
+    assert dai_token.balanceOf(dao_agent) == dai_agent_balance_before + sum(dai_costs)
+    assert dai_token.balanceOf(executor) == 0
+    assert ldo_token.balanceOf(executor) == 0
+
+    for (i, receiver) in enumerate(receivers):
+        purchase_evt = purchase_evts[i]
+        assert purchase_evt['ldo_receiver'] == receiver
+        assert purchase_evt['ldo_allocation'] == LDO_ALLOCATIONS[i]
+        assert purchase_evt['dai_cost'] == dai_costs[i]
+
+        assert ldo_token.balanceOf(receiver) == LDO_ALLOCATIONS[i]
+        assert executor.get_allocation(receiver) == (0, 0)
+
+        vesting = dao_token_manager.getVesting(receiver, purchase_evt['vesting_id'])
+        assert vesting['amount'] == LDO_ALLOCATIONS[i]
+        assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+        assert vesting['cliff'] == tx.timestamp + VESTING_START_DELAY
+        assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+        assert vesting['revokable'] == False
+
+    assert tx.return_value[:len(receivers)] == [ evt['vesting_id'] for evt in purchase_evts ]
+
+
+def test_batch_purchase_fails_on_invalid_receivers(accounts, executor, payer):
+    with reverts("no receivers"):
+        executor.execute_purchases(pad_receivers([]), { 'from': payer })
+
+    with reverts("no allocation"):
+        executor.execute_purchases(pad_receivers([accounts[0], accounts[6]]), { 'from': payer })
+
+    with reverts("no allocation"):
+        executor.execute_purchases(pad_receivers([accounts[0], accounts[1], accounts[0]]), { 'from': payer })
+
+
+def test_batch_purchase_fails_with_insufficient_allowance(accounts, executor, payer, dai_token):
+    dai_costs_sum = sum(LDO_ALLOCATIONS[0:2]) * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+    dai_token.approve(executor, dai_costs_sum - 1, { 'from': payer })
+
+    with reverts():
+        executor.execute_purchases(pad_receivers([accounts[0], accounts[1]]), { 'from': payer })
+
+
+def test_batch_purchase_saves_gas_per_extra_receiver(accounts, executor, payer, gas_benchmark):
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS)) ]
+
+    with chain_snapshot():
+        single_purchases_gas = [
+            executor.execute_purchase(receiver, { 'from': payer }).gas_used
+            for receiver in receivers
+        ]
+
+    batch_purchases_gas = []
+    for receivers_count in range(1, len(receivers) + 1):
+        with chain_snapshot():
+            tx = executor.execute_purchases(pad_receivers(receivers[:receivers_count]), { 'from': payer })
+            batch_purchases_gas.append(tx.gas_used)
+            gas_benchmark.record(f'batch_purchase_{receivers_count}_receivers', tx.gas_used)
+
+    for receivers_count in range(2, len(receivers) + 1):
+        saved = sum(single_purchases_gas[:receivers_count]) - batch_purchases_gas[receivers_count - 1]
+        extra_receiver_gas = batch_purchases_gas[receivers_count - 1] - batch_purchases_gas[receivers_count - 2]
+        gas_benchmark.record(f'batch_purchase_extra_receiver_{receivers_count}', extra_receiver_gas)
+
+        assert saved > 0
+        assert extra_receiver_gas < single_purchases_gas[receivers_count - 1]
@@ -0,0 +1,127 @@
+import sys
+import random
+import subprocess
+import pytest
+from eth_utils import to_checksum_address
+
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
+from core.allocations import ZERO_ADDRESS, get_dai_cost, get_allocations_total, pad_purchasers
+from core.purchasers import read_csv_purchasers, iter_csv_purchasers, PurchasersFileError
+from core.clones import get_clone_implementation
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+
+@pytest.mark.parametrize('module', ['core.allocations', 'core.purchasers', 'core.evm_script', 'core.dao', 'core.clones', 'purchase_config', 'utils.config'])
+def test_offline_modules_dont_import_brownie(module):
+    output = subprocess.run(
+        [sys.executable, '-c', f'import sys, {module}; print("brownie" in sys.modules, "web3" in sys.modules)'],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    assert output.split() == ['False', 'False']
+
+
+def test_purchasers_list_is_read_on_first_use():
+    output = subprocess.run(
+        [sys.executable, '-c', 'import sys, purchase_config; print("LDO_PURCHASERS" in vars(purchase_config)); purchase_config.LDO_PURCHASERS; print("LDO_PURCHASERS" in vars(purchase_config))'],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    assert output.split() == ['False', 'True']
+
+
+def test_dai_cost_is_rounded_down():
+    assert get_dai_cost(LDO_ALLOCATIONS[0], DAI_TO_LDO_RATE) == 10 * 10**18
+    assert get_dai_cost(LDO_ALLOCATIONS[0], DAI_TO_LDO_RATE + 7) == LDO_ALLOCATIONS[0] * DAI_TO_LDO_RATE_PRECISION // (DAI_TO_LDO_RATE + 7)
+    assert get_dai_cost(1, DAI_TO_LDO_RATE) == 0
+
+
+def test_pad_purchasers(accounts):
+    purchasers = [ (accounts[i].address, LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    (recipients, allocations) = pad_purchasers(purchasers)
+
+    assert len(recipients) == len(allocations) == MAX_PURCHASERS
+    assert recipients[len(purchasers):] == [ZERO_ADDRESS] * (MAX_PURCHASERS - len(purchasers))
+    assert sum(allocations) == get_allocations_total(purchasers) == sum(LDO_ALLOCATIONS)
+
+    with pytest.raises(AssertionError, match='too many purchasers'):
+        pad_purchasers(purchasers, max_purchasers=2)
+
+
+def test_get_clone_implementation():
+    implementation = to_checksum_address('0x' + '5a' * 20)
+    code = bytes.fromhex('363d3d373d3d3d363d73' + implementation[2:] + '5af43d82803e903d91602b57fd5bf3')
+
+    assert get_clone_implementation(code) == implementation
+    assert get_clone_implementation(code[:-1]) is None
+    assert get_clone_implementation(b'\x00' + code[1:]) is None
+    assert get_clone_implementation(b'') is None
+
+
+def test_read_csv_purchasers_checks_total(tmp_path):
+    filename = tmp_path / 'purchasers.csv'
+    filename.write_text('# address,allocation\n0x0000000000000000000000000000000000000001, 1000\n0x0000000000000000000000000000000000000002,2000\n')
+
+    assert read_csv_purchasers(filename, 3000) == [
+        ('0x0000000000000000000000000000000000000001', 1000),
+        ('0x0000000000000000000000000000000000000002', 2000)
+    ]
+    with pytest.raises(PurchasersFileError, match='invalid total allocation'):
+        read_csv_purchasers(filename, 3001)
+    with pytest.raises(PurchasersFileError, match='too many purchasers'):
+        read_csv_purchasers(filename, 3000, max_purchasers=1)
+
+
+def test_purchasers_file_errors_are_reported_with_line_numbers(tmp_path):
+    filename = tmp_path / 'purchasers.csv'
+    filename.write_text('\n'.join([
+        '# address,allocation',
+        '0xB953E202C5E51C7C010E80402a63C02f37F14059, 1000',
+        '0xb953e202c5e51c7c010e80402a63c02f37f14059, 1000',
+        '0xB953E202C5E51C7C010E80402a63C02f37F14059, 1000',
+        '',
+        '0x0000000000000000000000000000000000000000, 1000',
+        '0xCDF3A93611d097461B1103a9208cFc50F3298f7D, 0',
+        '0xCDF3A93611d097461B1103a9208cFc50F3298f7D, 1e21',
+        '0xCDF3A93611d097461B1103a9208cFc50F3298f7D',
+        '0xCDF3A93611d097461B1103a9208cFc50F3298f7D, 2000'
+    ]) + '\n')
+
+    # valid rows are yielded before the errors are raised
+    purchasers = []
+    with pytest.raises(PurchasersFileError) as err:
+        for purchaser in iter_csv_purchasers(filename, 3000):
+            purchasers.append(purchaser)
+
+    assert purchasers == [
+        ('0xB953E202C5E51C7C010E80402a63C02f37F14059', 1000),
+        ('0xCDF3A93611d097461B1103a9208cFc50F3298f7D', 2000)
+    ]
+    assert [ line for (line, _) in err.value.errors ] == [3, 4, 6, 7, 8, 9]
+    assert 'invalid address checksum' in err.value.errors[0][1]
+    assert 'first listed on line 2' in err.value.errors[1][1]
+
+
+def test_large_purchasers_file_is_streamed(tmp_path):
+    rng = random.Random(1)
+    filename = tmp_path / 'purchasers.csv'
+    with open(filename, 'w') as f:
+        for i in range(0, 100_000):
+            f.write(f'{to_checksum_address(rng.getrandbits(160).to_bytes(20, "big"))}, {10**18 + i}\n')
+
+    (count, total) = (0, 0)
+    for (_, allocation) in iter_csv_purchasers(filename):
+        (count, total) = (count + 1, total + allocation)
+
+    assert count == 100_000
+    assert total == 100_000 * 10**18 + sum(range(0, 100_000))
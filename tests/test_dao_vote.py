@@ -0,0 +1,93 @@
+import random
+import pytest
+
+from scripts.deploy import deploy_and_start_dao_vote
+from utils.evm_script import encode_call_script, decode_call_script, iter_call_script
+from utils.evm_script_fixtures import encode_call_script_by_concatenation, random_actions
+from utils.mainnet_fork import pass_and_exec_dao_vote
+from utils.config import lido_dao_finance_address
+from utils.dao import get_role_id, get_selector, encode_permission_grant, encode_token_transfer, encode_function_call
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def test_decode_call_script_reverts_encoding(accounts, dao_voting, dao_token_manager):
+    actions = [
+        (dao_voting.address, dao_voting.newVote.encode_input('0x00000001', 'vote', False, False)),
+        (dao_token_manager.address, dao_token_manager.ASSIGN_ROLE.encode_input()),
+        (accounts[0].address, '0x')
+    ]
+    assert decode_call_script(encode_call_script(actions)) == actions
+
+
+def test_call_script_encoding_of_1k_actions():
+    actions = random_actions(1000, random.Random(1))
+    script = encode_call_script(actions)
+
+    assert script == encode_call_script_by_concatenation(actions)
+    assert decode_call_script(script) == actions
+    assert decode_call_script(bytes.fromhex(script[2:])) == actions
+
+    # calldata passed as bytes is encoded the same way
+    assert encode_call_script([ (to, bytes.fromhex(calldata[2:])) for (to, calldata) in actions ]) == script
+
+
+def test_iter_call_script_rejects_truncated_script():
+    script = encode_call_script(random_actions(3, random.Random(1)))
+
+    with pytest.raises(AssertionError, match='invalid call script length'):
+        list(iter_call_script(script[:-2]))
+
+    with pytest.raises(AssertionError, match='unsupported script spec id'):
+        list(iter_call_script('0x00000002'))
+
+
+def test_locally_encoded_calls_match_abi_encoding(accounts, ldo_token, dao_acl, dao_voting, dao_token_manager, interface):
+    # brownie returns bytes32 as hex strings, which only compare against hex strings
+    assert get_role_id('ASSIGN_ROLE') == bytes(dao_token_manager.ASSIGN_ROLE())
+    assert get_role_id('CREATE_VOTES_ROLE') == bytes(dao_voting.CREATE_VOTES_ROLE())
+    assert get_selector('ASSIGN_ROLE()').hex() == dao_token_manager.ASSIGN_ROLE.signature[2:]
+
+    assert encode_permission_grant(dao_token_manager.address, 'ASSIGN_ROLE', accounts[1], dao_acl.address) == (
+        dao_acl.address,
+        dao_acl.grantPermission.encode_input(accounts[1], dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+    )
+
+    finance = interface.Finance(lido_dao_finance_address)
+    assert encode_token_transfer(ldo_token.address, accounts[1], 10**18, 'reference', finance) == (
+        finance.address,
+        finance.newImmediatePayment.encode_input(ldo_token, accounts[1], 10**18, 'reference')
+    )
+
+    assert encode_function_call('newVote(bytes,string,bool,bool)', [b'\x00\x00\x00\x01', 'vote', False, False]) == \
+        dao_voting.newVote.encode_input('0x00000001', 'vote', False, False)
+
+
+@pytest.mark.parametrize('faithful', [False, True])
+def test_vote_execution_modes_have_same_effect(accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, faithful):
+    (executor, vote_id) = deploy_and_start_dao_vote(
+        {'from': ldo_holder},
+        dai_to_ldo_rate=DAI_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        total_ldo_sold=sum(LDO_ALLOCATIONS)
+    )
+
+    pass_and_exec_dao_vote(vote_id, faithful=faithful)
+
+    assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
+    assert dao_acl.hasPermission(executor, dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+    assert executor.offer_started()
@@ -0,0 +1,144 @@
+import eth_abi
+from eth_utils import to_checksum_address
+from brownie import chain, web3
+
+from utils.event_indexer import EventIndexer, PURCHASE_EXECUTED_TOPIC, OFFER_STARTED_TOPIC
+from utils.mainnet_fork import chain_snapshot
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+EXECUTOR_ADDRESS = '0x' + '11' * 20
+PURCHASER_ADDRESS = '0x' + '22' * 20
+
+
+class FakeEth:
+    # a chain of blocks with the given logs, rejecting log requests over `max_range` blocks
+    def __init__(self, max_range):
+        self.chain_id = 1
+        self.blocks = []
+        self.max_range = max_range
+        self.get_logs_calls = 0
+
+    @property
+    def block_number(self):
+        return len(self.blocks) - 1
+
+    def mine(self, fork_id, logs=[]):
+        number = len(self.blocks)
+        block_hash = bytes([fork_id]) + number.to_bytes(31, 'big')
+        self.blocks.append((block_hash, [ {**log, 'blockNumber': number, 'blockHash': block_hash} for log in logs ]))
+
+    def reorg(self, depth):
+        self.blocks = self.blocks[:-depth]
+
+    def get_block(self, number):
+        return {'hash': self.blocks[number][0]}
+
+    def get_logs(self, params):
+        self.get_logs_calls += 1
+        if params['toBlock'] - params['fromBlock'] + 1 > self.max_range:
+            raise ValueError({'code': -32005, 'message': 'block range too large'})
+        return [
+            log
+            for (_, logs) in self.blocks[params['fromBlock']:params['toBlock'] + 1]
+            for log in logs
+            if log['topics'][0].hex() in [ topic[2:] for topic in params['topics'][0] ]
+        ]
+
+
+class FakeWeb3:
+    def __init__(self, max_range):
+        self.eth = FakeEth(max_range)
+
+
+def purchase_log(allocation, vesting_id):
+    return {
+        'logIndex': 0,
+        'transactionHash': '0x' + vesting_id.to_bytes(32, 'big').hex(),
+        'topics': [PURCHASE_EXECUTED_TOPIC, bytes(12) + bytes.fromhex(PURCHASER_ADDRESS[2:])],
+        'data': '0x' + eth_abi.encode_abi(['uint256'] * 3, [allocation, allocation // 100, vesting_id]).hex()
+    }
+
+
+def test_indexer_resumes_in_chunks_and_rolls_back_reorgs(tmp_path):
+    web3 = FakeWeb3(max_range=4)
+    filename = tmp_path / 'index.sqlite'
+
+    web3.eth.mine(0)
+    web3.eth.mine(0, [{
+        'logIndex': 0,
+        'transactionHash': '0x' + '00' * 32,
+        'topics': [OFFER_STARTED_TOPIC],
+        'data': '0x' + eth_abi.encode_abi(['uint256', 'uint256'], [1000, 2000]).hex()
+    }])
+    for i in range(2, 10):
+        web3.eth.mine(0, [purchase_log(10**18, i)] if i % 3 == 0 else [])
+
+    indexer = EventIndexer(web3, EXECUTOR_ADDRESS, filename=filename, confirmations=2, chunk_size=16)
+    # blocks 8 and 9 aren't confirmed yet; the rejected range is split
+    assert indexer.sync() == 3
+    assert indexer.get_cursor()[0] == 7
+    assert indexer.chunk_size == 4
+    assert indexer.get_vesting_ids() == {to_checksum_address(PURCHASER_ADDRESS): [3, 6]}
+    indexer.close()
+
+    # a new indexer resumes from the cursor without fetching the indexed blocks again
+    web3.eth.mine(0)
+    web3.eth.mine(0)
+    indexer = EventIndexer(web3, EXECUTOR_ADDRESS, filename=filename, confirmations=2, chunk_size=4)
+    web3.eth.get_logs_calls = 0
+    assert indexer.sync() == 1
+    assert web3.eth.get_logs_calls == 1
+    assert indexer.get_cursor()[0] == 9
+
+    progress = indexer.get_sale_progress(10 * 10**18)
+    assert progress['offer_timestamps'] == (1000, 2000)
+    assert (progress['purchases_count'], progress['ldo_sold'], progress['ldo_remaining']) == (3, 3 * 10**18, 7 * 10**18)
+    assert progress['dai_received'] == 3 * 10**16
+
+    # a reorg deeper than the confirmations replaces the purchase of block 9 by another one
+    web3.eth.reorg(4)
+    for i in range(8, 12):
+        web3.eth.mine(1, [purchase_log(2 * 10**18, 100 + i)] if i == 8 else [])
+
+    assert indexer.sync() == 1
+    assert indexer.reorged_blocks > 0
+    assert [ vesting_id for (_, _, _, vesting_id, _, _) in indexer.get_purchases() ] == [3, 6, 108]
+    assert indexer.get_sale_progress(10 * 10**18)['ldo_sold'] == 4 * 10**18
+
+
+def test_indexer_tracks_purchases(tmp_path, accounts, funded_executor, helpers, dai_token):
+    executor = funded_executor
+    chain.mine()
+    indexer = EventIndexer(web3, executor.address, start_block=chain.height, filename=tmp_path / 'index.sqlite', confirmations=0)
+    indexer.sync()
+    assert indexer.get_sale_progress(sum(LDO_ALLOCATIONS))['ldo_remaining'] == sum(LDO_ALLOCATIONS)
+
+    def purchase(purchaser):
+        (_, dai_cost) = executor.get_allocation(purchaser)
+        helpers.fund_with_dai(purchaser, dai_cost)
+        dai_token.approve(executor, dai_cost, { 'from': purchaser })
+        return executor.execute_purchase(purchaser, { 'from': purchaser })
+
+    with chain_snapshot():
+        tx = purchase(accounts[1])
+        assert indexer.sync() == 1
+        assert indexer.get_vesting_ids() == {accounts[1].address: [tx.events['PurchaseExecuted']['vesting_id']]}
+
+    # the reverted purchase is dropped once the chain moves past the indexed block
+    purchase(accounts[0])
+    chain.mine(5)
+    indexer.sync()
+
+    progress = indexer.get_sale_progress(sum(LDO_ALLOCATIONS))
+    assert list(indexer.get_vesting_ids()) == [accounts[0].address]
+    assert progress['ldo_sold'] == LDO_ALLOCATIONS[0]
+    assert progress['ldo_remaining'] == sum(LDO_ALLOCATIONS) - LDO_ALLOCATIONS[0]
+    assert progress['dai_received'] == LDO_ALLOCATIONS[0] * 10**18 // DAI_TO_LDO_RATE
@@ -0,0 +1,180 @@
+import json
+import pytest
+from brownie import chain, reverts, web3, ZERO_ADDRESS, PurchaseExecutorClone, PurchaseExecutorV2
+
+from purchase_config import MAX_PURCHASERS
+from core.clones import get_clone_implementation
+from scripts.deploy import deploy_factory
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def factory(ldo_holder):
+    return deploy_factory({'from': ldo_holder})
+
+
+@pytest.fixture(scope='module')
+def executor_v2(helpers):
+    return helpers.deploy_non_started_executor(use_v2=True)
+
+
+@pytest.fixture(scope='module')
+def executor_clone(helpers, factory):
+    return helpers.deploy_non_started_executor(factory=factory.address)
+
+
+def get_interface(contract_type):
+    # the functions and events with their arguments, without the compiler's gas estimates
+    return sorted([
+        json.dumps({ key: value for (key, value) in entry.items() if key != 'gas' }, sort_keys=True)
+        for entry in contract_type.abi if entry['type'] in ['function', 'event']
+    ])
+
+
+def test_clone_interface_matches_v2():
+    # the clone only adds the initializer; test_executor_model checks that both behave the same
+    clone_interface = [ entry for entry in get_interface(PurchaseExecutorClone) if '"name": "initialize"' not in entry ]
+    assert len(clone_interface) == len(get_interface(PurchaseExecutorClone)) - 1
+    assert clone_interface == get_interface(PurchaseExecutorV2)
+
+
+def test_clone_is_proxy_to_factory_implementation(factory, executor_clone):
+    assert get_clone_implementation(web3.eth.get_code(executor_clone.address)) == factory.implementation()
+    assert get_clone_implementation(web3.eth.get_code(factory.implementation())) is None
+
+
+def test_clone_config_matches_v2(accounts, executor_v2, executor_clone):
+    assert executor_clone.offer_state().dict() == executor_v2.offer_state().dict()
+    assert not executor_clone.direct_settlement()
+
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS) + 1) ]
+    receivers += [ZERO_ADDRESS] * (MAX_PURCHASERS - len(receivers))
+    assert executor_clone.get_allocations(receivers) == executor_v2.get_allocations(receivers)
+
+    for i in range(0, len(LDO_ALLOCATIONS) + 1):
+        assert executor_clone.ldo_allocations(accounts[i]) == executor_v2.ldo_allocations(accounts[i])
+
+
+def test_clone_cannot_be_initialized_again(factory, executor_clone, stranger):
+    args = [
+        DAI_TO_LDO_RATE,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        OFFER_EXPIRATION_DELAY,
+        [stranger] + [ZERO_ADDRESS] * (MAX_PURCHASERS - 1),
+        [1] + [0] * (MAX_PURCHASERS - 1),
+        1,
+        False
+    ]
+
+    with reverts('already initialized'):
+        executor_clone.initialize(*args, { 'from': stranger })
+
+    # the implementation is locked at the deployment
+    implementation = PurchaseExecutorClone.at(factory.implementation())
+    with reverts('already initialized'):
+        implementation.initialize(*args, { 'from': stranger })
+
+
+def test_clone_rejects_offer_expiration_delay_not_fitting_packed_slot(accounts, ldo_holder, factory):
+    # same bound as the one of `PurchaseExecutorV2`
+    with reverts():
+        factory.create_executor(
+            DAI_TO_LDO_RATE,
+            VESTING_START_DELAY,
+            VESTING_END_DELAY,
+            2**64,
+            [accounts[0]] + [ZERO_ADDRESS] * (MAX_PURCHASERS - 1),
+            [LDO_ALLOCATIONS[0]] + [0] * (MAX_PURCHASERS - 1),
+            LDO_ALLOCATIONS[0],
+            False,
+            { 'from': ldo_holder }
+        )
+
+
+def test_clones_of_one_factory_are_independent(accounts, helpers, factory, executor_clone):
+    other_executor = helpers.deploy_non_started_executor(
+        dai_to_ldo_rate=2 * DAI_TO_LDO_RATE,
+        factory=factory.address,
+        direct_settlement=True
+    )
+    assert other_executor.address != executor_clone.address
+    assert other_executor.direct_settlement()
+
+    helpers.execute_purchases(other_executor, [accounts[0]])
+
+    assert other_executor.offer_started()
+    assert other_executor.get_allocation(accounts[0]) == (0, 0)
+    assert not executor_clone.offer_started()
+    assert executor_clone.get_allocation(accounts[0]) == (LDO_ALLOCATIONS[0], LDO_ALLOCATIONS[0] * 10**18 // DAI_TO_LDO_RATE)
+
+
+def test_clone_purchases_match_v2(accounts, executor_v2, executor_clone, helpers, dai_token, dao_token_manager):
+    purchasers = accounts[0:len(LDO_ALLOCATIONS)]
+    for executor in [executor_v2, executor_clone]:
+        txs = helpers.execute_purchases(executor, purchasers)
+
+        assert executor.offer_started_at() == txs[0].timestamp
+        assert executor.offer_expires_at() == txs[0].timestamp + OFFER_EXPIRATION_DELAY
+
+        for (purchaser, allocation, tx) in zip(purchasers, LDO_ALLOCATIONS, txs):
+            evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+            assert evt['ldo_receiver'] == purchaser
+            assert evt['ldo_allocation'] == allocation
+            assert evt['dai_cost'] == allocation * 10**18 // DAI_TO_LDO_RATE
+            assert executor.get_allocation(purchaser) == (0, 0)
+
+            vesting = dao_token_manager.getVesting(purchaser, evt['vesting_id'])
+            assert vesting['amount'] == allocation
+            assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+            assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+
+        assert dai_token.balanceOf(executor) == 0
+
+
+def test_clone_expires(accounts, executor_clone, helpers, ldo_token, stranger):
+    executor_clone.start({ 'from': stranger })
+
+    chain.sleep(OFFER_EXPIRATION_DELAY + 1)
+    chain.mine()
+    assert executor_clone.offer_expired()
+
+    with reverts('offer expired'):
+        helpers.execute_purchases(executor_clone, [accounts[0]])
+
+    executor_clone.recover_erc20(ldo_token, ldo_token.balanceOf(executor_clone), { 'from': stranger })
+    assert ldo_token.balanceOf(executor_clone) == 0
+
+
+def test_clone_deploys_for_less_gas(accounts, ldo_holder, factory, executor_v2, executor_clone, helpers, gas_benchmark):
+    # the clone fixture is created through `deploy`, which doesn't expose the transaction
+    padding = MAX_PURCHASERS - len(LDO_ALLOCATIONS)
+    create_tx = factory.create_executor(
+        DAI_TO_LDO_RATE,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        OFFER_EXPIRATION_DELAY,
+        accounts[0:len(LDO_ALLOCATIONS)] + [ZERO_ADDRESS] * padding,
+        LDO_ALLOCATIONS + [0] * padding,
+        sum(LDO_ALLOCATIONS),
+        False,
+        { 'from': ldo_holder }
+    )
+    gas_benchmark.record(f'clone_deploy_{len(LDO_ALLOCATIONS)}_purchasers', create_tx.gas_used)
+    assert create_tx.gas_used < executor_v2.tx.gas_used // 4
+
+    txs = helpers.execute_purchases(executor_clone, accounts[0:2])
+    gas_benchmark.record('clone_execute_purchase_first', txs[0].gas_used)
+    gas_benchmark.record('clone_execute_purchase_subsequent', txs[1].gas_used)
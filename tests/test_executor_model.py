@@ -0,0 +1,314 @@
+import random
+import pytest
+from brownie import chain, ZERO_ADDRESS
+from brownie.exceptions import VirtualMachineError
+
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
+from scripts.deploy import deploy_factory
+from utils.mainnet_fork import chain_snapshot
+from utils.executor_model import (
+    ExecutorModel,
+    ExecutorReverted,
+    EXECUTOR_REVERT_REASONS,
+    LDO,
+    DAI,
+    apply_operation,
+    random_operations,
+    simulate
+)
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+# a rate that doesn't divide the allocations, so DAI costs get rounded down
+ROUNDING_DAI_TO_LDO_RATE = DAI_TO_LDO_RATE + 7
+
+PURCHASERS = [ (f'0x{i + 1:040x}', allocation) for i, allocation in enumerate(LDO_ALLOCATIONS) ]
+PAYERS = [ f'0x{0xbeef + i:040x}' for i in range(0, 2) ]
+
+
+def create_model(dai_to_ldo_rate=ROUNDING_DAI_TO_LDO_RATE, purchasers=PURCHASERS, direct_settlement=False):
+    model = ExecutorModel(
+        dai_to_ldo_rate,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        OFFER_EXPIRATION_DELAY,
+        purchasers,
+        sum([ allocation for (_, allocation) in purchasers ]),
+        direct_settlement
+    )
+    model.fund_ldo(model.ldo_allocations_total)
+    return model
+
+
+def test_model_rounds_dai_cost_down():
+    model = create_model()
+    for (purchaser, allocation) in PURCHASERS:
+        expected_cost = allocation * DAI_TO_LDO_RATE_PRECISION // ROUNDING_DAI_TO_LDO_RATE
+        assert expected_cost * ROUNDING_DAI_TO_LDO_RATE < allocation * DAI_TO_LDO_RATE_PRECISION
+        assert model.get_allocation(purchaser) == (allocation, expected_cost)
+
+
+def test_model_constructor_validation():
+    with pytest.raises(ExecutorReverted):
+        create_model(dai_to_ldo_rate=0)
+    with pytest.raises(ExecutorReverted):
+        create_model(purchasers=PURCHASERS + [PURCHASERS[0]])
+    with pytest.raises(ExecutorReverted):
+        create_model(purchasers=[ (f'0x{i + 1:040x}', 1) for i in range(0, MAX_PURCHASERS + 1) ])
+
+
+def test_model_auto_starts_and_expires_at_boundary():
+    model = create_model()
+    (purchaser, _) = PURCHASERS[0]
+    (payer, other_payer) = PAYERS
+    dai_cost = model.get_allocation(purchaser)[1]
+
+    for account in PAYERS:
+        model.fund_dai(account, dai_cost)
+        model.approve_dai(account, dai_cost)
+
+    model.execute_purchase(purchaser, payer, 1000)
+    assert model.offer_started_at == 1000
+    assert model.offer_expires_at == 1000 + OFFER_EXPIRATION_DELAY
+    assert [ name for (name, _) in model.events ] == ['OfferStarted', 'PurchaseExecuted']
+
+    with pytest.raises(ExecutorReverted, match='no allocation'):
+        model.execute_purchase(purchaser, other_payer, 1001)
+
+    (second_purchaser, _) = PURCHASERS[1]
+    assert not model.offer_expired(model.offer_expires_at - 1)
+    assert model.offer_expired(model.offer_expires_at)
+
+    with pytest.raises(ExecutorReverted, match='offer expired'):
+        model.execute_purchase(second_purchaser, other_payer, model.offer_expires_at)
+
+
+def test_model_start_requires_funding():
+    model = create_model()
+    model.ldo_balance -= 1
+    with pytest.raises(ExecutorReverted, match='not funded'):
+        model.start(1000)
+    assert not model.offer_started()
+    assert model.events == []
+
+
+def test_model_revert_discards_state():
+    model = create_model()
+    (payer, _) = PAYERS
+    model.fund_dai(payer, 10**30)
+    model.approve_dai(payer, 10**30)
+
+    receivers = [ purchaser for (purchaser, _) in PURCHASERS ]
+    with pytest.raises(ExecutorReverted, match='no allocation'):
+        model.execute_purchases(receivers + [receivers[0]], payer, 1000)
+
+    assert not model.offer_started()
+    assert model.dai_balances[payer] == 10**30
+    assert all([ model.get_allocation(receiver)[0] > 0 for receiver in receivers ])
+    assert model.events == []
+
+
+def test_model_direct_settlement_skips_vault_deposit():
+    # an allocation too small to cost any DAI
+    purchasers = [ (PURCHASERS[0][0], 1) ]
+    dai_to_ldo_rate = 10 * DAI_TO_LDO_RATE_PRECISION
+    (payer, _) = PAYERS
+
+    for direct_settlement in [False, True]:
+        model = create_model(dai_to_ldo_rate, purchasers, direct_settlement)
+        model.fund_dai(payer, 0)
+        assert model.get_allocation(purchasers[0][0]) == (1, 0)
+
+        if direct_settlement:
+            model.execute_purchase(purchasers[0][0], payer, 1000)
+            assert model.dai_balance == 0
+        else:
+            with pytest.raises(ExecutorReverted, match='VAULT_DEPOSIT_VALUE_ZERO'):
+                model.execute_purchase(purchasers[0][0], payer, 1000)
+
+
+def test_model_recovers_after_expiry_only():
+    model = create_model()
+    (_, stranger) = PAYERS
+    model.start(1000)
+
+    with pytest.raises(ExecutorReverted, match='dev: offer not expired'):
+        model.recover_erc20(LDO, 1, stranger, model.offer_expires_at - 1)
+
+    model.recover_erc20(LDO, model.ldo_balance + 1, stranger, model.offer_expires_at)
+    assert model.ldo_balance == model.ldo_allocations_total
+
+    model.recover_erc20(LDO, model.ldo_balance, stranger, model.offer_expires_at)
+    assert model.ldo_balance == 0
+
+    with pytest.raises(ExecutorReverted):
+        model.recover_erc20(DAI, 1, stranger, model.offer_expires_at)
+
+
+@pytest.mark.parametrize('direct_settlement', [False, True])
+@pytest.mark.parametrize('seed', range(0, 5))
+def test_model_random_scenarios_conserve_tokens(seed, direct_settlement):
+    rng = random.Random(seed)
+
+    for _ in range(0, 1000):
+        model = create_model(direct_settlement=direct_settlement)
+        for payer in PAYERS:
+            model.fund_dai(payer, 0)
+        initial_dai = sum(model.dai_balances.values())
+
+        operations = random_operations(rng, model, PAYERS, 30, OFFER_EXPIRATION_DELAY // 2)
+        simulate(model, operations, 10**9)
+
+        purchases = [ args for (name, args) in model.events if name == 'PurchaseExecuted' ]
+        vested_ldo = sum([ vesting['amount'] for vestings in model.vestings.values() for vesting in vestings ])
+        funded_dai = sum([ operation[2] for operation in operations if operation[0] == 'fund_dai' ])
+
+        assert vested_ldo == sum([ purchase['ldo_allocation'] for purchase in purchases ])
+        assert model.dao_dai_balance == sum([ purchase['dai_cost'] for purchase in purchases ])
+        assert sum(model.dai_balances.values()) + model.dao_dai_balance == initial_dai + funded_dai
+        assert model.ldo_balance + vested_ldo <= model.ldo_allocations_total
+
+        for (purchaser, allocation) in PURCHASERS:
+            purchased = [ purchase for purchase in purchases if purchase['ldo_receiver'] == purchaser ]
+            assert len(purchased) <= 1
+            assert model.get_allocation(purchaser)[0] == (0 if purchased else allocation)
+
+
+# v2 and its clones store the config differently, so all three executors are checked against
+# the same model of v1 with the same operations, settling through `Vault.deposit` and directly
+@pytest.fixture(scope='module', params=['v1', 'v1-direct', 'v2', 'v2-direct', 'clone', 'clone-direct'])
+def non_started_executor(request, helpers, ldo_holder):
+    (version, _, settlement) = request.param.partition('-')
+    kwargs = {'direct_settlement': settlement == 'direct'}
+    if version == 'clone':
+        kwargs['factory'] = deploy_factory({'from': ldo_holder}).address
+    else:
+        kwargs['use_v2'] = version == 'v2'
+    # each executor is dropped before the next one is deployed, so that they don't add up
+    # to more LDO than the Agent of the DAO mocks holds
+    with chain_snapshot():
+        yield helpers.deploy_non_started_executor(dai_to_ldo_rate=ROUNDING_DAI_TO_LDO_RATE, **kwargs)
+
+
+def create_model_of(executor, purchasers, payers, ldo_token, dai_token, dao_agent, dao_token_manager):
+    model = create_model(purchasers=purchasers, direct_settlement=executor.direct_settlement())
+    model.ldo_balance = ldo_token.balanceOf(executor)
+    model.dai_balance = dai_token.balanceOf(executor)
+    model.dao_dai_balance = dai_token.balanceOf(dao_agent)
+    for payer in payers:
+        model.fund_dai(payer, dai_token.balanceOf(payer))
+        model.approve_dai(payer, dai_token.allowance(payer, executor))
+    for (purchaser, _) in purchasers + [ (payers[0], 0) ]:
+        # vesting IDs continue from the vestings the receivers already have
+        model.vestings[purchaser] = [ None ] * dao_token_manager.vestingsLengths(purchaser)
+    return model
+
+
+def chain_revert_reason(executor, reason):
+    # vyper 0.3 sends reasonless asserts to one shared revert, which brownie can't map
+    # back to the `# dev:` comment, so these revert without a reason on the chain side
+    if reason.startswith('dev:') and not executor._build['compiler']['version'].startswith('0.2.'):
+        return ''
+    return reason
+
+
+def replay_on_chain(operation, executor, accounts, helpers, ldo_token, dai_token):
+    # returns the outcome in the `apply_operation` format and the executor events
+    (name, *args) = operation
+    tokens = { LDO: ldo_token, DAI: dai_token }
+
+    if name == 'fund_dai':
+        helpers.fund_with_dai(args[0], args[1])
+        return ((True, None), [])
+    if name == 'approve_dai':
+        dai_token.approve(executor, args[1], { 'from': args[0] })
+        return ((True, None), [])
+
+    try:
+        if name == 'start':
+            tx = executor.start({ 'from': accounts[9] })
+        elif name == 'execute_purchase':
+            tx = executor.execute_purchase(args[0], { 'from': args[1] })
+        elif name == 'execute_purchases':
+            receivers = list(args[0]) + [ZERO_ADDRESS] * (MAX_PURCHASERS - len(args[0]))
+            tx = executor.execute_purchases(receivers, { 'from': args[1] })
+        elif name == 'recover_erc20':
+            tx = executor.recover_erc20(tokens[args[0]], args[1], { 'from': args[2] })
+    except VirtualMachineError as err:
+        return ((False, err.revert_msg), [])
+
+    events = [
+        (evt.name, dict(evt)) for evt in tx.events
+        if evt.address == executor.address and evt.name in ['OfferStarted', 'PurchaseExecuted', 'ERC20Recovered']
+    ]
+    return_value = tx.return_value
+    if name == 'execute_purchases':
+        return_value = list(return_value[:len(args[0])])
+    elif name == 'start':
+        return_value = None
+    elif name == 'recover_erc20':
+        # ERC20Recovered has the token address
+        events = [ (evt_name, { **evt, 'token': args[0] }) for (evt_name, evt) in events ]
+        return_value = None
+
+    return ((True, return_value), events)
+
+
+@pytest.mark.parametrize('seed', range(0, 4))
+def test_model_matches_chain(
+    seed,
+    accounts,
+    non_started_executor,
+    helpers,
+    ldo_token,
+    dai_token,
+    dao_agent,
+    dao_token_manager
+):
+    executor = non_started_executor
+    purchasers = [ (accounts[i].address, LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    payers = [ accounts[5].address, accounts[6].address ]
+
+    model = create_model_of(executor, purchasers, payers, ldo_token, dai_token, dao_agent, dao_token_manager)
+    operations = random_operations(random.Random(seed), model, payers, 25, OFFER_EXPIRATION_DELAY // 2)
+
+    for operation in operations:
+        if operation[0] == 'sleep':
+            chain.sleep(operation[1])
+            continue
+
+        events_count = len(model.events)
+        ((success, result), events) = replay_on_chain(operation, executor, accounts, helpers, ldo_token, dai_token)
+        (expected_success, expected_result) = apply_operation(model, operation, chain[-1].timestamp)
+
+        assert success == expected_success, f'{operation}: chain {result}, model {expected_result}'
+        if success:
+            assert result == expected_result, operation
+            assert events == model.events[events_count:], operation
+        elif expected_result in EXECUTOR_REVERT_REASONS:
+            assert result == chain_revert_reason(executor, expected_result), operation
+
+    assert executor.offer_started_at() == model.offer_started_at
+    assert executor.offer_expires_at() == model.offer_expires_at
+    assert ldo_token.balanceOf(executor) == model.ldo_balance
+    assert dai_token.balanceOf(executor) == model.dai_balance
+    assert dai_token.balanceOf(dao_agent) == model.dao_dai_balance
+
+    for (purchaser, _) in purchasers:
+        assert executor.get_allocation(purchaser) == model.get_allocation(purchaser)
+        assert dao_token_manager.vestingsLengths(purchaser) == len(model.vestings[purchaser])
+
+    for payer in payers:
+        assert dai_token.balanceOf(payer) == model.dai_balances[payer]
+        assert dai_token.allowance(payer, executor) == model.dai_allowances[payer]
@@ -0,0 +1,167 @@
+import pytest
+from brownie import chain, reverts, ZERO_ADDRESS, PurchaseExecutorV2
+
+from purchase_config import MAX_PURCHASERS
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def executor_v1(helpers):
+    return helpers.deploy_non_started_executor()
+
+
+@pytest.fixture(scope='module')
+def executor_v2(helpers):
+    return helpers.deploy_non_started_executor(use_v2=True)
+
+
+# each test using one of the direct settlement executors deploys it in its own snapshot,
+# as the Agent of the DAO mocks doesn't hold enough LDO to fund four executors at once
+@pytest.fixture(scope='function')
+def executor_v1_direct(helpers):
+    return helpers.deploy_non_started_executor(direct_settlement=True)
+
+
+@pytest.fixture(scope='function')
+def executor_v2_direct(helpers):
+    return helpers.deploy_non_started_executor(use_v2=True, direct_settlement=True)
+
+
+def test_v2_config_matches_v1(accounts, executor_v1, executor_v2):
+    for getter in ['dai_to_ldo_rate', 'ldo_allocations_total', 'offer_expiration_delay', 'vesting_start_delay', 'vesting_end_delay']:
+        assert getattr(executor_v2, getter)() == getattr(executor_v1, getter)()
+
+    for i in range(0, len(LDO_ALLOCATIONS) + 1):
+        assert executor_v2.get_allocation(accounts[i]) == executor_v1.get_allocation(accounts[i])
+        assert executor_v2.ldo_allocations(accounts[i]) == executor_v1.ldo_allocations(accounts[i])
+
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS) + 1) ]
+    receivers += [ZERO_ADDRESS] * (MAX_PURCHASERS - len(receivers))
+    assert executor_v2.get_allocations(receivers) == executor_v1.get_allocations(receivers)
+    assert executor_v2.offer_state().dict() == executor_v1.offer_state().dict()
+
+    assert not executor_v2.direct_settlement()
+    assert not executor_v2.offer_started()
+    assert executor_v2.offer_started_at() == 0
+    assert executor_v2.offer_expires_at() == 0
+
+
+def test_v2_purchases_match_v1(accounts, executor_v1, executor_v2, helpers, dao_token_manager):
+    purchasers = accounts[0:len(LDO_ALLOCATIONS)]
+    for executor in [executor_v1, executor_v2]:
+        txs = helpers.execute_purchases(executor, purchasers)
+
+        assert executor.offer_started_at() == txs[0].timestamp
+        assert executor.offer_expires_at() == txs[0].timestamp + OFFER_EXPIRATION_DELAY
+
+        for (purchaser, allocation, tx) in zip(purchasers, LDO_ALLOCATIONS, txs):
+            evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+            assert evt['ldo_receiver'] == purchaser
+            assert evt['ldo_allocation'] == allocation
+            assert evt['dai_cost'] == allocation * 10**18 // DAI_TO_LDO_RATE
+            assert executor.get_allocation(purchaser) == (0, 0)
+
+            vesting = dao_token_manager.getVesting(purchaser, evt['vesting_id'])
+            assert vesting['amount'] == allocation
+            assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+            assert vesting['cliff'] == tx.timestamp + VESTING_START_DELAY
+            assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+
+
+def test_v2_expires(accounts, executor_v2, helpers, ldo_token, stranger):
+    executor_v2.start({ 'from': stranger })
+
+    # brownie can't map the shared revert of vyper 0.3 contracts to the `# dev:` comment
+    with reverts():
+        executor_v2.recover_erc20(ldo_token, 1, { 'from': stranger })
+
+    chain.sleep(OFFER_EXPIRATION_DELAY + 1)
+    chain.mine()
+    assert executor_v2.offer_expired()
+
+    with reverts('offer expired'):
+        helpers.execute_purchases(executor_v2, [accounts[0]])
+
+    executor_v2.recover_erc20(ldo_token, ldo_token.balanceOf(executor_v2), { 'from': stranger })
+    assert ldo_token.balanceOf(executor_v2) == 0
+
+
+def test_v2_rejects_offer_expiration_delay_not_fitting_packed_slot(accounts, ldo_holder):
+    # the expiration timestamp is the start one plus the delay, packed into 128 bits
+    with reverts():
+        PurchaseExecutorV2.deploy(
+            DAI_TO_LDO_RATE,
+            VESTING_START_DELAY,
+            VESTING_END_DELAY,
+            2**64,
+            [accounts[0]] + [ZERO_ADDRESS] * (MAX_PURCHASERS - 1),
+            [LDO_ALLOCATIONS[0]] + [0] * (MAX_PURCHASERS - 1),
+            LDO_ALLOCATIONS[0],
+            False,
+            { 'from': ldo_holder }
+        )
+
+
+def test_v2_uses_less_gas(accounts, executor_v1, executor_v2, helpers, gas_benchmark):
+    gas_used = []
+    for executor in [executor_v1, executor_v2]:
+        txs = helpers.execute_purchases(executor, accounts[0:2])
+        gas_used.append({
+            'deploy': executor.tx.gas_used,
+            'execute_purchase_first': txs[0].gas_used,
+            'execute_purchase_subsequent': txs[1].gas_used
+        })
+
+    for (name, gas_v2) in gas_used[1].items():
+        gas_v1 = gas_used[0][name]
+        gas_benchmark.record(f'v2_{name}_{len(LDO_ALLOCATIONS)}_purchasers' if name == 'deploy' else f'v2_{name}', gas_v2)
+        assert gas_v2 < gas_v1
+
+
+def execute_purchases_paying_dao_agent(executor, purchasers, helpers, dai_token, dao_agent):
+    # the DAO agent receives the full DAI cost of each purchase in either settlement mode
+    txs = []
+    for purchaser in purchasers:
+        dai_agent_balance_before = dai_token.balanceOf(dao_agent)
+        [tx] = helpers.execute_purchases(executor, [purchaser])
+
+        evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+        assert dai_token.balanceOf(dao_agent) == dai_agent_balance_before + evt['dai_cost']
+        assert dai_token.balanceOf(executor) == 0
+        assert dai_token.allowance(executor, dao_agent) == 0
+        txs.append(tx)
+    return txs
+
+
+def test_v1_direct_settlement_pays_dao_agent(accounts, executor_v1, executor_v1_direct, helpers, dai_token, dao_agent):
+    assert not executor_v1.direct_settlement()
+    assert executor_v1_direct.direct_settlement()
+
+    txs_deposit = execute_purchases_paying_dao_agent(executor_v1, accounts[0:2], helpers, dai_token, dao_agent)
+    txs_direct = execute_purchases_paying_dao_agent(executor_v1_direct, accounts[0:2], helpers, dai_token, dao_agent)
+
+    for (tx_deposit, tx_direct) in zip(txs_deposit, txs_direct):
+        assert tx_direct.gas_used < tx_deposit.gas_used
+
+
+def test_direct_settlement_pays_dao_agent(accounts, executor_v2, executor_v2_direct, helpers, dai_token, dao_agent, gas_benchmark):
+    assert executor_v2_direct.direct_settlement()
+
+    txs_deposit = execute_purchases_paying_dao_agent(executor_v2, accounts[0:2], helpers, dai_token, dao_agent)
+    txs_direct = execute_purchases_paying_dao_agent(executor_v2_direct, accounts[0:2], helpers, dai_token, dao_agent)
+
+    for (name, tx_deposit, tx_direct) in zip(['execute_purchase_first', 'execute_purchase_subsequent'], txs_deposit, txs_direct):
+        gas_benchmark.record(f'v2_direct_{name}', tx_direct.gas_used)
+        assert tx_direct.gas_used < tx_deposit.gas_used
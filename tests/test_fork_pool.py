@@ -0,0 +1,84 @@
+import pytest
+from brownie import web3
+from eth_utils import to_checksum_address
+
+from purchase_config import DAI_TO_LDO_RATE_PRECISION
+from utils.config import dai_token_address, ldo_token_address, lido_dao_agent_address
+from utils.fork_pool import check_reception_in_forks, get_workers_count, split_into_chunks
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+
+DAI_HOLDER_ADDRESS = '0x075e72a5edf65f0a5f44699c7654c1a76941ddc8'
+
+
+def test_split_into_chunks():
+    assert split_into_chunks(list(range(0, 7)), 3) == [[0, 3, 6], [1, 4], [2, 5]]
+    assert split_into_chunks(list(range(0, 2)), 4) == [[0], [1]]
+    assert split_into_chunks([], 2) == []
+
+
+def test_get_workers_count():
+    assert get_workers_count('1', 10) == 1
+    assert get_workers_count('4', 10) == 4
+    assert get_workers_count('4', 3) == 3
+    assert get_workers_count('0', 3) == 1
+    assert 1 <= get_workers_count('auto', 100) <= 100
+
+
+@pytest.mark.parametrize('faithful_lockup_check', [False, True])
+def test_reception_in_forks_matches_totals(accounts, funded_executor, ldo_token, dao_token_manager, faithful_lockup_check):
+    executor = funded_executor
+    purchasers = [ to_checksum_address(accounts[i].address) for i in range(0, len(LDO_ALLOCATIONS)) ]
+
+    config = {
+        'executor_address': executor.address,
+        'executor_abi': executor.abi,
+        'erc20_abi': ldo_token.abi,
+        'dai_token_address': dai_token_address,
+        'ldo_token_address': ldo_token_address,
+        'dao_agent_address': lido_dao_agent_address,
+        'dai_banker_address': to_checksum_address(DAI_HOLDER_ADDRESS),
+        'token_manager_address': dao_token_manager.address,
+        'token_manager_abi': dao_token_manager.abi,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'faithful_lockup_check': faithful_lockup_check
+    }
+    purchases = [ (purchaser, LDO_ALLOCATIONS[i], [purchaser]) for i, purchaser in enumerate(purchasers) ]
+
+    block = web3.eth.get_block('latest')
+    executor_ldo_balance = ldo_token.balanceOf(executor)
+
+    (results, totals) = check_reception_in_forks(
+        web3.provider.endpoint_uri,
+        block.number,
+        block.timestamp,
+        config,
+        purchases,
+        workers=2
+    )
+
+    assert [ result['purchaser'] for result in results ] == purchasers
+
+    for (result, allocation) in zip(results, LDO_ALLOCATIONS):
+        assert result['ldo_purchased'] == allocation
+        assert result['dai_spent'] == allocation * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+        assert result['dao_agent_dai_received'] == result['dai_spent']
+        assert result['locked_after_purchase']
+        assert result['locked_before_vesting_start']
+        assert result['unlocked_after_vesting_start']
+
+    assert totals['executor_ldo_spent'] == sum(LDO_ALLOCATIONS)
+    assert totals['dao_agent_dai_received'] == sum(LDO_ALLOCATIONS) * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+    assert totals['executor_dai_balance'] == 0
+
+    # the purchases happen on the forks only
+    assert ldo_token.balanceOf(executor) == executor_ldo_balance
@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from utils.fork_proxy import ForkProxy, NOT_RECORDED_ERROR_CODE, UPSTREAM_ERROR_CODE, get_fork_cache_file
+
+FORK_BLOCK = 15_000_000
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(request)
+        result = f'0x{len(self.server.requests):064x}'
+        body = json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': result}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUpstreamHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rpc(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def get_storage_at(slot, request_id):
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': 'eth_getStorageAt',
+        'params': ['0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32', hex(slot), hex(FORK_BLOCK)]
+    }
+
+
+def test_recorded_fork_reads_are_replayed_offline(tmp_path):
+    upstream = start_fake_upstream()
+
+    proxy = ForkProxy('record', FORK_BLOCK, upstream_url=f'http://127.0.0.1:{upstream.server_address[1]}', cache_dir=tmp_path).start()
+    recorded = [ rpc(proxy.url, get_storage_at(slot, slot)) for slot in range(0, 3) ]
+    # repeated reads and batches are served without asking the upstream again
+    assert rpc(proxy.url, get_storage_at(0, 10))['result'] == recorded[0]['result']
+    assert [ r['id'] for r in rpc(proxy.url, [get_storage_at(1, 11), get_storage_at(3, 12)]) ] == [11, 12]
+    proxy.stop()
+
+    assert len(upstream.requests) == 4
+    assert os.path.exists(get_fork_cache_file(FORK_BLOCK, tmp_path))
+    upstream.shutdown()
+
+    proxy = ForkProxy('replay', FORK_BLOCK, cache_dir=tmp_path).start()
+    assert [ rpc(proxy.url, get_storage_at(slot, slot + 20)) for slot in range(0, 3) ] == [
+        { **response, 'id': response['id'] + 20 } for response in recorded
+    ]
+    assert rpc(proxy.url, get_storage_at(4, 30))['error']['code'] == NOT_RECORDED_ERROR_CODE
+    proxy.stop()
+
+    assert (proxy.replayed, proxy.missed) == (3, 1)
+
+
+def test_upstream_errors_are_returned_as_json_rpc_errors(tmp_path):
+    upstream = start_fake_upstream()
+    upstream_url = f'http://127.0.0.1:{upstream.server_address[1]}'
+    upstream.shutdown()
+    upstream.server_close()
+
+    proxy = ForkProxy('record', FORK_BLOCK, upstream_url=upstream_url, cache_dir=tmp_path).start()
+    response = rpc(proxy.url, get_storage_at(0, 7))
+    assert response['id'] == 7
+    assert response['error']['code'] == UPSTREAM_ERROR_CODE
+    # the failed read isn't recorded and the proxy keeps serving
+    assert [ r['error']['code'] for r in rpc(proxy.url, [get_storage_at(0, 8), get_storage_at(1, 9)]) ] == [UPSTREAM_ERROR_CODE] * 2
+    proxy.stop()
+
+    assert proxy.recorded == 0
+    assert not os.path.exists(get_fork_cache_file(FORK_BLOCK, tmp_path))
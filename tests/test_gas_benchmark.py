@@ -0,0 +1,97 @@
+import pytest
+from brownie import chain, ZERO_ADDRESS
+from eth_utils import to_checksum_address
+
+from purchase_config import MAX_PURCHASERS
+from scripts.deploy import deploy
+from utils.dai_permit import sign_dai_permit
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='function')
+def payer(accounts, non_started_executor, helpers, dai_token):
+    payer = accounts[5]
+    total_dai_cost = sum([ non_started_executor.get_allocation(accounts[i])[1] for i in range(0, len(LDO_ALLOCATIONS)) ])
+    helpers.fund_with_dai(payer, total_dai_cost)
+    dai_token.approve(non_started_executor, total_dai_cost, { 'from': payer })
+    return payer
+
+
+@pytest.mark.parametrize('purchasers_count', [1, 10, 25, 50])
+def test_deploy_gas(ldo_holder, gas_benchmark, purchasers_count):
+    ldo_purchasers = [ (to_checksum_address(f'0x{0x1000 + i:040x}'), 10**18) for i in range(0, purchasers_count) ]
+
+    executor = deploy(
+        {'from': ldo_holder},
+        dai_to_ldo_rate=DAI_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        total_ldo_sold=purchasers_count * 10**18
+    )
+
+    gas_benchmark.record(f'deploy_{purchasers_count}_purchasers', executor.tx.gas_used)
+
+
+def test_start_gas(stranger, non_started_executor, gas_benchmark):
+    tx = non_started_executor.start({ 'from': stranger })
+    assert non_started_executor.offer_started()
+    gas_benchmark.record('start', tx.gas_used)
+
+
+def test_execute_purchase_gas(accounts, non_started_executor, payer, gas_benchmark):
+    executor = non_started_executor
+
+    tx = executor.execute_purchase(accounts[0], { 'from': payer })
+    assert 'OfferStarted' in tx.events
+    gas_benchmark.record('execute_purchase_first', tx.gas_used)
+
+    tx = executor.execute_purchase(accounts[1], { 'from': payer })
+    assert 'OfferStarted' not in tx.events
+    gas_benchmark.record('execute_purchase_subsequent', tx.gas_used)
+
+
+def test_execute_purchases_gas(accounts, non_started_executor, payer, gas_benchmark):
+    executor = non_started_executor
+    executor.start({ 'from': payer })
+
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS)) ]
+    tx = executor.execute_purchases(receivers + [ZERO_ADDRESS] * (MAX_PURCHASERS - len(receivers)), { 'from': payer })
+    gas_benchmark.record(f'execute_purchases_{len(receivers)}_receivers', tx.gas_used)
+
+
+def test_execute_purchase_with_permit_gas(signers, non_started_executor, helpers, dai_token, gas_benchmark):
+    executor = non_started_executor
+    purchaser = signers[0]
+    executor.start({ 'from': purchaser })
+
+    helpers.fund_with_dai(purchaser, executor.get_allocation(purchaser)[1])
+    nonce = dai_token.nonces(purchaser)
+    (v, r, s) = sign_dai_permit(purchaser.private_key, executor.address, nonce, 0)
+
+    tx = executor.execute_purchase_with_permit(nonce, 0, v, r, s, { 'from': purchaser })
+    gas_benchmark.record('execute_purchase_with_permit', tx.gas_used)
+
+
+def test_recover_erc20_gas(stranger, non_started_executor, ldo_token, gas_benchmark):
+    executor = non_started_executor
+    executor.start({ 'from': stranger })
+
+    chain.sleep(OFFER_EXPIRATION_DELAY + 3600)
+    chain.mine()
+
+    tx = executor.recover_erc20(ldo_token, ldo_token.balanceOf(executor), { 'from': stranger })
+    gas_benchmark.record('recover_erc20', tx.gas_used)
@@ -1,9 +1,9 @@
 import pytest
 import itertools
-from brownie import reverts
+from brownie import reverts, ZERO_ADDRESS
 from brownie.network.state import Chain
 
-from purchase_config import DAI_TO_LDO_RATE_PRECISION
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
 
 LDO_ALLOCATIONS = [
     1_000 * 10**18,
@@ -19,19 +19,11 @@ VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
 OFFER_EXPIRATION_DELAY = 2629746 # one month
 
 @pytest.fixture(scope='function')
-def non_started_executor(accounts, deploy_executor_and_pass_dao_vote):
-    return deploy_executor_and_pass_dao_vote(
-        dai_to_ldo_rate=DAI_TO_LDO_RATE,
-        vesting_start_delay=VESTING_START_DELAY,
-        vesting_end_delay=VESTING_END_DELAY,
-        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
-        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
-        total_ldo_sold=sum(LDO_ALLOCATIONS)
-    )
+def non_started_executor(funded_executor):
+    return funded_executor
 
 @pytest.fixture(scope='function')
-def executor(accounts, non_started_executor):
-    non_started_executor.start({ 'from': accounts[0] })
+def executor(non_started_executor):
     return non_started_executor
 
 
@@ -105,6 +97,30 @@ def test_executor_config_is_correct(executor):
     assert executor.offer_expires_at() == executor.offer_started_at() + OFFER_EXPIRATION_DELAY
 
 
+def test_offer_state_matches_getters(executor, ldo_token):
+    assert executor.offer_state().dict() == {
+        'dai_to_ldo_rate': DAI_TO_LDO_RATE,
+        'ldo_allocations_total': sum(LDO_ALLOCATIONS),
+        'offer_expiration_delay': OFFER_EXPIRATION_DELAY,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'vesting_end_delay': VESTING_END_DELAY,
+        'offer_started_at': executor.offer_started_at(),
+        'offer_expires_at': executor.offer_expires_at(),
+        'offer_started': True,
+        'offer_expired': False,
+        'ldo_balance': ldo_token.balanceOf(executor)
+    }
+
+
+def test_get_allocations_matches_get_allocation(accounts, executor):
+    # the last receiver is not a purchaser
+    receivers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS) + 1) ]
+    (ldo_allocations, dai_costs) = executor.get_allocations(receivers + [ZERO_ADDRESS] * (MAX_PURCHASERS - len(receivers)))
+
+    assert list(zip(ldo_allocations, dai_costs)) == [ executor.get_allocation(r) for r in receivers ] + [(0, 0)] * (MAX_PURCHASERS - len(receivers))
+    assert ldo_allocations[:len(LDO_ALLOCATIONS)] == LDO_ALLOCATIONS
+
+
 def test_ether_transfers_not_accepted(accounts, executor, dao_agent, helpers, ldo_token, dao_token_manager):
     purchaser = accounts[0]
 
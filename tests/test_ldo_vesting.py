@@ -2,6 +2,7 @@ import pytest
 from brownie import chain, reverts
 
 from purchase_config import DAI_TO_LDO_RATE_PRECISION
+from utils.vesting import non_vested_tokens, purchase_unlock_curves
 
 LDO_ALLOCATIONS = [
     1_000 * 10**18,
@@ -18,17 +19,8 @@ OFFER_EXPIRATION_DELAY = 2629746 # one month
 
 
 @pytest.fixture(scope='function')
-def executor(accounts, deploy_executor_and_pass_dao_vote):
-    executor = deploy_executor_and_pass_dao_vote(
-        dai_to_ldo_rate=DAI_TO_LDO_RATE,
-        vesting_start_delay=VESTING_START_DELAY,
-        vesting_end_delay=VESTING_END_DELAY,
-        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
-        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
-        total_ldo_sold=sum(LDO_ALLOCATIONS)
-    )
-    executor.start({ 'from': accounts[0] })
-    return executor
+def executor(funded_executor):
+    return funded_executor
 
 
 @pytest.fixture(scope='function')
@@ -65,38 +57,6 @@ def test_transfer_not_allowed_before_vesting_start(executor, purchaser, stranger
         ldo_token.transfer(stranger, 1, {'from': purchaser})
 
 
-def test_tokens_will_begin_becoming_transferable_linearly(purchaser, stranger, ldo_token):
-    chain.sleep(VESTING_START_DELAY + 60)
-    ldo_token.transfer(stranger, 1, {'from': purchaser})
-
-    vesting_duration = VESTING_END_DELAY - VESTING_START_DELAY
-    chain.sleep(vesting_duration // 3)
-
-    stranger_balance = ldo_token.balanceOf(stranger)
-    purchaser_balance = ldo_token.balanceOf(purchaser)
-
-    with reverts():
-        ldo_token.transfer(stranger, purchaser_balance, {'from': purchaser})
-
-    with reverts():
-        ldo_token.transfer(stranger, purchaser_balance // 2, {'from': purchaser})
-
-    ldo_token.transfer(stranger, purchaser_balance // 3 - 1, {'from': purchaser})
-
-    assert ldo_token.balanceOf(purchaser) == purchaser_balance - purchaser_balance // 3 + 1
-    assert ldo_token.balanceOf(stranger) == stranger_balance + purchaser_balance // 3 - 1
-
-    chain.sleep(vesting_duration // 3)
-
-    with reverts():
-        ldo_token.transfer(stranger, ldo_token.balanceOf(purchaser), {'from': purchaser})
-
-    ldo_token.transfer(stranger, purchaser_balance // 3 - 1, {'from': purchaser})
-
-    assert ldo_token.balanceOf(purchaser) == purchaser_balance - 2 * purchaser_balance // 3 + 2
-    assert ldo_token.balanceOf(stranger) == stranger_balance + 2 * purchaser_balance // 3 - 2
-
-
 def test_vesting_will_end_after_vesting_end_delay(purchaser, stranger, ldo_token):
     stranger_balance = ldo_token.balanceOf(stranger)
     purchaser_balance = ldo_token.balanceOf(purchaser)
@@ -107,3 +67,81 @@ def test_vesting_will_end_after_vesting_end_delay(purchaser, stranger, ldo_token
     assert ldo_token.balanceOf(purchaser) == 0
     assert ldo_token.balanceOf(stranger) == stranger_balance + purchaser_balance
 
+
+def test_transferable_balance_matches_transfers(purchaser, stranger, ldo_token, dao_token_manager):
+    # the deployment check reads the lock-up from `transferableBalance` instead of trying transfers;
+    # the curve itself is checked by `test_unlock_curve_matches_token_manager`
+    purchaser_balance = ldo_token.balanceOf(purchaser)
+    vesting_duration = VESTING_END_DELAY - VESTING_START_DELAY
+
+    time = chain[-1].timestamp + VESTING_START_DELAY + vesting_duration // 3
+    transferable = dao_token_manager.transferableBalance(purchaser, time)
+    assert 0 < transferable < purchaser_balance
+
+    chain.mine(timestamp=time)
+
+    with reverts():
+        ldo_token.transfer(stranger, transferable + purchaser_balance // 100, {'from': purchaser})
+
+    ldo_token.transfer(stranger, transferable, {'from': purchaser})
+
+
+def test_unlock_curve_matches_token_manager(accounts, executor, helpers, ldo_token, dai_token, dao_token_manager):
+    purchasers = [ accounts[i] for i in range(0, len(LDO_ALLOCATIONS)) ]
+    purchase_timestamps = []
+
+    for (purchaser, allocation) in zip(purchasers, LDO_ALLOCATIONS):
+        dai_cost = allocation * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+        helpers.fund_with_dai(purchaser, dai_cost)
+        dai_token.approve(executor, dai_cost, { 'from': purchaser })
+        tx = executor.execute_purchase(purchaser, { 'from': purchaser })
+        purchase_timestamps.append(tx.timestamp)
+        assert ldo_token.balanceOf(purchaser) == allocation
+
+    # the whole curve of every purchaser is computed at once, from the first purchase
+    # to the end of the last vesting
+    step = VESTING_END_DELAY // 100
+    timestamps = list(range(purchase_timestamps[0], purchase_timestamps[-1] + VESTING_END_DELAY + step, step))
+    curves = purchase_unlock_curves(
+        LDO_ALLOCATIONS,
+        purchase_timestamps,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        timestamps
+    )
+
+    for (i, allocation) in enumerate(LDO_ALLOCATIONS):
+        curve = list(curves[i])
+        assert curve == sorted(curve)
+        assert curve[0] == 0
+        assert curve[-1] == allocation
+
+        # spot checks at the vesting start and end boundaries and a few points of the grid
+        vesting_start = purchase_timestamps[i] + VESTING_START_DELAY
+        vesting_end = purchase_timestamps[i] + VESTING_END_DELAY
+        spot_timestamps = [vesting_start - 1, vesting_start, vesting_end - 1, vesting_end]
+        spot_values = purchase_unlock_curves(
+            [allocation],
+            [purchase_timestamps[i]],
+            VESTING_START_DELAY,
+            VESTING_END_DELAY,
+            spot_timestamps
+        )[0]
+
+        for (time, expected) in zip(spot_timestamps, spot_values):
+            assert dao_token_manager.transferableBalance(purchasers[i], time) == expected
+
+        for j in range(0, len(timestamps), len(timestamps) // 4):
+            assert dao_token_manager.transferableBalance(purchasers[i], timestamps[j]) == curve[j]
+
+
+def test_non_vested_tokens_keeps_wei_precision():
+    amount = 20_000_000 * 10**18 + 1
+    (start, end) = (10**9, 10**9 + VESTING_END_DELAY)
+    times = [start - 1, start, start + 1, (start + end) // 2, end - 1, end]
+
+    expected = [ amount, amount ] + [
+        amount - amount * (time - start) // (end - start) for time in times[2:-1]
+    ] + [0]
+
+    assert list(non_vested_tokens(amount, times, start, start, end)) == expected
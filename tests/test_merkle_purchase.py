@@ -0,0 +1,188 @@
+import pytest
+from brownie import reverts
+from eth_utils import to_checksum_address
+
+from purchase_config import DAI_TO_LDO_RATE_PRECISION
+from scripts.deploy import deploy_merkle, deploy_merkle_and_start_dao_vote
+from utils.merkle import build_merkle_claims, build_merkle_tree, get_merkle_root, verify_merkle_proof
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def ldo_purchasers(accounts):
+    return [ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+
+
+@pytest.fixture(scope='module')
+def merkle_claims(ldo_purchasers):
+    return build_merkle_claims(ldo_purchasers)[1]
+
+
+@pytest.fixture(scope='module')
+def executor(accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, helpers, ldo_purchasers):
+    (executor, vote_id) = deploy_merkle_and_start_dao_vote(
+        {'from': ldo_holder},
+        dai_to_ldo_rate=DAI_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        total_ldo_sold=sum(LDO_ALLOCATIONS)
+    )
+
+    helpers.pass_and_exec_dao_vote(vote_id)
+
+    assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
+    assert dao_acl.hasPermission(executor, dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+
+    executor.start({ 'from': accounts[0] })
+    return executor
+
+
+def claim_args(claims, purchaser):
+    claim = claims[purchaser.address]
+    return [claim['index'], purchaser, claim['allocation'], claim['proof']]
+
+
+def test_merkle_proofs_are_valid_for_every_purchaser(accounts):
+    ldo_purchasers = [ (accounts.add(), i * 10**18) for i in range(1, 101) ]
+    (merkle_root, claims) = build_merkle_claims(ldo_purchasers)
+
+    assert merkle_root == get_merkle_root(build_merkle_tree(ldo_purchasers))
+
+    for (purchaser, allocation) in ldo_purchasers:
+        claim = claims[purchaser.address]
+        assert verify_merkle_proof(merkle_root, claim['index'], purchaser, allocation, claim['proof'])
+        assert not verify_merkle_proof(merkle_root, claim['index'], purchaser, allocation + 1, claim['proof'])
+
+
+def test_deploy_gas_does_not_depend_on_purchasers_count(accounts, ldo_holder):
+    def deploy_gas_used(ldo_purchasers):
+        executor = deploy_merkle(
+            {'from': ldo_holder},
+            dai_to_ldo_rate=DAI_TO_LDO_RATE,
+            vesting_start_delay=VESTING_START_DELAY,
+            vesting_end_delay=VESTING_END_DELAY,
+            offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+            ldo_purchasers=ldo_purchasers,
+            total_ldo_sold=sum([ p[1] for p in ldo_purchasers ])
+        )
+        return executor.tx.gas_used
+
+    small_round_gas = deploy_gas_used([ (accounts[0], 10**18) ])
+    large_round_gas = deploy_gas_used([ (to_checksum_address(f'0x{i:040x}'), 10**18) for i in range(1, 5001) ])
+
+    # the only difference is the calldata cost of the non-zero bytes of the root
+    assert abs(large_round_gas - small_round_gas) < 1_000
+
+
+def test_executor_config_is_correct(executor, ldo_purchasers):
+    (merkle_root, _) = build_merkle_claims(ldo_purchasers)
+    assert bytes(executor.merkle_root()) == merkle_root
+    assert executor.dai_to_ldo_rate() == DAI_TO_LDO_RATE
+    assert executor.vesting_start_delay() == VESTING_START_DELAY
+    assert executor.vesting_end_delay() == VESTING_END_DELAY
+    assert executor.offer_expiration_delay() == OFFER_EXPIRATION_DELAY
+    assert executor.ldo_allocations_total() == sum(LDO_ALLOCATIONS)
+    assert executor.offer_started()
+
+
+def test_offer_state_matches_getters(executor, ldo_token):
+    state = executor.offer_state().dict()
+    assert state == {
+        'dai_to_ldo_rate': DAI_TO_LDO_RATE,
+        'ldo_allocations_total': sum(LDO_ALLOCATIONS),
+        'offer_expiration_delay': OFFER_EXPIRATION_DELAY,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'vesting_end_delay': VESTING_END_DELAY,
+        'offer_started_at': executor.offer_started_at(),
+        'offer_expires_at': executor.offer_started_at() + OFFER_EXPIRATION_DELAY,
+        'offer_started': True,
+        'offer_expired': False,
+        'ldo_balance': ldo_token.balanceOf(executor)
+    }
+
+
+def test_get_allocation(accounts, executor, merkle_claims):
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        dai_cost = LDO_ALLOCATIONS[i] * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+        assert executor.get_allocation(*claim_args(merkle_claims, accounts[i])) == (LDO_ALLOCATIONS[i], dai_cost)
+
+    [index, purchaser, allocation, proof] = claim_args(merkle_claims, accounts[0])
+    assert executor.get_allocation(index, purchaser, allocation + 1, proof) == (0, 0)
+    assert executor.get_allocation(index, accounts[5], allocation, proof) == (0, 0)
+
+
+def test_purchase(accounts, executor, merkle_claims, dao_agent, helpers, ldo_token, dao_token_manager, dai_token):
+    purchaser = accounts[1]
+    purchase_ldo_amount = LDO_ALLOCATIONS[1]
+    dai_cost = purchase_ldo_amount * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(purchaser, dai_cost)
+    dai_token.approve(executor, dai_cost, { 'from': purchaser })
+
+    dai_agent_balance_before = dai_token.balanceOf(dao_agent)
+
+    tx = executor.execute_purchase(*claim_args(merkle_claims, purchaser), { 'from': purchaser })
+    purchase_evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+
+    assert purchase_evt['ldo_receiver'] == purchaser
+    assert purchase_evt['ldo_allocation'] == purchase_ldo_amount
+    assert purchase_evt['dai_cost'] == dai_cost
+
+    assert dai_token.balanceOf(dao_agent) == dai_agent_balance_before + dai_cost
+    assert ldo_token.balanceOf(purchaser) == purchase_ldo_amount
+    assert executor.is_purchased(merkle_claims[purchaser.address]['index'])
+    assert executor.get_allocation(*claim_args(merkle_claims, purchaser)) == (0, 0)
+
+    vesting = dao_token_manager.getVesting(purchaser, purchase_evt['vesting_id'])
+
+    assert vesting['amount'] == purchase_ldo_amount
+    assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+    assert vesting['cliff'] == tx.timestamp + VESTING_START_DELAY
+    assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+    assert vesting['revokable'] == False
+
+
+def test_purchase_with_invalid_proof_not_allowed(accounts, executor, merkle_claims, helpers, dai_token):
+    purchaser = accounts[0]
+    stranger = accounts[5]
+    [index, _, allocation, proof] = claim_args(merkle_claims, purchaser)
+    dai_cost = allocation * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(stranger, 2 * dai_cost)
+    dai_token.approve(executor, 2 * dai_cost, { 'from': stranger })
+
+    with reverts("invalid proof"):
+        executor.execute_purchase(index, stranger, allocation, proof, { 'from': stranger })
+
+    with reverts("invalid proof"):
+        executor.execute_purchase(index, purchaser, 2 * allocation, proof, { 'from': stranger })
+
+    with reverts("no allocation"):
+        executor.execute_purchase(index, purchaser, 0, proof, { 'from': stranger })
+
+
+def test_double_purchase_not_allowed(accounts, executor, merkle_claims, helpers, dai_token):
+    purchaser = accounts[0]
+    dai_cost = LDO_ALLOCATIONS[0] * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(purchaser, 2 * dai_cost)
+    dai_token.approve(executor, 2 * dai_cost, { 'from': purchaser })
+
+    executor.execute_purchase(*claim_args(merkle_claims, purchaser), { 'from': purchaser })
+
+    with reverts("already purchased"):
+        executor.execute_purchase(*claim_args(merkle_claims, purchaser), { 'from': purchaser })
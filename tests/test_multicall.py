@@ -0,0 +1,62 @@
+import pytest
+from brownie import chain
+
+from utils.multicall import multicall
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='function')
+def executor(funded_executor):
+    return funded_executor
+
+
+def test_multicall_returns_same_values_as_direct_calls(accounts, executor, ldo_token):
+    calls = [
+        (executor.dai_to_ldo_rate, []),
+        (executor.ldo_allocations_total, []),
+        (executor.offer_expiration_delay, []),
+        (ldo_token.balanceOf, [executor.address])
+    ]
+    calls += [ (executor.get_allocation, [accounts[i]]) for i in range(0, len(LDO_ALLOCATIONS) + 1) ]
+
+    results = multicall(calls)
+
+    assert results[0] == DAI_TO_LDO_RATE
+    assert results[1] == sum(LDO_ALLOCATIONS)
+    assert results[2] == OFFER_EXPIRATION_DELAY
+    assert results[3] == sum(LDO_ALLOCATIONS)
+
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        assert results[4 + i] == executor.get_allocation(accounts[i])
+
+    assert results[-1] == (0, 0)
+
+
+def test_multicall_is_pinned_to_the_given_block(accounts, executor, helpers, ldo_token, dai_token):
+    block_number = chain.height
+
+    purchaser = accounts[0]
+    (_, dai_cost) = executor.get_allocation(purchaser)
+    helpers.fund_with_dai(purchaser, dai_cost)
+    dai_token.approve(executor, dai_cost, { 'from': purchaser })
+    executor.execute_purchase(purchaser, { 'from': purchaser })
+
+    assert executor.get_allocation(purchaser) == (0, 0)
+
+    [ldo_balance, allocation] = multicall(
+        [ (ldo_token.balanceOf, [executor.address]), (executor.get_allocation, [purchaser]) ],
+        block_identifier=block_number
+    )
+
+    assert ldo_balance == sum(LDO_ALLOCATIONS)
+    assert allocation == (LDO_ALLOCATIONS[0], dai_cost)
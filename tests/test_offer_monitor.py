@@ -0,0 +1,86 @@
+import math
+import urllib.request
+from brownie import chain, web3
+
+from utils.offer_monitor import OfferMonitor, MetricsServer, METRICS_PREFIX
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def get_metric_values(monitor):
+    return { name: value for (name, _, _, value) in monitor.get_metrics() }
+
+
+def test_monitor_follows_the_offer(accounts, non_started_executor, helpers, ldo_token):
+    executor = non_started_executor
+    monitor = OfferMonitor(web3, executor.address, start_block=executor.tx.block_number)
+
+    assert monitor.update()
+    metrics = get_metric_values(monitor)
+    assert metrics['offer_started'] == 0
+    assert math.isnan(metrics['offer_seconds_to_expiry'])
+    assert metrics['ldo_balance'] == metrics['ldo_allocations_total'] == sum(LDO_ALLOCATIONS) / 10**18
+    assert metrics['ldo_remaining'] == sum(LDO_ALLOCATIONS) / 10**18
+
+    # blocks without LDO transfers don't make the monitor read the balance
+    assert not monitor.update()
+    balance_reads = monitor.balance_reads
+    chain.mine()
+    assert monitor.update()
+    assert monitor.balance_reads == balance_reads
+
+    (_, dai_cost) = executor.get_allocation(accounts[0])
+    [tx] = helpers.execute_purchases(executor, [accounts[0]])
+
+    server = MetricsServer(monitor, port=0).start()
+    chain.sleep(3600)
+    chain.mine()
+    assert monitor.update()
+    assert monitor.balance_reads == balance_reads + 1
+
+    metrics = get_metric_values(monitor)
+    assert metrics['offer_started'] == 1
+    assert metrics['offer_seconds_to_expiry'] == tx.timestamp + OFFER_EXPIRATION_DELAY - chain[-1].timestamp
+    assert metrics['ldo_sold'] == LDO_ALLOCATIONS[0] / 10**18
+    assert metrics['ldo_remaining'] == sum(LDO_ALLOCATIONS[1:]) / 10**18
+    assert metrics['ldo_balance'] == ldo_token.balanceOf(executor) / 10**18
+    assert metrics['ldo_balance_surplus'] == 0
+    assert metrics['dai_received'] == dai_cost / 10**18
+
+    with urllib.request.urlopen(server.url) as response:
+        lines = response.read().decode().splitlines()
+    server.shutdown()
+    assert f'ldo_purchase_executor_purchases{{executor="{executor.address}"}} 1' in lines
+
+
+def test_monitor_reports_failed_updates(non_started_executor):
+    executor = non_started_executor
+    # the events are read from the deployment block by default
+    monitor = OfferMonitor(web3, executor.address)
+    assert monitor.indexer.start_block == executor.tx.block_number
+
+    # before the first successful update, only the update status is exported
+    monitor.record_error()
+    metrics = get_metric_values(monitor)
+    assert set(metrics.keys()) == {'update_errors', 'last_update_timestamp_seconds'}
+    assert metrics['update_errors'] == 1
+    assert math.isnan(metrics['last_update_timestamp_seconds'])
+    assert f'{METRICS_PREFIX}_update_errors{{executor="{executor.address}"}} 1' in monitor.metrics.splitlines()
+
+    assert monitor.update()
+    last_update_time = get_metric_values(monitor)['last_update_timestamp_seconds']
+    assert not math.isnan(last_update_time)
+
+    # a failed update keeps the offer metrics and the time of the last successful update
+    monitor.record_error()
+    metrics = get_metric_values(monitor)
+    assert metrics['update_errors'] == 2
+    assert metrics['last_update_timestamp_seconds'] == last_update_time
+    assert metrics['ldo_remaining'] == sum(LDO_ALLOCATIONS) / 10**18
+    assert f'{METRICS_PREFIX}_update_errors{{executor="{executor.address}"}} 2' in monitor.metrics.splitlines()
@@ -16,7 +16,7 @@ OFFER_EXPIRATION_DELAY = 2629746 # one month
 DIRECT_TRANSFER_GAS_LIMIT=300_000
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='module')
 def deployed_executor_and_vote_id(accounts, ldo_holder):
     return deploy_and_start_dao_vote(
         {'from': ldo_holder},
@@ -25,7 +25,9 @@ def deployed_executor_and_vote_id(accounts, ldo_holder):
         vesting_end_delay=VESTING_END_DELAY,
         offer_expiration_delay=OFFER_EXPIRATION_DELAY,
         ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
-        total_ldo_sold=sum(LDO_ALLOCATIONS)
+        total_ldo_sold=sum(LDO_ALLOCATIONS),
+        # these tests start the offer themselves after the funding vote
+        start_offer=False
     )
 
 @pytest.fixture(scope='function')
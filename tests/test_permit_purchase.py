@@ -0,0 +1,112 @@
+import pytest
+from brownie import chain, reverts
+
+from purchase_config import DAI_TO_LDO_RATE_PRECISION
+from utils.dai_permit import get_dai_domain_separator, sign_dai_permit
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one DAI
+DAI_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+
+
+@pytest.fixture(scope='function')
+def executor(funded_executor):
+    return funded_executor
+
+
+def test_dai_domain_separator_matches_mainnet_dai(dai_token):
+    assert bytes(dai_token.DOMAIN_SEPARATOR()) == get_dai_domain_separator()
+
+
+def test_purchase_with_permit(signers, executor, helpers, dao_agent, ldo_token, dai_token, dao_token_manager):
+    purchaser = signers[0]
+    purchase_ldo_amount = LDO_ALLOCATIONS[0]
+    dai_cost = purchase_ldo_amount * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(purchaser, dai_cost)
+    assert dai_token.allowance(purchaser, executor) == 0
+
+    nonce = dai_token.nonces(purchaser)
+    expiry = chain.time() + 3600
+    (v, r, s) = sign_dai_permit(purchaser.private_key, executor.address, nonce, expiry)
+
+    dai_agent_balance_before = dai_token.balanceOf(dao_agent)
+
+    tx = executor.execute_purchase_with_permit(nonce, expiry, v, r, s, { 'from': purchaser })
+    purchase_evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+
+    assert purchase_evt['ldo_receiver'] == purchaser
+    assert purchase_evt['ldo_allocation'] == purchase_ldo_amount
+    assert purchase_evt['dai_cost'] == dai_cost
+
+    assert dai_token.nonces(purchaser) == nonce + 1
+    assert dai_token.balanceOf(purchaser) == 0
+    assert dai_token.balanceOf(dao_agent) == dai_agent_balance_before + dai_cost
+    assert ldo_token.balanceOf(purchaser) == purchase_ldo_amount
+
+    vesting = dao_token_manager.getVesting(purchaser, purchase_evt['vesting_id'])
+    assert vesting['amount'] == purchase_ldo_amount
+    assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+
+
+def test_purchase_with_permit_for_another_receiver(accounts, signers, executor, helpers, ldo_token, dai_token):
+    payer = signers[5]
+    purchaser = accounts[1]
+    dai_cost = LDO_ALLOCATIONS[1] * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(payer, dai_cost)
+
+    nonce = dai_token.nonces(payer)
+    (v, r, s) = sign_dai_permit(payer.private_key, executor.address, nonce, 0)
+
+    executor.execute_purchase_with_permit(nonce, 0, v, r, s, purchaser, { 'from': payer })
+
+    assert dai_token.balanceOf(payer) == 0
+    assert ldo_token.balanceOf(purchaser) == LDO_ALLOCATIONS[1]
+
+
+def test_purchase_with_permit_fails_on_invalid_signature(signers, executor, helpers, dai_token):
+    purchaser = signers[0]
+    stranger = signers[5]
+    dai_cost = LDO_ALLOCATIONS[0] * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(purchaser, dai_cost)
+
+    nonce = dai_token.nonces(purchaser)
+    (v, r, s) = sign_dai_permit(stranger.private_key, executor.address, nonce, 0)
+
+    with reverts():
+        executor.execute_purchase_with_permit(nonce, 0, v, r, s, { 'from': purchaser })
+
+    (v, r, s) = sign_dai_permit(purchaser.private_key, executor.address, nonce + 1, 0)
+
+    with reverts():
+        executor.execute_purchase_with_permit(nonce + 1, 0, v, r, s, { 'from': purchaser })
+
+    with reverts("invalid signature"):
+        executor.execute_purchase_with_permit(nonce, 0, 256, r, s, { 'from': purchaser })
+
+
+def test_purchase_with_permit_succeeds_if_permit_was_front_run(signers, executor, helpers, ldo_token, dai_token):
+    purchaser = signers[0]
+    stranger = signers[5]
+    dai_cost = LDO_ALLOCATIONS[0] * DAI_TO_LDO_RATE_PRECISION // DAI_TO_LDO_RATE
+
+    helpers.fund_with_dai(purchaser, dai_cost)
+
+    nonce = dai_token.nonces(purchaser)
+    (v, r, s) = sign_dai_permit(purchaser.private_key, executor.address, nonce, 0)
+
+    # somebody submits the permit observed in the mempool directly to the DAI contract
+    dai_token.permit(purchaser, executor, nonce, 0, True, v, r, s, { 'from': stranger })
+
+    executor.execute_purchase_with_permit(nonce, 0, v, r, s, { 'from': purchaser })
+
+    assert ldo_token.balanceOf(purchaser) == LDO_ALLOCATIONS[0]
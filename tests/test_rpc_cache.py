@@ -0,0 +1,59 @@
+import pytest
+from brownie import chain, web3
+
+from utils.multicall import multicall
+from utils.rpc_cache import RpcCache, block_pinned_rpc_cache
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+
+def test_cache_serves_pinned_block_only(tmp_path):
+    cache = RpcCache(tmp_path / 'cache.sqlite')
+    cache.pin_block(1, 100, '0xaa')
+
+    requests = []
+    def make_request(method, params):
+        requests.append((method, params))
+        return {'jsonrpc': '2.0', 'id': 1, 'result': f'0x{len(requests):02x}'}
+
+    middleware = cache.middleware(1, 100)(make_request, None)
+    call = {'to': '0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32', 'data': '0x18160ddd'}
+
+    assert middleware('eth_call', [call, hex(100)])['result'] == '0x01'
+    assert middleware('eth_call', [call, hex(100)])['result'] == '0x01'
+    assert middleware('eth_call', [call, 'latest'])['result'] == '0x02'
+    assert middleware('eth_call', [call, hex(99)])['result'] == '0x03'
+    assert middleware('eth_sendTransaction', [call])['result'] == '0x04'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # pinning the same block again keeps the entries, another block or hash drops them
+    cache.pin_block(1, 100, '0xaa')
+    assert middleware('eth_call', [call, hex(100)])['result'] == '0x01'
+    cache.pin_block(1, 100, '0xbb')
+    assert middleware('eth_call', [call, hex(100)])['result'] == '0x05'
+    cache.pin_block(1, 101, '0xcc')
+    assert cache.get(1, 100, '["eth_call", [{"data": "0x18160ddd", "to": "0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32"}, "0x64"]]') is None
+
+
+def test_cached_multicall_returns_same_values(tmp_path, funded_executor, ldo_token, accounts):
+    executor = funded_executor
+    calls = [ (executor.dai_to_ldo_rate, []), (ldo_token.balanceOf, [executor.address]) ]
+    calls += [ (executor.get_allocation, [accounts[i]]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+
+    chain.mine()
+    block_number = chain.height
+    expected = multicall(calls, block_identifier=block_number)
+
+    with block_pinned_rpc_cache(web3, block_number, tmp_path / 'cache.sqlite') as cache:
+        assert multicall(calls, block_identifier=block_number) == expected
+        assert cache.hits == 0 and cache.misses > 0
+
+    with block_pinned_rpc_cache(web3, block_number, tmp_path / 'cache.sqlite') as cache:
+        assert multicall(calls, block_identifier=block_number) == expected
+        assert cache.hits > 0 and cache.misses == 0
+
+    assert 'rpc_cache' not in web3.middleware_onion
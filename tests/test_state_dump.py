@@ -0,0 +1,69 @@
+from brownie import chain, history
+
+from utils.mainnet_fork import chain_snapshot
+from utils.state_dump import dump_state, read_state_dump, load_state
+
+
+def read_purchase_state(executor, purchaser, ldo_token, dai_token, dao_agent, dao_token_manager):
+    return (
+        executor.get_allocation(purchaser),
+        ldo_token.balanceOf(purchaser),
+        ldo_token.balanceOf(executor),
+        dai_token.balanceOf(purchaser),
+        dai_token.balanceOf(dao_agent),
+        dao_token_manager.vestingsLengths(purchaser),
+        dao_token_manager.transferableBalance(purchaser, executor.offer_expires_at())
+    )
+
+
+def test_loaded_state_dump_matches_dumped_state(
+    tmp_path,
+    accounts,
+    funded_executor,
+    helpers,
+    ldo_token,
+    dai_token,
+    dao_agent,
+    dao_token_manager
+):
+    executor = funded_executor
+    purchaser = accounts[0]
+    filename = str(tmp_path / 'state.json')
+    before = read_purchase_state(executor, purchaser, ldo_token, dai_token, dao_agent, dao_token_manager)
+
+    with chain_snapshot():
+        txs_count = len(history)
+        (_, dai_cost) = executor.get_allocation(purchaser)
+        helpers.fund_with_dai(purchaser, dai_cost)
+        dai_token.approve(executor, dai_cost, { 'from': purchaser })
+        executor.execute_purchase(purchaser, { 'from': purchaser })
+
+        dump_state(filename, history[txs_count:], {'purchaser': purchaser.address})
+        after = read_purchase_state(executor, purchaser, ldo_token, dai_token, dao_agent, dao_token_manager)
+
+    assert read_purchase_state(executor, purchaser, ldo_token, dai_token, dao_agent, dao_token_manager) == before
+    assert after != before
+
+    assert load_state(read_state_dump(filename)) == {'purchaser': purchaser.address}
+    assert read_purchase_state(executor, purchaser, ldo_token, dai_token, dao_agent, dao_token_manager) == after
+
+    # the nonces are restored too, so the next transactions don't conflict with the loaded ones
+    dai_token.approve(executor, 0, { 'from': purchaser })
+
+
+def test_state_dump_is_only_read_at_its_base_block(tmp_path, accounts, funded_executor, helpers, dai_token):
+    purchaser = accounts[0]
+    filename = str(tmp_path / 'state.json')
+
+    with chain_snapshot():
+        txs_count = len(history)
+        helpers.fund_with_dai(purchaser, 10**18)
+        dai_token.approve(funded_executor, 10**18, { 'from': purchaser })
+        dump_state(filename, history[txs_count:], {})
+
+    assert read_state_dump(filename) is not None
+
+    # a chain past the base block has it with the same hash but may have different state
+    with chain_snapshot():
+        chain.mine()
+        assert read_state_dump(filename) is None
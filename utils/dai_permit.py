@@ -0,0 +1,43 @@
+from eth_abi import encode_abi
+from eth_keys import keys
+from eth_utils import keccak, to_bytes
+
+from utils.config import dai_token_address
+
+EIP712_DOMAIN_TYPEHASH = keccak(text='EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)')
+DAI_PERMIT_TYPEHASH = keccak(text='Permit(address holder,address spender,uint256 nonce,uint256 expiry,bool allowed)')
+
+# the DAI contract computes its domain separator once on deployment, so it
+# stays bound to the mainnet chain id on mainnet forks too
+DAI_CHAIN_ID = 1
+
+
+def get_dai_domain_separator(chain_id=DAI_CHAIN_ID, dai_address=dai_token_address):
+    return keccak(encode_abi(
+        ['bytes32', 'bytes32', 'bytes32', 'uint256', 'address'],
+        [EIP712_DOMAIN_TYPEHASH, keccak(text='Dai Stablecoin'), keccak(text='1'), chain_id, dai_address]
+    ))
+
+
+def get_dai_permit_digest(holder, spender, nonce, expiry, allowed=True, domain_separator=None):
+    if domain_separator is None:
+        domain_separator = get_dai_domain_separator()
+
+    struct_hash = keccak(encode_abi(
+        ['bytes32', 'address', 'address', 'uint256', 'uint256', 'bool'],
+        [DAI_PERMIT_TYPEHASH, str(holder), str(spender), nonce, expiry, allowed]
+    ))
+
+    return keccak(b'\x19\x01' + domain_separator + struct_hash)
+
+
+def sign_dai_permit(private_key, spender, nonce, expiry, allowed=True, domain_separator=None):
+    # returns the (v, r, s) signature to be passed to `PurchaseExecutor.execute_purchase_with_permit`
+    # or to `Dai.permit`, signing the permit offline with the holder's private key
+    private_key = keys.PrivateKey(to_bytes(hexstr=private_key) if isinstance(private_key, str) else private_key)
+    holder = private_key.public_key.to_checksum_address()
+
+    digest = get_dai_permit_digest(holder, spender, nonce, expiry, allowed, domain_separator)
+    signature = private_key.sign_msg_hash(digest)
+
+    return (signature.v + 27, to_bytes(signature.r).rjust(32, b'\x00'), to_bytes(signature.s).rjust(32, b'\x00'))
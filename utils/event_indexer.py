@@ -0,0 +1,272 @@
+import os
+import sqlite3
+import eth_abi
+from eth_utils import keccak, to_checksum_address
+
+# An incremental index of the executor events in an SQLite file. The logs are fetched in
+# bounded block ranges and stored together with the hash of the last block of each range,
+# which is the cursor the next run resumes from. Only blocks at least `confirmations` deep
+# are indexed, so shallower reorgs never reach the index; if a deeper one replaces indexed
+# blocks anyway, the events after the last block still on the chain are dropped and indexed
+# again. One file can hold the events of several executors and chains.
+
+EVENT_INDEX_FILE = os.environ.get('EVENT_INDEX_FILE', '.event_index.sqlite')
+EVENT_INDEX_CONFIRMATIONS = int(os.environ.get('EVENT_INDEX_CONFIRMATIONS', '12'))
+# blocks per `eth_getLogs` request, halved while the node rejects the range
+EVENT_INDEX_CHUNK_SIZE = int(os.environ.get('EVENT_INDEX_CHUNK_SIZE', '2000'))
+
+
+def _get_topic(signature):
+    return keccak(text=signature)
+
+
+PURCHASE_EXECUTED_TOPIC = _get_topic('PurchaseExecuted(address,uint256,uint256,uint256)')
+OFFER_STARTED_TOPIC = _get_topic('OfferStarted(uint256,uint256)')
+ERC20_RECOVERED_TOPIC = _get_topic('ERC20Recovered(address,address,uint256)')
+
+EVENT_TOPICS = [PURCHASE_EXECUTED_TOPIC, OFFER_STARTED_TOPIC, ERC20_RECOVERED_TOPIC]
+
+# uint256 amounts don't fit SQLite integers, so they're stored as decimal strings
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        chain_id INTEGER NOT NULL,
+        executor TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        block_hash TEXT NOT NULL,
+        PRIMARY KEY (chain_id, executor, block_number)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS purchases (
+        chain_id INTEGER NOT NULL,
+        executor TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        log_index INTEGER NOT NULL,
+        tx_hash TEXT NOT NULL,
+        ldo_receiver TEXT NOT NULL,
+        ldo_allocation TEXT NOT NULL,
+        dai_cost TEXT NOT NULL,
+        vesting_id INTEGER NOT NULL,
+        PRIMARY KEY (chain_id, executor, block_number, log_index)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS offer_starts (
+        chain_id INTEGER NOT NULL,
+        executor TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        log_index INTEGER NOT NULL,
+        tx_hash TEXT NOT NULL,
+        started_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        PRIMARY KEY (chain_id, executor, block_number, log_index)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS recoveries (
+        chain_id INTEGER NOT NULL,
+        executor TEXT NOT NULL,
+        block_number INTEGER NOT NULL,
+        log_index INTEGER NOT NULL,
+        tx_hash TEXT NOT NULL,
+        requested_by TEXT NOT NULL,
+        token TEXT NOT NULL,
+        amount TEXT NOT NULL,
+        PRIMARY KEY (chain_id, executor, block_number, log_index)
+    )
+    '''
+]
+
+EVENT_TABLES = ['purchases', 'offer_starts', 'recoveries']
+
+
+def _to_bytes(value):
+    # web3 returns log data as a hex string and topics as HexBytes
+    return bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+
+
+def _to_hex(value):
+    return '0x' + _to_bytes(value).hex()
+
+
+def decode_log(log):
+    # returns `(table, values)` for an executor event, or None for any other log
+    topics = [ _to_bytes(topic) for topic in log['topics'] ]
+    data = _to_bytes(log['data'])
+
+    if topics[0] == PURCHASE_EXECUTED_TOPIC:
+        (ldo_allocation, dai_cost, vesting_id) = eth_abi.decode_abi(['uint256', 'uint256', 'uint256'], data)
+        return ('purchases', [to_checksum_address(topics[1][-20:]), str(ldo_allocation), str(dai_cost), vesting_id])
+    if topics[0] == OFFER_STARTED_TOPIC:
+        return ('offer_starts', list(eth_abi.decode_abi(['uint256', 'uint256'], data)))
+    if topics[0] == ERC20_RECOVERED_TOPIC:
+        (amount,) = eth_abi.decode_abi(['uint256'], data)
+        return ('recoveries', [to_checksum_address(topics[1][-20:]), to_checksum_address(topics[2][-20:]), str(amount)])
+    return None
+
+
+def find_deployment_block(web3, address):
+    # the first block with the contract code at the address, by a binary search over the historical
+    # state, so it needs an archive node unless the contract was deployed in the last few blocks
+    (low, high) = (0, web3.eth.block_number)
+    if len(web3.eth.get_code(address, high)) == 0:
+        raise ValueError(f'no contract at {address}')
+    while low < high:
+        middle = (low + high) // 2
+        if len(web3.eth.get_code(address, middle)) > 0:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        web3,
+        executor_address,
+        start_block=0,
+        filename=EVENT_INDEX_FILE,
+        confirmations=EVENT_INDEX_CONFIRMATIONS,
+        chunk_size=EVENT_INDEX_CHUNK_SIZE
+    ):
+        self.web3 = web3
+        self.executor = to_checksum_address(executor_address)
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+        self.key = (web3.eth.chain_id, self.executor)
+        self.db = sqlite3.connect(filename)
+        for statement in SCHEMA:
+            self.db.execute(statement)
+        self.db.commit()
+        # blocks dropped from the index because of reorgs, over the lifetime of the object
+        self.reorged_blocks = 0
+
+    def close(self):
+        self.db.close()
+
+    def get_cursor(self):
+        # the last indexed block and its hash, or None if nothing is indexed yet
+        return self.db.execute(
+            'SELECT block_number, block_hash FROM checkpoints WHERE chain_id = ? AND executor = ? ORDER BY block_number DESC LIMIT 1',
+            self.key
+        ).fetchone()
+
+    def sync(self):
+        """
+        Indexes the events up to `confirmations` blocks behind the head, resuming from
+        the cursor. Returns the number of new events.
+        """
+        self._rollback_reorged()
+
+        cursor = self.get_cursor()
+        from_block = self.start_block if cursor is None else cursor[0] + 1
+        to_block = self.web3.eth.block_number - self.confirmations
+        events_count = 0
+
+        while from_block <= to_block:
+            chunk_end = min(from_block + self.chunk_size - 1, to_block)
+            try:
+                logs = self.web3.eth.get_logs({
+                    'address': self.executor,
+                    'fromBlock': from_block,
+                    'toBlock': chunk_end,
+                    'topics': [[ _to_hex(topic) for topic in EVENT_TOPICS ]]
+                })
+            except ValueError:
+                # the node limits the range or the number of results of a request
+                if chunk_end == from_block:
+                    raise
+                self.chunk_size = max(1, (chunk_end - from_block + 1) // 2)
+                continue
+
+            block_hash = _to_hex(self.web3.eth.get_block(chunk_end)['hash'])
+            events_count += self._store(logs, chunk_end, block_hash)
+            from_block = chunk_end + 1
+
+        return events_count
+
+    def _store(self, logs, block_number, block_hash):
+        # the events and the cursor move in one transaction, so an interrupted sync resumes cleanly
+        count = 0
+        with self.db:
+            for log in logs:
+                decoded = decode_log(log)
+                if decoded is None:
+                    continue
+                (table, values) = decoded
+                row = [*self.key, log['blockNumber'], log['logIndex'], _to_hex(log['transactionHash']), *values]
+                self.db.execute(f'INSERT OR REPLACE INTO {table} VALUES ({", ".join(["?"] * len(row))})', row)
+                count += 1
+            self.db.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)', [*self.key, block_number, block_hash])
+        return count
+
+    def _rollback_reorged(self):
+        # walks the checkpoints back to the last one still on the chain and drops what follows it
+        checkpoints = self.db.execute(
+            'SELECT block_number, block_hash FROM checkpoints WHERE chain_id = ? AND executor = ? ORDER BY block_number DESC',
+            self.key
+        ).fetchall()
+        head = self.web3.eth.block_number
+
+        kept_block = self.start_block - 1
+        for (block_number, block_hash) in checkpoints:
+            if block_number <= head and _to_hex(self.web3.eth.get_block(block_number)['hash']) == block_hash:
+                kept_block = block_number
+                break
+
+        if len(checkpoints) == 0 or kept_block == checkpoints[0][0]:
+            return
+
+        with self.db:
+            for table in EVENT_TABLES + ['checkpoints']:
+                self.db.execute(f'DELETE FROM {table} WHERE chain_id = ? AND executor = ? AND block_number > ?', [*self.key, kept_block])
+        self.reorged_blocks += checkpoints[0][0] - kept_block
+
+    def get_purchases(self):
+        # `(ldo_receiver, ldo_allocation, dai_cost, vesting_id, block_number, tx_hash)` in the order of execution
+        rows = self.db.execute(
+            '''
+            SELECT ldo_receiver, ldo_allocation, dai_cost, vesting_id, block_number, tx_hash FROM purchases
+            WHERE chain_id = ? AND executor = ? ORDER BY block_number, log_index
+            ''',
+            self.key
+        ).fetchall()
+        return [ (receiver, int(allocation), int(dai_cost), vesting_id, block_number, tx_hash)
+            for (receiver, allocation, dai_cost, vesting_id, block_number, tx_hash) in rows ]
+
+    def get_vesting_ids(self):
+        vesting_ids = {}
+        for (receiver, _, _, vesting_id, _, _) in self.get_purchases():
+            vesting_ids.setdefault(receiver, []).append(vesting_id)
+        return vesting_ids
+
+    def get_offer_timestamps(self):
+        # `(started_at, expires_at)`, or None if the offer hasn't started
+        return self.db.execute(
+            'SELECT started_at, expires_at FROM offer_starts WHERE chain_id = ? AND executor = ? ORDER BY block_number LIMIT 1',
+            self.key
+        ).fetchone()
+
+    def get_recovered_amounts(self):
+        recovered = {}
+        for (token, amount) in self.db.execute(
+            'SELECT token, amount FROM recoveries WHERE chain_id = ? AND executor = ?',
+            self.key
+        ):
+            recovered[token] = recovered.get(token, 0) + int(amount)
+        return recovered
+
+    def get_sale_progress(self, ldo_allocations_total):
+        purchases = self.get_purchases()
+        ldo_sold = sum([ allocation for (_, allocation, _, _, _, _) in purchases ])
+        return {
+            'purchases_count': len(purchases),
+            'ldo_sold': ldo_sold,
+            'ldo_remaining': ldo_allocations_total - ldo_sold,
+            'dai_received': sum([ dai_cost for (_, _, dai_cost, _, _, _) in purchases ]),
+            'offer_timestamps': self.get_offer_timestamps(),
+            'recovered': self.get_recovered_amounts()
+        }
@@ -0,0 +1,31 @@
+import eth_abi
+from web3 import Web3
+
+from utils.evm_script import create_executor_id, strip_byte_prefix
+
+# The reference call script encoder and random scripts, shared by the encoding tests and
+# `scripts/benchmark_evm_script.py`.
+
+
+def encode_call_script_by_concatenation(actions, spec_id = 1):
+    # the previous implementation, kept for comparison
+    result = create_executor_id(spec_id)
+    for to, calldata in actions:
+        addr_bytes = Web3.toBytes(hexstr=to).hex()
+        calldata_bytes = strip_byte_prefix(calldata)
+        length = eth_abi.encode_single('int256', len(calldata_bytes) // 2).hex()
+        result += addr_bytes + length[56:] + calldata_bytes
+    return result
+
+
+def random_bytes(length, rng):
+    return bytes(rng.getrandbits(8) for _ in range(length))
+
+
+def random_actions(count, rng, targets_count=10):
+    # a typical vote calls a few DAO apps, each with a selector and a few words of arguments
+    targets = [ Web3.toChecksumAddress('0x' + random_bytes(20, rng).hex()) for _ in range(targets_count) ]
+    return [
+        (rng.choice(targets), '0x' + random_bytes(4 + 32 * rng.randint(0, 6), rng).hex())
+        for _ in range(count)
+    ]
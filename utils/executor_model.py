@@ -0,0 +1,393 @@
+from purchase_config import MAX_PURCHASERS, DAI_TO_LDO_RATE_PRECISION
+
+# An exact Python model of `contracts/PurchaseExecutor.vy` together with the parts of DAI, LDO,
+# TokenManager and Agent state the executor touches. It follows the contract's integer semantics
+# (uint256 overflow reverts, division rounds down), emits the same events and reverts with
+# the same reasons, as reported by brownie, so random operation sequences can be explored
+# much faster than on the EVM and the interesting ones replayed on a local chain.
+
+UINT256_MAX = 2**256 - 1
+MAX_VESTINGS_PER_ADDRESS = 50
+
+LDO = 'LDO'
+DAI = 'DAI'
+
+
+class ExecutorReverted(Exception):
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# revert reasons raised by the executor itself, as opposed to the reverts of the called contracts
+EXECUTOR_REVERT_REASONS = [
+    'not funded',
+    'offer expired',
+    'no allocation',
+    'no receivers',
+    'invalid signature',
+    'dev: offer not expired',
+    'not allowed'
+]
+
+
+def _require(condition, reason=None):
+    if not condition:
+        raise ExecutorReverted(reason)
+
+
+def _checked(value):
+    # vyper reverts on uint256 overflow
+    _require(value <= UINT256_MAX)
+    return value
+
+
+class ExecutorModel:
+    def __init__(
+        self,
+        dai_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_purchasers,
+        ldo_allocations_total,
+        direct_settlement=False
+    ):
+        # `ldo_purchasers` is a list of `(address, allocation)` pairs, not padded
+        _require(len(ldo_purchasers) <= MAX_PURCHASERS)
+        _require(dai_to_ldo_rate > 0)
+        _require(vesting_end_delay >= vesting_start_delay)
+        _require(offer_expiration_delay > 0)
+        _require(ldo_allocations_total > 0)
+
+        self.dai_to_ldo_rate = dai_to_ldo_rate
+        self.vesting_start_delay = vesting_start_delay
+        self.vesting_end_delay = vesting_end_delay
+        self.offer_expiration_delay = offer_expiration_delay
+        self.ldo_allocations_total = ldo_allocations_total
+        self.direct_settlement = direct_settlement
+        self.ldo_allocations = {}
+        self.offer_started_at = 0
+        self.offer_expires_at = 0
+
+        allocations_sum = 0
+        for (purchaser, allocation) in ldo_purchasers:
+            _require(self.ldo_allocations.get(purchaser, 0) == 0)
+            _require(allocation > 0)
+            self.ldo_allocations[purchaser] = allocation
+            allocations_sum = _checked(allocations_sum + allocation)
+
+        _require(allocations_sum == ldo_allocations_total)
+
+        # the external state: the executor's token balances, DAI balances and allowances given
+        # to the executor by payers, the DAO treasury DAI balance and the vestings of receivers
+        self.ldo_balance = 0
+        self.dai_balance = 0
+        self.dai_balances = {}
+        self.dai_allowances = {}
+        self.dao_dai_balance = 0
+        self.vestings = {}
+
+        self.events = []
+
+    def get_allocation(self, ldo_receiver):
+        ldo_allocation = self.ldo_allocations.get(ldo_receiver, 0)
+        dai_cost = _checked(ldo_allocation * DAI_TO_LDO_RATE_PRECISION) // self.dai_to_ldo_rate
+        return (ldo_allocation, dai_cost)
+
+    def offer_started(self):
+        return self.offer_started_at != 0
+
+    def offer_expired(self, timestamp):
+        return self.offer_started_at != 0 and timestamp >= self.offer_expires_at
+
+    def _transact(self, fn, *args):
+        # state changes and events of a reverted call are discarded, same as on the EVM
+        saved = self._save()
+        events_count = len(self.events)
+        try:
+            return fn(*args)
+        except ExecutorReverted:
+            self._restore(saved)
+            del self.events[events_count:]
+            raise
+
+    def _save(self):
+        return (
+            dict(self.ldo_allocations),
+            self.offer_started_at,
+            self.offer_expires_at,
+            self.ldo_balance,
+            self.dai_balance,
+            dict(self.dai_balances),
+            dict(self.dai_allowances),
+            self.dao_dai_balance,
+            { receiver: list(vestings) for (receiver, vestings) in self.vestings.items() }
+        )
+
+    def _restore(self, saved):
+        (
+            self.ldo_allocations,
+            self.offer_started_at,
+            self.offer_expires_at,
+            self.ldo_balance,
+            self.dai_balance,
+            self.dai_balances,
+            self.dai_allowances,
+            self.dao_dai_balance,
+            self.vestings
+        ) = saved
+
+    def _start_unless_started(self, timestamp):
+        if self.offer_started_at == 0:
+            _require(self.ldo_balance >= self.ldo_allocations_total, 'not funded')
+            started_at = timestamp
+            expires_at = _checked(started_at + self.offer_expiration_delay)
+            self.offer_started_at = started_at
+            self.offer_expires_at = expires_at
+            self.events.append(('OfferStarted', { 'started_at': started_at, 'expires_at': expires_at }))
+
+    def _dai_transfer_from(self, src, wad):
+        # DAI checks the balance first, then the allowance, unless it is infinite
+        _require(self.dai_balances.get(src, 0) >= wad, 'Dai/insufficient-balance')
+        allowance = self.dai_allowances.get(src, 0)
+        if allowance != UINT256_MAX:
+            _require(allowance >= wad, 'Dai/insufficient-allowance')
+            self.dai_allowances[src] = allowance - wad
+        self.dai_balances[src] -= wad
+
+    def _receive_dai(self, payer, dai_cost):
+        self._dai_transfer_from(payer, dai_cost)
+        if self.direct_settlement:
+            # DAI goes straight from the payer to the Agent, and zero transfers don't revert
+            self.dao_dai_balance += dai_cost
+            return
+        self.dai_balance += dai_cost
+        # the executor approves the exact amount and the Agent pulls it in `deposit`
+        _require(dai_cost > 0, 'VAULT_DEPOSIT_VALUE_ZERO')
+        self.dai_balance -= dai_cost
+        self.dao_dai_balance += dai_cost
+
+    def _assign_vested(self, ldo_receiver, ldo_allocation, timestamp):
+        vesting_start = _checked(timestamp + self.vesting_start_delay)
+        vesting_end = _checked(timestamp + self.vesting_end_delay)
+        vestings = self.vestings.setdefault(ldo_receiver, [])
+        _require(len(vestings) < MAX_VESTINGS_PER_ADDRESS, 'TM_TOO_MANY_VESTINGS')
+        vestings.append({
+            'amount': ldo_allocation,
+            'start': vesting_start,
+            'cliff': vesting_start,
+            'vesting': vesting_end
+        })
+        return len(vestings) - 1
+
+    def _transfer_ldo_to_token_manager(self, amount):
+        # MiniMe returns false instead of reverting on insufficient balance
+        _require(self.ldo_balance >= amount)
+        self.ldo_balance -= amount
+
+    def _execute_purchase(self, ldo_receiver, payer, timestamp):
+        self._start_unless_started(timestamp)
+        _require(timestamp < self.offer_expires_at, 'offer expired')
+
+        (ldo_allocation, dai_cost) = self.get_allocation(ldo_receiver)
+        _require(ldo_allocation > 0, 'no allocation')
+
+        self.ldo_allocations[ldo_receiver] = 0
+
+        self._receive_dai(payer, dai_cost)
+        self._transfer_ldo_to_token_manager(ldo_allocation)
+
+        vesting_id = self._assign_vested(ldo_receiver, ldo_allocation, timestamp)
+
+        self.events.append(('PurchaseExecuted', {
+            'ldo_receiver': ldo_receiver,
+            'ldo_allocation': ldo_allocation,
+            'dai_cost': dai_cost,
+            'vesting_id': vesting_id
+        }))
+
+        return vesting_id
+
+    def _execute_purchases(self, ldo_receivers, payer, timestamp):
+        self._start_unless_started(timestamp)
+        _require(timestamp < self.offer_expires_at, 'offer expired')
+
+        # `ldo_receivers` is not padded; the contract stops at the first zero address
+        _require(len(ldo_receivers) <= MAX_PURCHASERS)
+        purchases = []
+
+        for ldo_receiver in ldo_receivers:
+            (ldo_allocation, dai_cost) = self.get_allocation(ldo_receiver)
+            _require(ldo_allocation > 0, 'no allocation')
+            self.ldo_allocations[ldo_receiver] = 0
+            purchases.append((ldo_receiver, ldo_allocation, dai_cost))
+
+        _require(len(purchases) > 0, 'no receivers')
+
+        self._receive_dai(payer, _checked(sum([ dai_cost for (_, _, dai_cost) in purchases ])))
+        self._transfer_ldo_to_token_manager(_checked(sum([ allocation for (_, allocation, _) in purchases ])))
+
+        vesting_ids = []
+
+        for (ldo_receiver, ldo_allocation, dai_cost) in purchases:
+            vesting_id = self._assign_vested(ldo_receiver, ldo_allocation, timestamp)
+            vesting_ids.append(vesting_id)
+            self.events.append(('PurchaseExecuted', {
+                'ldo_receiver': ldo_receiver,
+                'ldo_allocation': ldo_allocation,
+                'dai_cost': dai_cost,
+                'vesting_id': vesting_id
+            }))
+
+        return vesting_ids
+
+    def _execute_purchase_with_permit(self, v, permit_valid, ldo_receiver, sender, timestamp):
+        _require(v < 256, 'invalid signature')
+
+        (_, dai_cost) = self.get_allocation(ldo_receiver)
+
+        if self.dai_allowances.get(sender, 0) < dai_cost:
+            # a valid permit sets an infinite allowance
+            _require(permit_valid, 'Dai/invalid-permit')
+            self.dai_allowances[sender] = UINT256_MAX
+
+        return self._execute_purchase(ldo_receiver, sender, timestamp)
+
+    def _recover_erc20(self, token, amount, sender, timestamp):
+        _require(self.offer_expired(timestamp), 'dev: offer not expired')
+
+        if token == LDO:
+            # MiniMe returns false, which the executor ignores
+            if self.ldo_balance >= amount:
+                self.ldo_balance -= amount
+        elif token == DAI:
+            _require(self.dai_balance >= amount, 'Dai/insufficient-balance')
+            self.dai_balance -= amount
+            self.dao_dai_balance += amount
+        else:
+            raise ValueError(f'unknown token {token}')
+
+        self.events.append(('ERC20Recovered', { 'requested_by': sender, 'token': token, 'amount': amount }))
+
+    # The methods below are the external functions of the contract, with `timestamp` being the
+    # timestamp of the block the transaction is included to. A reverted call raises
+    # `ExecutorReverted` and leaves the state unchanged.
+
+    def start(self, timestamp):
+        return self._transact(self._start_unless_started, timestamp)
+
+    def execute_purchase(self, ldo_receiver, payer, timestamp):
+        return self._transact(self._execute_purchase, ldo_receiver, payer, timestamp)
+
+    def execute_purchases(self, ldo_receivers, payer, timestamp):
+        return self._transact(self._execute_purchases, ldo_receivers, payer, timestamp)
+
+    def execute_purchase_with_permit(self, v, ldo_receiver, sender, timestamp, permit_valid=True):
+        return self._transact(self._execute_purchase_with_permit, v, permit_valid, ldo_receiver, sender, timestamp)
+
+    def recover_erc20(self, token, amount, sender, timestamp):
+        return self._transact(self._recover_erc20, token, amount, sender, timestamp)
+
+    def send_ether(self, amount):
+        raise ExecutorReverted('not allowed')
+
+    # The methods below change the external state the same way the token contracts do.
+
+    def fund_ldo(self, amount):
+        self.ldo_balance += amount
+
+    def fund_dai(self, holder, amount):
+        self.dai_balances[holder] = self.dai_balances.get(holder, 0) + amount
+
+    def approve_dai(self, holder, amount):
+        self.dai_allowances[holder] = amount
+
+
+# Operations are `(name, *args)` tuples, so that a sequence explored on the model can be replayed
+# on a chain as is. Each operation except `sleep` is included to its own block.
+
+def apply_operation(model, operation, timestamp):
+    # returns `(True, return_value)` or `(False, revert_reason)`
+    (name, *args) = operation
+    try:
+        if name == 'fund_dai':
+            return (True, model.fund_dai(*args))
+        elif name == 'approve_dai':
+            return (True, model.approve_dai(*args))
+        elif name == 'start':
+            return (True, model.start(timestamp))
+        elif name == 'execute_purchase':
+            (ldo_receiver, payer) = args
+            return (True, model.execute_purchase(ldo_receiver, payer, timestamp))
+        elif name == 'execute_purchases':
+            (ldo_receivers, payer) = args
+            return (True, model.execute_purchases(ldo_receivers, payer, timestamp))
+        elif name == 'recover_erc20':
+            (token, amount, sender) = args
+            return (True, model.recover_erc20(token, amount, sender, timestamp))
+        else:
+            raise ValueError(f'unknown operation {name}')
+    except ExecutorReverted as err:
+        return (False, err.reason)
+
+
+def random_operations(rng, model, payers, count, max_sleep):
+    """
+    Returns `count` random operations on the executor described by `model`, paid for by `payers`.
+    The first payer, which is not a purchaser, is used as a receiver as well. DAI amounts are
+    picked around the purchase costs to hit the insufficient balance and allowance boundaries.
+    """
+    receivers = list(model.ldo_allocations.keys()) + [ payers[0] ]
+    dai_costs = [ model.get_allocation(receiver)[1] for receiver in model.ldo_allocations.keys() ]
+    operations = []
+
+    def random_amount():
+        dai_cost = rng.choice(dai_costs)
+        return rng.choice([0, 1, dai_cost - 1, dai_cost, sum(dai_costs), rng.randint(1, sum(dai_costs))])
+
+    for _ in range(0, count):
+        kind = rng.choice([
+            'sleep',
+            'start',
+            'fund_dai',
+            'approve_dai',
+            'execute_purchase',
+            'execute_purchase',
+            'execute_purchases',
+            'recover_erc20'
+        ])
+        if kind == 'sleep':
+            operations.append(('sleep', rng.choice([1, rng.randint(1, max_sleep), max_sleep])))
+        elif kind == 'start':
+            operations.append(('start',))
+        elif kind in ['fund_dai', 'approve_dai']:
+            operations.append((kind, rng.choice(payers), random_amount()))
+        elif kind == 'execute_purchase':
+            operations.append(('execute_purchase', rng.choice(receivers), rng.choice(payers)))
+        elif kind == 'execute_purchases':
+            # duplicates are allowed to hit the corresponding revert
+            receivers_count = rng.randint(0, len(receivers))
+            operations.append((
+                'execute_purchases',
+                [ rng.choice(receivers) for _ in range(0, receivers_count) ],
+                rng.choice(payers)
+            ))
+        elif kind == 'recover_erc20':
+            operations.append(('recover_erc20', rng.choice([LDO, DAI]), random_amount(), rng.choice(payers)))
+
+    return operations
+
+
+def simulate(model, operations, start_timestamp):
+    # returns the outcome of each operation, one second passing between blocks
+    timestamp = start_timestamp
+    outcomes = []
+    for operation in operations:
+        if operation[0] == 'sleep':
+            timestamp += operation[1]
+            outcomes.append((True, None))
+            continue
+        timestamp += 1
+        outcomes.append(apply_operation(model, operation, timestamp))
+    return outcomes
@@ -0,0 +1,283 @@
+import os
+import time
+import socket
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from web3 import Web3, HTTPProvider
+
+
+# Reception checks are split across several local fork nodes, each driven by its own process.
+# Workers use plain web3 instead of brownie since brownie keeps a single global network
+# connection; everything they need (addresses, ABIs, purchase arguments) is passed explicitly.
+
+FORK_WORKER_CMD = os.environ.get('FORK_WORKER_CMD', 'ganache-cli')
+FORK_WORKER_GAS_LIMIT = 12000000
+FORK_WORKER_STARTUP_TIMEOUT = 120
+FORK_WORKER_RPC_TIMEOUT = 120
+
+# ETH sent to impersonated accounts that don't have enough to pay for gas
+MIN_ACCOUNT_ETH_BALANCE = 10**18
+
+
+def get_workers_count(setting, jobs_count):
+    # `auto` starts one worker per available core; never more workers than jobs
+    if setting == 'auto':
+        workers = os.cpu_count() or 1
+    else:
+        workers = int(setting)
+    return max(1, min(workers, jobs_count))
+
+
+def split_into_chunks(items, chunks_count):
+    # round-robin keeps chunk sizes within one item of each other
+    chunks = [ items[i::chunks_count] for i in range(0, chunks_count) ]
+    return [ chunk for chunk in chunks if len(chunk) > 0 ]
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fork_node(fork_url, block_number, block_timestamp, unlocked_addresses):
+    port = _get_free_port()
+    # the fork starts at the timestamp of the forked block instead of the wall clock, since
+    # the parent chain may already be ahead of it
+    start_time = datetime.fromtimestamp(block_timestamp, timezone.utc).isoformat()
+    cmd = [
+        FORK_WORKER_CMD,
+        '--fork', f'{fork_url}@{block_number}',
+        '--port', str(port),
+        '--gasLimit', str(FORK_WORKER_GAS_LIMIT),
+        '--time', start_time,
+        '--accounts', '1'
+    ]
+    for address in unlocked_addresses:
+        cmd += ['--unlock', address]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (process, f'http://127.0.0.1:{port}')
+
+
+def wait_for_fork_node(process, rpc_url, timeout=FORK_WORKER_STARTUP_TIMEOUT):
+    w3 = Web3(HTTPProvider(rpc_url))
+    deadline = time.time() + timeout
+    while not w3.isConnected():
+        if process.poll() is not None:
+            raise RuntimeError(f'fork node at {rpc_url} exited with code {process.returncode}')
+        if time.time() > deadline:
+            raise TimeoutError(f'fork node at {rpc_url} did not start in {timeout} seconds')
+        time.sleep(0.5)
+
+
+def run_in_forks(fork_url, block_number, block_timestamp, unlocked_addresses, fn, jobs, workers):
+    """
+    Starts `workers` fork nodes of `fork_url` at `block_number`, splits `jobs` between them
+    and calls `fn(rpc_url, jobs_chunk)` for each node in a separate process. Returns the list
+    of `fn` results in the order of the chunks. The nodes are stopped on return.
+    """
+    chunks = split_into_chunks(jobs, workers)
+    nodes = []
+
+    try:
+        # the nodes are started at once, then waited for, since each takes a while to fork
+        for _ in chunks:
+            nodes.append(start_fork_node(fork_url, block_number, block_timestamp, unlocked_addresses))
+        for (process, rpc_url) in nodes:
+            wait_for_fork_node(process, rpc_url)
+
+        # spawned workers don't inherit the open connections and threads of the parent
+        mp_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=mp_context) as pool:
+            futures = [ pool.submit(fn, rpc_url, chunk) for ((_, rpc_url), chunk) in zip(nodes, chunks) ]
+            return [ future.result() for future in futures ]
+    finally:
+        for (process, _) in nodes:
+            process.terminate()
+        for (process, _) in nodes:
+            process.wait()
+
+
+def _transact(w3, fn, sender):
+    tx_hash = fn.transact({ 'from': sender })
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    # ganache >= 7 doesn't raise on reverted transactions by default
+    assert receipt.status == 1, f'transaction {tx_hash.hex()} from {sender} reverted'
+    return receipt
+
+
+def _rpc(w3, method, params):
+    response = w3.provider.make_request(method, params)
+    assert 'error' not in response, f'{method} failed: {response["error"]}'
+    return response['result']
+
+
+def _ensure_eth_balance(w3, address):
+    if w3.eth.get_balance(address) < MIN_ACCOUNT_ETH_BALANCE:
+        tx_hash = w3.eth.send_transaction({
+            'from': w3.eth.accounts[0],
+            'to': address,
+            'value': MIN_ACCOUNT_ETH_BALANCE
+        })
+        w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def _is_ldo_transferable(ldo_token, holder, amount, recipient):
+    # checked with a call, so nothing has to be reverted afterwards
+    try:
+        return ldo_token.functions.transfer(recipient, amount).call({ 'from': holder })
+    except ValueError:
+        return False
+
+
+def _at_time(w3, timestamp, fn):
+    # runs `fn` in a block mined at `timestamp` or later, reverting the chain afterwards
+    snapshot_id = _rpc(w3, 'evm_snapshot', [])
+    try:
+        delay = timestamp - w3.eth.get_block('latest')['timestamp']
+        if delay > 0:
+            _rpc(w3, 'evm_increaseTime', [delay])
+        _rpc(w3, 'evm_mine', [])
+        return fn()
+    finally:
+        _rpc(w3, 'evm_revert', [snapshot_id])
+
+
+def _check_lockup_by_transfers(w3, ldo_token, ldo_recipient, results, vesting_start_delay):
+    for result in results:
+        purchaser = result['purchaser']
+        allocation = result['allocation']
+        purchase_timestamp = result['timestamp']
+
+        result['locked_after_purchase'] = not _is_ldo_transferable(ldo_token, purchaser, 1, ldo_recipient)
+
+        result['locked_before_vesting_start'] = not _at_time(
+            w3,
+            purchase_timestamp + vesting_start_delay - 1,
+            lambda: _is_ldo_transferable(ldo_token, purchaser, 1, ldo_recipient)
+        )
+
+        def transfer_all():
+            _transact(w3, ldo_token.functions.transfer(ldo_recipient, allocation), purchaser)
+            return ldo_token.functions.balanceOf(purchaser).call() == 0
+
+        result['unlocked_after_vesting_start'] = _at_time(
+            w3,
+            purchase_timestamp + vesting_start_delay + 1,
+            transfer_all
+        )
+
+
+def check_reception_chunk(config, rpc_url, purchases):
+    """
+    Executes the purchases on the fork node at `rpc_url` and checks the lock-up of the bought
+    tokens. `purchases` is a list of `(index, purchaser, expected_allocation, purchase_args)`.
+    Returns the per-purchaser results and the totals over the chunk, to be merged by the caller.
+    """
+    w3 = Web3(HTTPProvider(rpc_url, request_kwargs={ 'timeout': FORK_WORKER_RPC_TIMEOUT }))
+
+    executor = w3.eth.contract(address=config['executor_address'], abi=config['executor_abi'])
+    dai_token = w3.eth.contract(address=config['dai_token_address'], abi=config['erc20_abi'])
+    ldo_token = w3.eth.contract(address=config['ldo_token_address'], abi=config['erc20_abi'])
+    dao_agent_address = config['dao_agent_address']
+    dai_banker = config['dai_banker_address']
+
+    # the node's own account pays for gas top-ups and receives pre-owned and transferred LDO
+    ldo_recipient = w3.eth.accounts[0]
+    _ensure_eth_balance(w3, dai_banker)
+
+    dao_agent_dai_balance_before = dai_token.functions.balanceOf(dao_agent_address).call()
+    executor_ldo_balance_before = ldo_token.functions.balanceOf(executor.address).call()
+
+    results = []
+
+    for (index, purchaser, expected_allocation, args) in purchases:
+        (allocation, dai_cost) = executor.functions.get_allocation(*args).call()
+        _ensure_eth_balance(w3, purchaser)
+
+        pre_owned_ldo = ldo_token.functions.balanceOf(purchaser).call()
+        if pre_owned_ldo > 0:
+            _transact(w3, ldo_token.functions.transfer(ldo_recipient, pre_owned_ldo), purchaser)
+
+        purchaser_dai_balance_before = dai_token.functions.balanceOf(purchaser).call()
+        if purchaser_dai_balance_before < dai_cost:
+            funding = dai_cost - purchaser_dai_balance_before
+            _transact(w3, dai_token.functions.transfer(purchaser, funding), dai_banker)
+            purchaser_dai_balance_before = dai_cost
+
+        purchaser_ldo_balance_before = ldo_token.functions.balanceOf(purchaser).call()
+
+        _transact(w3, dai_token.functions.approve(executor.address, dai_cost), purchaser)
+        dao_agent_dai_balance_before_purchase = dai_token.functions.balanceOf(dao_agent_address).call()
+        receipt = _transact(w3, executor.functions.execute_purchase(*args), purchaser)
+
+        results.append({
+            'index': index,
+            'purchaser': purchaser,
+            'expected_allocation': expected_allocation,
+            'allocation': allocation,
+            'dai_cost': dai_cost,
+            'ldo_purchased': ldo_token.functions.balanceOf(purchaser).call() - purchaser_ldo_balance_before,
+            'dai_spent': purchaser_dai_balance_before - dai_token.functions.balanceOf(purchaser).call(),
+            'dao_agent_dai_received': dai_token.functions.balanceOf(dao_agent_address).call() - dao_agent_dai_balance_before_purchase,
+            'gas_used': receipt.gasUsed,
+            'timestamp': w3.eth.get_block(receipt.blockNumber)['timestamp']
+        })
+
+    # lock-up checks go after all purchases, same as in the sequential mode
+    vesting_start_delay = config['vesting_start_delay']
+
+    if config['faithful_lockup_check']:
+        _check_lockup_by_transfers(w3, ldo_token, ldo_recipient, results, vesting_start_delay)
+    else:
+        token_manager = w3.eth.contract(address=config['token_manager_address'], abi=config['token_manager_abi'])
+        for result in results:
+            transferable = lambda delay: token_manager.functions.transferableBalance(
+                result['purchaser'],
+                result['timestamp'] + delay
+            ).call()
+            result['locked_after_purchase'] = transferable(0) == 0
+            result['locked_before_vesting_start'] = transferable(vesting_start_delay - 1) == 0
+            result['unlocked_after_vesting_start'] = transferable(vesting_start_delay + 1) == result['allocation']
+
+    return {
+        'results': results,
+        'dao_agent_dai_received': dai_token.functions.balanceOf(dao_agent_address).call() - dao_agent_dai_balance_before,
+        'executor_ldo_spent': executor_ldo_balance_before - ldo_token.functions.balanceOf(executor.address).call(),
+        'executor_dai_balance': dai_token.functions.balanceOf(executor.address).call()
+    }
+
+
+def check_reception_in_forks(fork_url, block_number, block_timestamp, config, purchases, workers):
+    """
+    Runs `check_reception_chunk` for the purchases split across `workers` fork nodes and merges
+    the results. Returns the per-purchaser results in the order of `purchases` and the totals
+    summed over all workers.
+    """
+    jobs = [ (index, purchaser, allocation, args) for index, (purchaser, allocation, args) in enumerate(purchases) ]
+    unlocked_addresses = [ config['dai_banker_address'] ] + [ purchaser for (purchaser, _, _) in purchases ]
+
+    chunk_results = run_in_forks(
+        fork_url,
+        block_number,
+        block_timestamp,
+        unlocked_addresses,
+        partial(check_reception_chunk, config),
+        jobs,
+        workers
+    )
+
+    results = sorted(
+        [ result for chunk in chunk_results for result in chunk['results'] ],
+        key=lambda result: result['index']
+    )
+    totals = {
+        key: sum([ chunk[key] for chunk in chunk_results ])
+        for key in ['dao_agent_dai_received', 'executor_ldo_spent', 'executor_dai_balance']
+    }
+
+    return (results, totals)
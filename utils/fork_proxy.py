@@ -0,0 +1,133 @@
+import os
+import json
+import gzip
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# A JSON-RPC proxy between a local fork node and the upstream archive node. The forked state
+# doesn't change, so in the `record` mode every upstream read the fork performs is stored into
+# a gzipped JSON file named after the fork block, and in the `replay` mode the fork is served
+# from that file only, without network access. Start the fork from the proxy URL, e.g.
+# `ganache-cli --fork http://127.0.0.1:8549@<block>`.
+
+FORK_CACHE_DIR = os.environ.get('FORK_CACHE_DIR', 'fork_cache')
+FORK_PROXY_MODES = ['record', 'replay']
+FORK_PROXY_TIMEOUT = 120
+
+# JSON-RPC error code returned for the requests missing from the recording in the replay mode
+NOT_RECORDED_ERROR_CODE = -32001
+# JSON-RPC error code returned when the upstream node can't be reached or returns garbage in the record mode
+UPSTREAM_ERROR_CODE = -32002
+
+
+def get_fork_cache_file(block_number, cache_dir=FORK_CACHE_DIR):
+    return os.path.join(cache_dir, f'fork-{block_number}.json.gz')
+
+
+def _get_request_key(request):
+    return json.dumps([request['method'], request.get('params', [])], sort_keys=True, separators=(',', ':'))
+
+
+def load_recording(filename):
+    if not os.path.exists(filename):
+        return {}
+    with gzip.open(filename, 'rt') as f:
+        return dict(json.load(f))
+
+
+def save_recording(filename, responses):
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with gzip.open(filename + '.tmp', 'wt') as f:
+        json.dump(sorted(responses.items()), f, separators=(',', ':'))
+    os.replace(filename + '.tmp', filename)
+
+
+class ForkProxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, mode, block_number, upstream_url=None, port=0, cache_dir=FORK_CACHE_DIR):
+        assert mode in FORK_PROXY_MODES, f'unknown fork proxy mode {mode}, expected one of {FORK_PROXY_MODES}'
+        assert mode == 'replay' or upstream_url is not None, 'recording needs the upstream node URL'
+
+        super().__init__(('127.0.0.1', port), _ForkProxyRequestHandler)
+        self.mode = mode
+        self.upstream_url = upstream_url
+        self.filename = get_fork_cache_file(block_number, cache_dir)
+        # responses without the request IDs, by the method and params
+        self.responses = load_recording(self.filename)
+        self.lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.save()
+
+    def save(self):
+        if self.mode == 'record' and self.recorded > 0:
+            save_recording(self.filename, self.responses)
+
+    def handle_request_object(self, request):
+        key = _get_request_key(request)
+        with self.lock:
+            response = self.responses.get(key)
+
+        if response is not None:
+            self.replayed += 1
+        elif self.mode == 'replay':
+            self.missed += 1
+            response = {'error': {'code': NOT_RECORDED_ERROR_CODE, 'message': f'not recorded: {key}'}}
+        else:
+            response = self._forward(request)
+            if 'error' not in response:
+                with self.lock:
+                    self.responses[key] = response
+                    self.recorded += 1
+
+        return {'jsonrpc': '2.0', 'id': request.get('id'), **response}
+
+    def _forward(self, request):
+        upstream_request = urllib.request.Request(
+            self.upstream_url,
+            data=json.dumps({**request, 'jsonrpc': '2.0', 'id': 1}).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        # failing the single request keeps the client connection, an exception in the handler would drop it
+        try:
+            with urllib.request.urlopen(upstream_request, timeout=FORK_PROXY_TIMEOUT) as upstream_response:
+                response = json.load(upstream_response)
+        except (OSError, ValueError) as err:
+            return {'error': {'code': UPSTREAM_ERROR_CODE, 'message': f'upstream request failed: {err}'}}
+        if not isinstance(response, dict):
+            return {'error': {'code': UPSTREAM_ERROR_CODE, 'message': 'upstream request failed: not a JSON-RPC response'}}
+        return { key: value for (key, value) in response.items() if key in ['result', 'error'] }
+
+
+class _ForkProxyRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if isinstance(payload, list):
+            response = [ self.server.handle_request_object(request) for request in payload ]
+        else:
+            response = self.server.handle_request_object(payload)
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
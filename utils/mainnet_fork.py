@@ -1,7 +1,14 @@
+import os
 from contextlib import contextmanager
-from brownie import rpc, chain, accounts, interface
+from brownie import rpc, chain, accounts, interface, web3, Wei
 
-from utils.config import lido_dao_voting_address
+from utils.config import lido_dao_voting_address, ldo_vote_executors_for_tests
+from utils.evm_script import decode_call_script
+
+
+# passing a vote for real takes a dozen transactions and a three days sleep, so by default
+# the vote script is executed directly on behalf of the Voting app instead
+FAITHFUL_DAO_VOTES = os.environ.get('FAITHFUL_DAO_VOTES', '') == '1'
 
 
 @contextmanager
@@ -17,26 +24,83 @@ def chain_snapshot():
         print(f'Reverted the chain to height {chain.height}')
 
 
-def pass_and_exec_dao_vote(vote_id):
+def _call_dev_node(methods, params, error_msg):
+    # dev nodes name their state override methods differently: ganache >= 7, then hardhat and anvil;
+    # `params` is either the same for each method or a list of params for each of them
+    params_list = params if isinstance(params[0], list) else [params] * len(methods)
+    for (method, params) in zip(methods, params_list):
+        response = web3.provider.make_request(method, params)
+        if 'error' not in response:
+            return
+    # the node's capabilities are part of the environment the scripts and tests run in
+    raise EnvironmentError(f'{error_msg}, tried {", ".join(methods)}')
+
+
+def set_code(address, code):
+    _call_dev_node(
+        ['evm_setAccountCode', 'hardhat_setCode', 'anvil_setCode'],
+        [address, code],
+        'the development node supports none of the known set code methods'
+    )
+
+
+def set_balance(address, amount):
+    _call_dev_node(
+        ['evm_setAccountBalance', 'hardhat_setBalance', 'anvil_setBalance'],
+        [address, hex(Wei(amount))],
+        'the development node supports none of the known set balance methods'
+    )
+
+
+def set_nonce(address, nonce):
+    _call_dev_node(
+        ['evm_setAccountNonce', 'hardhat_setNonce', 'anvil_setNonce'],
+        [address, hex(nonce)],
+        'the development node supports none of the known set nonce methods'
+    )
+
+
+def set_storage_at(address, slot, value):
+    # ganache takes the slot as a 32-byte word, hardhat and anvil as a number
+    value = f'0x{value:064x}'
+    _call_dev_node(
+        ['evm_setAccountStorageAt', 'hardhat_setStorageAt', 'anvil_setStorageAt'],
+        [ [address, f'0x{slot:064x}', value], [address, hex(slot), value], [address, hex(slot), value] ],
+        'the development node supports none of the known set storage methods'
+    )
+
+
+def exec_dao_vote_script(vote_id):
+    dao_voting = interface.Voting(lido_dao_voting_address)
+
+    # Aragon apps delegate-call the script executor, so each call is made by the Voting app itself
+    set_balance(dao_voting.address, '1 ether')
+    voting_acct = accounts.at(dao_voting.address, force=True)
+
+    for (to, calldata) in decode_call_script(dao_voting.getVote(vote_id)['script']):
+        voting_acct.transfer(to, 0, data=calldata, silent=True)
+
+
+def pass_and_exec_dao_vote(vote_id, faithful=FAITHFUL_DAO_VOTES):
     dao_voting = interface.Voting(lido_dao_voting_address)
 
     if dao_voting.getVote(vote_id)['executed']:
         print(f'[ok] Vote {vote_id} already executed')
         return
 
+    if not faithful:
+        print(f'Executing vote {vote_id} script on behalf of the Voting app')
+        exec_dao_vote_script(vote_id)
+        print(f'[ok] Vote {vote_id} script executed')
+        return
+
     helper_acct = accounts[0]
 
     if not dao_voting.canExecute(vote_id):
         print(f'Passing vote {vote_id}')
 
         # together these accounts hold 15% of LDO total supply
-        ldo_holders = [
-            '0x3e40d73eb977dc6a537af587d48316fee66e9c8c',
-            '0xb8d83908aab38a159f3da47a59d84db8e1838712',
-            '0xa2dfc431297aee387c05beef507e5335e684fbcd'
-        ]
-
-        for holder_addr in ldo_holders:
+        for holder_addr in ldo_vote_executors_for_tests:
             print(f'  voting from {holder_addr}')
             helper_acct.transfer(holder_addr, '0.1 ether', silent=True)
             account = accounts.at(holder_addr, force=True)
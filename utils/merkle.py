@@ -0,0 +1,83 @@
+from eth_abi import encode_abi
+from eth_utils import keccak, to_checksum_address
+
+from purchase_config import MERKLE_PROOF_MAX_DEPTH
+
+EMPTY_BYTES32 = b'\x00' * 32
+
+
+def hash_leaf(index, purchaser, allocation):
+    # matches keccak256(concat(convert(index, bytes32), convert(purchaser, bytes32), convert(allocation, bytes32)))
+    return keccak(encode_abi(['uint256', 'address', 'uint256'], [index, str(purchaser), allocation]))
+
+
+def hash_pair(a, b):
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def build_merkle_tree(ldo_purchasers):
+    # returns the list of tree levels, leaves first; the last node of an odd-sized
+    # level is promoted to the next level as is
+    level = [ hash_leaf(i, purchaser, allocation) for i, (purchaser, allocation) in enumerate(ldo_purchasers) ]
+    assert len(level) > 0, 'no purchasers'
+
+    tree = [level]
+
+    while len(level) > 1:
+        level = [
+            hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        tree.append(level)
+
+    return tree
+
+
+def get_merkle_root(tree):
+    return tree[-1][0]
+
+
+def get_merkle_proof(tree, index):
+    proof = []
+
+    for level in tree[:-1]:
+        sibling_index = index ^ 1
+        if sibling_index < len(level):
+            proof.append(level[sibling_index])
+        index //= 2
+
+    assert len(proof) <= MERKLE_PROOF_MAX_DEPTH, f'proof is too deep: max {MERKLE_PROOF_MAX_DEPTH}, got {len(proof)}'
+
+    return proof
+
+
+def pad_merkle_proof(proof):
+    return proof + [EMPTY_BYTES32] * (MERKLE_PROOF_MAX_DEPTH - len(proof))
+
+
+def verify_merkle_proof(root, index, purchaser, allocation, proof):
+    node = hash_leaf(index, purchaser, allocation)
+    for sibling in proof:
+        if sibling == EMPTY_BYTES32:
+            break
+        node = hash_pair(node, sibling)
+    return node == root
+
+
+def build_merkle_claims(ldo_purchasers):
+    # returns the tree root and a dict of purchaser address to its claim, i.e. the
+    # arguments to be passed to `PurchaseExecutorMerkle.execute_purchase`
+    tree = build_merkle_tree(ldo_purchasers)
+
+    claims = {}
+
+    for i, (purchaser, allocation) in enumerate(ldo_purchasers):
+        purchaser = to_checksum_address(str(purchaser))
+        assert purchaser not in claims, f'duplicate purchaser {purchaser}'
+        claims[purchaser] = {
+            'index': i,
+            'allocation': allocation,
+            'proof': pad_merkle_proof(get_merkle_proof(tree, i))
+        }
+
+    return (get_merkle_root(tree), claims)
@@ -0,0 +1,91 @@
+from brownie import (
+    web3,
+    MockACL,
+    MockCallsScript,
+    MockDai,
+    MockFinance,
+    MockMiniMeToken,
+    MockTokenManager,
+    MockVault,
+    MockVoting
+)
+
+from utils.config import (
+    ldo_token_address,
+    lido_dao_acl_address,
+    lido_dao_agent_address,
+    lido_dao_finance_address,
+    lido_dao_voting_address,
+    lido_dao_token_manager_address,
+    dai_token_address
+)
+from utils.dai_permit import DAI_CHAIN_ID
+from utils.mainnet_fork import set_code
+
+
+# Lido DAO Voting settings, 10**18 being 100%
+VOTING_SUPPORT_REQUIRED_PCT = 50 * 10**16
+VOTING_MIN_ACCEPT_QUORUM_PCT = 5 * 10**16
+VOTING_VOTE_TIME = 3 * 60 * 60 * 24
+
+HOLDER_ETH_BALANCE = '10 ether'
+
+
+def deploy_at(container, address, tx_params):
+    # the executor has the DAO addresses hardcoded, so the mock code is copied to the mainnet
+    # address; mocks have no constructors and get their storage from `initialize` calls instead
+    template = container.deploy(tx_params)
+    set_code(address, web3.eth.get_code(template.address).hex())
+    return container.at(address)
+
+
+def deploy_dao_mocks(tx_params, ldo_balances, dai_balances):
+    """
+    Replaces the Lido DAO apps, LDO and DAI with the mock contracts at their mainnet addresses
+    on a local development chain. Role grants mirror the mainnet ones relevant to the purchase:
+    only the Voting can grant `ASSIGN_ROLE` and spend the treasury through Finance, and
+    LDO holders can start votes through the TokenManager.
+    """
+    deployer = tx_params['from']
+
+    script_executor = MockCallsScript.deploy(tx_params)
+
+    acl = deploy_at(MockACL, lido_dao_acl_address, tx_params)
+    ldo_token = deploy_at(MockMiniMeToken, ldo_token_address, tx_params)
+    token_manager = deploy_at(MockTokenManager, lido_dao_token_manager_address, tx_params)
+    voting = deploy_at(MockVoting, lido_dao_voting_address, tx_params)
+    finance = deploy_at(MockFinance, lido_dao_finance_address, tx_params)
+    agent = deploy_at(MockVault, lido_dao_agent_address, tx_params)
+    dai_token = deploy_at(MockDai, dai_token_address, tx_params)
+
+    acl.initialize(deployer, tx_params)
+    ldo_token.initialize('Lido DAO Token', 'LDO', tx_params)
+    token_manager.initialize(ldo_token, acl, script_executor, tx_params)
+    voting.initialize(
+        ldo_token,
+        acl,
+        script_executor,
+        VOTING_SUPPORT_REQUIRED_PCT,
+        VOTING_MIN_ACCEPT_QUORUM_PCT,
+        VOTING_VOTE_TIME,
+        tx_params
+    )
+    finance.initialize(agent, acl, tx_params)
+    agent.initialize(acl, tx_params)
+    dai_token.initialize(DAI_CHAIN_ID, tx_params)
+
+    acl.createPermission(voting, token_manager, token_manager.ASSIGN_ROLE(), voting, tx_params)
+    acl.createPermission(token_manager, voting, voting.CREATE_VOTES_ROLE(), voting, tx_params)
+    acl.createPermission(voting, finance, finance.CREATE_PAYMENTS_ROLE(), voting, tx_params)
+    acl.createPermission(finance, agent, agent.TRANSFER_ROLE(), voting, tx_params)
+
+    for (holder, amount) in ldo_balances.items():
+        ldo_token.generateTokens(holder, amount, tx_params)
+    ldo_token.changeController(token_manager, tx_params)
+
+    for (holder, amount) in dai_balances.items():
+        dai_token.mint(holder, amount, tx_params)
+
+    # holders are impersonated in tests and need ETH to pay for gas
+    for holder in set(ldo_balances) | set(dai_balances):
+        deployer.transfer(holder, HOLDER_ETH_BALANCE, silent=True)
@@ -0,0 +1,34 @@
+from brownie import web3, interface
+
+from utils.config import multicall2_address
+
+# keeps a single aggregated call well below the node's eth_call gas cap
+MULTICALL_MAX_BATCH_SIZE = 500
+
+
+def multicall(calls, block_identifier=None, max_batch_size=MULTICALL_MAX_BATCH_SIZE):
+    # Each call is a `(contract_call, args)` pair, e.g. `(executor.get_allocation, [purchaser])`.
+    # Calls are aggregated into `eth_call`s to the Multicall2 contract, up to `max_batch_size`
+    # calls each, all pinned to the same block. Falls back to sequential calls pinned to the
+    # same block when Multicall2 is not deployed on the connected chain.
+    if block_identifier is None:
+        block_identifier = web3.eth.block_number
+
+    if len(web3.eth.get_code(multicall2_address, block_identifier)) == 0:
+        return [ fn.call(*args, block_identifier=block_identifier) for (fn, args) in calls ]
+
+    multicall2 = interface.Multicall2(multicall2_address)
+    results = []
+
+    for batch_start in range(0, len(calls), max_batch_size):
+        batch = calls[batch_start:batch_start + max_batch_size]
+
+        (block_number, return_data) = multicall2.aggregate.call(
+            [ (fn._address, fn.encode_input(*args)) for (fn, args) in batch ],
+            block_identifier=block_identifier
+        )
+        assert block_number == block_identifier, f'multicall executed at block {block_number}, expected {block_identifier}'
+
+        results += [ fn.decode_output(data) for ((fn, _), data) in zip(batch, return_data) ]
+
+    return results
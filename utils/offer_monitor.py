@@ -0,0 +1,192 @@
+import os
+import math
+import time
+import threading
+import eth_abi
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from eth_utils import keccak, to_checksum_address
+
+from core.addresses import ldo_token_address
+from core.dao import encode_function_call
+from utils.event_indexer import EventIndexer, find_deployment_block
+
+# A daemon keeping an in-memory model of the offer state and serving it as Prometheus metrics.
+# The config is read once; on each new block the executor events after the previous block are
+# fetched by an in-memory `EventIndexer` (rolling back reorged ones), and the LDO balance is
+# only read again when an LDO transfer touches the executor or a reorg happens. The metrics are
+# rendered after every update, failed ones included, so a stalled node shows up as errors and
+# a stale last update timestamp instead of the last good values alone.
+
+MONITOR_PORT = int(os.environ.get('MONITOR_PORT', '9108'))
+MONITOR_POLL_INTERVAL = float(os.environ.get('MONITOR_POLL_INTERVAL', '12'))
+
+METRICS_PREFIX = 'ldo_purchase_executor'
+TRANSFER_TOPIC = keccak(text='Transfer(address,address,uint256)')
+
+
+def _to_topic(address):
+    return '0x' + bytes(12).hex() + address[2:].lower()
+
+
+class OfferMonitor:
+    def __init__(self, web3, executor_address, start_block=None, ldo_token=ldo_token_address):
+        self.web3 = web3
+        self.executor = to_checksum_address(executor_address)
+        self.ldo_token = to_checksum_address(ldo_token)
+        if start_block is None:
+            # no events of the executor precede its deployment
+            start_block = find_deployment_block(web3, self.executor)
+        self.indexer = EventIndexer(web3, self.executor, start_block=start_block, filename=':memory:', confirmations=0)
+        self.ldo_allocations_total = self._call(self.executor, 'ldo_allocations_total()')
+        self.offer_expiration_delay = self._call(self.executor, 'offer_expiration_delay()')
+        self.block = None
+        self.ldo_balance = None
+        self.balance_reads = 0
+        self.errors = 0
+        self.last_update_time = None
+        # the metrics of the model, as of the latest processed block
+        self.offer_metrics = []
+        self.render()
+
+    def _call(self, address, signature, args=(), block_identifier='latest'):
+        result = self.web3.eth.call({'to': address, 'data': encode_function_call(signature, args)}, block_identifier)
+        return eth_abi.decode_abi(['uint256'], bytes(result))[0]
+
+    def _has_ldo_transfers(self, from_block, to_block):
+        executor_topic = _to_topic(self.executor)
+        return any([
+            len(self.web3.eth.get_logs({
+                'address': self.ldo_token,
+                'fromBlock': from_block,
+                'toBlock': to_block,
+                'topics': topics
+            })) > 0
+            for topics in [ ['0x' + TRANSFER_TOPIC.hex(), executor_topic], ['0x' + TRANSFER_TOPIC.hex(), None, executor_topic] ]
+        ])
+
+    def update(self):
+        # returns whether a new block was processed
+        block = self.web3.eth.get_block('latest')
+        if self.block is not None and block['hash'] == self.block['hash']:
+            self.last_update_time = time.time()
+            self.render()
+            return False
+
+        reorged_blocks = self.indexer.reorged_blocks
+        self.indexer.sync()
+
+        if (
+            self.block is None
+            or self.indexer.reorged_blocks != reorged_blocks
+            or block['number'] <= self.block['number']
+            or self._has_ldo_transfers(self.block['number'] + 1, block['number'])
+        ):
+            self.ldo_balance = self._call(self.ldo_token, 'balanceOf(address)', [self.executor], block['number'])
+            self.balance_reads += 1
+
+        self.block = block
+        self.offer_metrics = self._get_offer_metrics()
+        self.last_update_time = time.time()
+        self.render()
+        return True
+
+    def record_error(self):
+        self.errors += 1
+        self.render()
+
+    def render(self):
+        self.metrics = render_metrics(self.get_metrics(), {'executor': self.executor})
+
+    def get_metrics(self):
+        # `(name, type, help, value)`; the offer metrics are missing until the first successful update
+        last_update_time = math.nan if self.last_update_time is None else self.last_update_time
+        return self.offer_metrics + [
+            ('update_errors', 'counter', 'Failed monitor updates', self.errors),
+            ('last_update_timestamp_seconds', 'gauge', 'Unix time of the latest successful update', last_update_time)
+        ]
+
+    def _get_offer_metrics(self):
+        # token amounts in whole tokens
+        progress = self.indexer.get_sale_progress(self.ldo_allocations_total)
+        timestamps = progress['offer_timestamps']
+        now = self.block['timestamp']
+
+        if timestamps is None:
+            seconds_to_expiry = math.nan
+        else:
+            seconds_to_expiry = max(0, timestamps[1] - now)
+
+        return [
+            ('block_number', 'gauge', 'Latest block processed', self.block['number']),
+            ('offer_started', 'gauge', 'Whether the offer has started', int(timestamps is not None)),
+            ('offer_expired', 'gauge', 'Whether the offer has expired', int(timestamps is not None and now >= timestamps[1])),
+            ('offer_seconds_to_expiry', 'gauge', 'Seconds from the latest block to the offer expiry', seconds_to_expiry),
+            ('ldo_allocations_total', 'gauge', 'LDO allocated to all purchasers', self.ldo_allocations_total / 10**18),
+            ('ldo_sold', 'gauge', 'LDO sold so far', progress['ldo_sold'] / 10**18),
+            ('ldo_remaining', 'gauge', 'LDO allocated but not sold yet', progress['ldo_remaining'] / 10**18),
+            ('ldo_balance', 'gauge', 'LDO balance of the executor', self.ldo_balance / 10**18),
+            ('ldo_balance_surplus', 'gauge', 'LDO balance minus the remaining allocations, negative if underfunded',
+                (self.ldo_balance - progress['ldo_remaining']) / 10**18),
+            ('dai_received', 'gauge', 'DAI paid for the purchases', progress['dai_received'] / 10**18),
+            ('purchases', 'gauge', 'Purchases executed', progress['purchases_count']),
+            ('ldo_balance_reads', 'counter', 'LDO balance reads by the monitor', self.balance_reads)
+        ]
+
+
+def render_metrics(metrics, labels):
+    # the Prometheus text exposition format
+    labels_text = ','.join([ f'{name}="{value}"' for (name, value) in labels.items() ])
+    lines = []
+    for (name, metric_type, help_text, value) in metrics:
+        lines += [
+            f'# HELP {METRICS_PREFIX}_{name} {help_text}',
+            f'# TYPE {METRICS_PREFIX}_{name} {metric_type}',
+            f'{METRICS_PREFIX}_{name}{{{labels_text}}} {"NaN" if math.isnan(value) else value}'
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, monitor, port=MONITOR_PORT):
+        super().__init__(('127.0.0.1', port), _MetricsRequestHandler)
+        self.monitor = monitor
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/metrics'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        # the metrics are rendered by the update loop, so serving them doesn't touch the model,
+        # which is only used from the loop thread
+        body = self.server.monitor.metrics.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_monitor(monitor, poll_interval=MONITOR_POLL_INTERVAL, on_error=None):
+    # updates the monitor until interrupted; node errors are counted and retried on the next poll
+    while True:
+        try:
+            monitor.update()
+        except Exception as err:
+            monitor.record_error()
+            if on_error is not None:
+                on_error(err)
+        time.sleep(poll_interval)
@@ -0,0 +1,112 @@
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+
+# An on-disk cache of the state reads pinned to a block. The state of a block doesn't change,
+# so `eth_call`s and other reads at the pinned block are stored in an SQLite file keyed by
+# (chain id, block number, request) and served from it on the next run. Only one block is
+# kept per chain: pinning another block, or the same block number with a different hash
+# (e.g. on a restarted fork), drops the entries of that chain.
+
+RPC_CACHE_FILE = os.environ.get('RPC_CACHE_FILE', '.rpc_cache.sqlite')
+
+# methods taking the block number as the last parameter and returning the state at that block
+CACHED_METHODS = ['eth_call', 'eth_getCode', 'eth_getBalance', 'eth_getStorageAt']
+
+
+class RpcCache:
+    def __init__(self, filename=RPC_CACHE_FILE):
+        self.db = sqlite3.connect(filename)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS pinned_blocks (
+                chain_id INTEGER PRIMARY KEY,
+                block_number INTEGER NOT NULL,
+                block_hash TEXT NOT NULL
+            )
+        ''')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                chain_id INTEGER NOT NULL,
+                block_number INTEGER NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (chain_id, block_number, request)
+            )
+        ''')
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.db.close()
+
+    def pin_block(self, chain_id, block_number, block_hash):
+        pinned = self.db.execute(
+            'SELECT block_number, block_hash FROM pinned_blocks WHERE chain_id = ?',
+            (chain_id,)
+        ).fetchone()
+        if pinned == (block_number, block_hash):
+            return
+        self.db.execute('DELETE FROM responses WHERE chain_id = ?', (chain_id,))
+        self.db.execute(
+            'INSERT OR REPLACE INTO pinned_blocks (chain_id, block_number, block_hash) VALUES (?, ?, ?)',
+            (chain_id, block_number, block_hash)
+        )
+        self.db.commit()
+
+    def get(self, chain_id, block_number, request):
+        row = self.db.execute(
+            'SELECT result FROM responses WHERE chain_id = ? AND block_number = ? AND request = ?',
+            (chain_id, block_number, request)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, chain_id, block_number, request, result):
+        self.db.execute(
+            'INSERT OR REPLACE INTO responses (chain_id, block_number, request, result) VALUES (?, ?, ?, ?)',
+            (chain_id, block_number, request, json.dumps(result))
+        )
+        self.db.commit()
+
+    def middleware(self, chain_id, block_number):
+        # a web3 middleware serving the reads at `block_number` from the cache; it has to be
+        # the innermost one, so that the requests are already formatted for the provider
+        block_param = hex(block_number)
+
+        def cache_middleware(make_request, w3):
+            def middleware(method, params):
+                if method not in CACHED_METHODS or len(params) == 0 or params[-1] != block_param:
+                    return make_request(method, params)
+
+                request = json.dumps([method, params], sort_keys=True)
+                result = self.get(chain_id, block_number, request)
+                if result is not None:
+                    self.hits += 1
+                    return {'jsonrpc': '2.0', 'id': 0, 'result': result}
+
+                self.misses += 1
+                response = make_request(method, params)
+                if 'error' not in response and response.get('result') is not None:
+                    self.put(chain_id, block_number, request, response['result'])
+                return response
+
+            return middleware
+
+        return cache_middleware
+
+
+@contextmanager
+def block_pinned_rpc_cache(web3, block_number, filename=RPC_CACHE_FILE):
+    # serves the reads at `block_number` from the cache file within the context
+    cache = RpcCache(filename)
+    block_hash = web3.eth.get_block(block_number)['hash'].hex()
+    chain_id = web3.eth.chain_id
+    cache.pin_block(chain_id, block_number, block_hash)
+
+    web3.middleware_onion.inject(cache.middleware(chain_id, block_number), name='rpc_cache', layer=0)
+    try:
+        yield cache
+    finally:
+        web3.middleware_onion.remove('rpc_cache')
+        cache.close()
@@ -0,0 +1,158 @@
+import os
+import json
+from brownie import chain, history, web3
+
+from utils.mainnet_fork import set_code, set_balance, set_nonce, set_storage_at
+
+# Reaching the post-vote state takes a deployment and a dozen DAO transactions, so it's built
+# once and dumped: the accounts the transactions touched, found from their traces, are saved
+# with their final code, balance, nonce and the storage slots written to. Loading the dump into
+# a fresh chain forked from the same block sets these directly, which works on any node
+# supporting state overrides (ganache >= 7, hardhat, anvil).
+
+PREPARED_STATE_FILE = os.environ.get('PREPARED_STATE_FILE', 'prepared_state.json')
+
+CALL_OPS = ['CALL', 'STATICCALL']
+DELEGATE_CALL_OPS = ['DELEGATECALL', 'CALLCODE']
+CREATE_OPS = ['CREATE', 'CREATE2']
+
+# precompiles are called like contracts but have no state
+MAX_PRECOMPILE_ADDRESS = 0xff
+
+
+def _stack_word(step, position):
+    # the `position`th item from the top of the stack of a trace step
+    return int(step['stack'][-position], 16)
+
+
+def _to_address(word):
+    return web3.toChecksumAddress(f'0x{word % 2**160:040x}')
+
+
+def get_touched_state(tx):
+    """
+    Returns `(accounts, slots)`: the set of addresses the transaction ran code at, created or
+    sent value to, and the set of `(address, slot)` pairs it wrote to. Writes are attributed
+    to the account whose storage the frame uses, i.e. the caller for delegate calls.
+    """
+    steps = web3.provider.make_request(
+        'debug_traceTransaction',
+        [tx.txid, {'disableMemory': True, 'disableStorage': True}]
+    )['result']['structLogs']
+
+    # frames are single-item lists, so that the frames of contracts being created
+    # get the address once the creation returns it
+    root_frame = [tx.contract_address if tx.receiver is None else tx.receiver]
+    (frames, all_frames) = ([root_frame], [root_frame])
+    accounts = {tx.sender.address}
+    slots = []
+
+    for (i, step) in enumerate(steps):
+        while len(frames) > step['depth']:
+            frame = frames.pop()
+            if frame[0] is None:
+                # the creation pushes the new contract's address to the caller's stack
+                frame[0] = _to_address(_stack_word(step, 1))
+
+        op = step['op']
+        if op == 'SSTORE':
+            slots.append((frames[-1], _stack_word(step, 1)))
+
+        entered = i + 1 < len(steps) and steps[i + 1]['depth'] > step['depth']
+        if op in CALL_OPS:
+            accounts.add(_to_address(_stack_word(step, 2)))
+            if entered:
+                frames.append([_to_address(_stack_word(step, 2))])
+        elif op in DELEGATE_CALL_OPS and entered:
+            frames.append(frames[-1])
+        elif op in CREATE_OPS and entered:
+            frames.append([None])
+            all_frames.append(frames[-1])
+
+    accounts |= { frame[0] for frame in all_frames if frame[0] is not None }
+    accounts = { address for address in accounts if int(address, 16) > MAX_PRECOMPILE_ADDRESS }
+    return (accounts, { (frame[0], slot) for (frame, slot) in slots if frame[0] is not None })
+
+
+def dump_state(filename, txs, extra):
+    # `extra` is saved as is, e.g. the addresses of the deployed contracts
+    accounts = set()
+    slots = set()
+    for tx in txs:
+        (tx_accounts, tx_slots) = get_touched_state(tx)
+        accounts |= tx_accounts
+        slots |= tx_slots
+
+    # the block the transactions were applied on top of, i.e. the fork block when they start
+    # from the first local block, which the dump is only loaded into
+    base_block_number = min([ tx.block_number for tx in txs ]) - 1
+    dump = {
+        'base_block_number': base_block_number,
+        'base_block_hash': web3.eth.get_block(base_block_number)['hash'].hex(),
+        'timestamp': chain[-1].timestamp,
+        'accounts': {
+            address: {
+                'code': web3.eth.get_code(address).hex(),
+                'balance': web3.eth.get_balance(address),
+                'nonce': web3.eth.get_transaction_count(address),
+                'storage': {}
+            }
+            for address in sorted(accounts)
+        },
+        'extra': extra
+    }
+    for (address, slot) in sorted(slots):
+        value = int.from_bytes(web3.eth.get_storage_at(address, slot), 'big')
+        dump['accounts'][address]['storage'][hex(slot)] = hex(value)
+
+    with open(filename, 'w') as f:
+        json.dump(dump, f, indent=1, sort_keys=True)
+
+    print(f'[ok] Dumped {len(accounts)} accounts and {len(slots)} storage slots to {filename}')
+
+
+def read_state_dump(filename):
+    # returns None, so the state is built again, unless the current chain is at the exact block
+    # the dump was built on, e.g. a fresh fork of the same block
+    if not os.path.exists(filename):
+        return None
+    with open(filename) as f:
+        dump = json.load(f)
+
+    if 'base_block_number' not in dump:
+        print(f'[WARN] {filename} has no base block, ignoring it')
+        return None
+
+    # a chain forked from a later block has the base block too, so the height must match as well;
+    # on a plain development chain, started from the genesis, only the height is checked
+    base_block_number = dump['base_block_number']
+    if base_block_number != chain.height or (
+        base_block_number > 0 and web3.eth.get_block(base_block_number)['hash'].hex() != dump['base_block_hash']
+    ):
+        print(f'[WARN] {filename} was dumped on top of another block, ignoring it')
+        return None
+
+    return dump
+
+
+def load_state(dump):
+    for (address, account) in dump['accounts'].items():
+        if len(account['code']) > 2:
+            set_code(address, account['code'])
+        set_balance(address, account['balance'])
+        set_nonce(address, account['nonce'])
+        for (slot, value) in account['storage'].items():
+            set_storage_at(address, int(slot, 16), int(value, 16))
+
+    # the state may have been built after time jumps, e.g. waiting for a vote to end
+    if dump['timestamp'] > chain.time():
+        chain.sleep(dump['timestamp'] - chain.time())
+    chain.mine()
+
+    print(f'[ok] Loaded {len(dump["accounts"])} accounts from the state dump')
+    return dump['extra']
+
+
+def get_session_txs():
+    # all transactions sent since brownie connected to the chain
+    return list(history)
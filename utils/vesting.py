@@ -0,0 +1,76 @@
+import numpy as np
+
+# Aragon TokenManager vesting math evaluated for whole grids of holders and timestamps at once.
+# Arrays have the object dtype so that values are Python integers: LDO amounts in wei don't
+# fit into 64 bits and the integer division has to round the same way as on chain.
+
+
+def _as_int_array(values):
+    return np.asarray(values, dtype=object)
+
+
+def _select(condition, x, y):
+    # `np.where` would convert the zero-dimensional results to fixed-size integers
+    result = np.empty(np.shape(condition), dtype=object)
+    result[...] = _as_int_array(y)
+    np.copyto(result, _as_int_array(x), where=condition)
+    return result
+
+
+def vesting_schedule(purchase_timestamps, vesting_start_delay, vesting_end_delay):
+    # `(start, cliff, vested)` of the vestings assigned by the executor, the cliff being the start
+    purchase_timestamps = _as_int_array(purchase_timestamps)
+    start = purchase_timestamps + vesting_start_delay
+    return (start, start, purchase_timestamps + vesting_end_delay)
+
+
+def non_vested_tokens(amount, time, start, cliff, vested):
+    """
+    Same as `TokenManager._calculateNonVestedTokens`, element-wise with the arguments
+    broadcast against each other:
+
+        if time >= vested: 0
+        elif time < cliff: amount
+        else: amount - amount * (time - start) / (vested - start)
+    """
+    (amount, time, start, cliff, vested) = np.broadcast_arrays(
+        *[ _as_int_array(value) for value in (amount, time, start, cliff, vested) ]
+    )
+    vesting_period = _select(vested > start, vested - start, 1)
+    elapsed = _select(time > start, time - start, 0)
+    vested_amount = amount * elapsed // vesting_period
+    return _select(time >= vested, 0, _select(time < cliff, amount, amount - vested_amount))
+
+
+def transferable_balances(balances, vestings, timestamps):
+    """
+    Same as `TokenManager.transferableBalance` for each holder and timestamp, returning
+    an array of shape `(len(balances), len(timestamps))`. `vestings` holds the list of
+    `(amount, start, cliff, vested)` tuples of each holder.
+    """
+    max_vestings = max([ len(holder_vestings) for holder_vestings in vestings ] + [1])
+
+    # holders with fewer vestings are padded by zero amounts, which are never locked
+    padded = np.zeros((len(balances), max_vestings, 4), dtype=object)
+    for (i, holder_vestings) in enumerate(vestings):
+        for (j, vesting) in enumerate(holder_vestings):
+            padded[i, j] = vesting
+
+    (amount, start, cliff, vested) = [ padded[:, :, k, np.newaxis] for k in range(0, 4) ]
+    time = _as_int_array(timestamps)[np.newaxis, np.newaxis, :]
+
+    locked = non_vested_tokens(amount, time, start, cliff, vested).sum(axis=1)
+    return _as_int_array(balances)[:, np.newaxis] - locked
+
+
+def purchase_unlock_curves(
+    allocations,
+    purchase_timestamps,
+    vesting_start_delay,
+    vesting_end_delay,
+    timestamps
+):
+    # transferable LDO of each purchaser holding nothing but the purchased tokens
+    (start, cliff, vested) = vesting_schedule(purchase_timestamps, vesting_start_delay, vesting_end_delay)
+    vestings = [ [vesting] for vesting in zip(allocations, start, cliff, vested) ]
+    return transferable_balances(allocations, vestings, timestamps)